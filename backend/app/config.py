@@ -10,6 +10,7 @@ load_dotenv()
 
 # OpenRouter configuration
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+MODEL_ROUTING_MODES = ("off", "shadow", "on")
 
 
 class Settings(BaseModel):
@@ -22,6 +23,40 @@ class Settings(BaseModel):
     openrouter_api_key: str = ""
     openrouter_base_url: str = OPENROUTER_BASE_URL
 
+    # Routing of requests without an explicit model: "off", "shadow" (log the
+    # decision only) or "on" (send simple lookups to the fast tier).
+    model_routing_mode: str = "shadow"
+
+    # Admission control for /chat
+    chat_max_concurrency: int = 8
+    chat_max_queue: int = 16
+    chat_queue_timeout_s: float = 10.0
+    openrouter_model_concurrency: int = 4
+
+    # Embedding during index builds: requests in flight and provider limits
+    # (requests / estimated tokens per minute; 0 disables a limit)
+    embedding_concurrency: int = 4
+    embedding_rpm: float = 3000
+    embedding_tpm: float = 1_000_000
+    # Per-request packing limits (estimated tokens / inputs per embedding call)
+    embedding_batch_max_tokens: int = 50_000
+    embedding_batch_max_items: int = 256
+
+    # Answer exact metric lookups from the facts store when the matched row
+    # covers at least this share of the question's words (else full RAG)
+    facts_fast_path: bool = True
+    facts_min_confidence: float = 0.75
+
+    # Index snapshot archive (local path or URL, from build_index.py
+    # --snapshot-dir) installed into the index directory at startup unless it
+    # is installed already; "" uses the index directory as it is
+    index_snapshot_url: str = ""
+    # Expected SHA-256 of the archive ("" reads the .sha256 file next to it)
+    index_snapshot_sha256: str = ""
+
+    # Canned query run against the index during startup warm-up ("" to skip)
+    warmup_query: str = "What were total net sales this quarter?"
+
     data_dir: Path = Path("data")
     raw_dir: Path = Path("data/raw")
     processed_dir: Path = Path("data/processed")
@@ -41,10 +76,29 @@ def get_settings() -> Settings:
         openai_embedding_model=os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-large"),
         openrouter_api_key=os.environ.get("OPENROUTER_API_KEY", ""),
         openrouter_base_url=os.environ.get("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL),
+        model_routing_mode=os.environ.get("MODEL_ROUTING_MODE", "shadow").lower(),
+        chat_max_concurrency=int(os.environ.get("CHAT_MAX_CONCURRENCY", "8")),
+        chat_max_queue=int(os.environ.get("CHAT_MAX_QUEUE", "16")),
+        chat_queue_timeout_s=float(os.environ.get("CHAT_QUEUE_TIMEOUT_S", "10")),
+        openrouter_model_concurrency=int(os.environ.get("OPENROUTER_MODEL_CONCURRENCY", "4")),
+        embedding_concurrency=int(os.environ.get("EMBEDDING_CONCURRENCY", "4")),
+        embedding_rpm=float(os.environ.get("EMBEDDING_RPM", "3000")),
+        embedding_tpm=float(os.environ.get("EMBEDDING_TPM", "1000000")),
+        embedding_batch_max_tokens=int(os.environ.get("EMBEDDING_BATCH_MAX_TOKENS", "50000")),
+        embedding_batch_max_items=int(os.environ.get("EMBEDDING_BATCH_MAX_ITEMS", "256")),
+        facts_fast_path=os.environ.get("FACTS_FAST_PATH", "true").lower() not in ("0", "false", "no", "off"),
+        facts_min_confidence=float(os.environ.get("FACTS_MIN_CONFIDENCE", "0.75")),
+        index_snapshot_url=os.environ.get("INDEX_SNAPSHOT_URL", ""),
+        index_snapshot_sha256=os.environ.get("INDEX_SNAPSHOT_SHA256", "").lower(),
+        warmup_query=os.environ.get("WARMUP_QUERY", "What were total net sales this quarter?"),
     )
 
     if not settings.openai_api_key:
         raise ValueError("OPENAI_API_KEY is required but missing. Add it to your .env file.")
+    if settings.model_routing_mode not in MODEL_ROUTING_MODES:
+        raise ValueError(
+            f"MODEL_ROUTING_MODE must be one of {MODEL_ROUTING_MODES}, got {settings.model_routing_mode!r}"
+        )
 
     # Ensure important directories exist to avoid runtime errors
     for path in [
@@ -1,7 +1,9 @@
 from functools import lru_cache
 from typing import Optional
 
+from ..vectorstore.chroma_store import ChromaVectorStore
 from .config import Settings, get_settings
+from .metrics import register_lru_cache
 from .openai_client import OpenAIClient
 from .openrouter_client import OpenRouterClient
 
@@ -22,6 +24,18 @@ def get_openai_client() -> OpenAIClient:
     )
 
 
+@lru_cache
+def get_vector_store() -> ChromaVectorStore:
+    """Shared store so the Chroma client, HNSW index and embedding model load once per process."""
+    settings = get_app_settings()
+    return ChromaVectorStore(persist_directory=str(settings.chroma_persist_dir))
+
+
+register_lru_cache("app_settings", get_app_settings)
+register_lru_cache("openai_client", get_openai_client)
+register_lru_cache("vector_store", get_vector_store)
+
+
 def get_openrouter_client(model: Optional[str] = None) -> OpenRouterClient:
     """Get an OpenRouter client for multi-model evaluation."""
     settings = get_app_settings()
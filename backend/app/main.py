@@ -1,13 +1,30 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import chat, documents, health
+from .routes import chat, documents, health, metrics
+from .warmup import mark_ready_without_warmup, run_warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so liveness checks pass immediately while
+    # /health/ready stays 503 until the heavy resources are loaded.
+    if os.environ.get("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes"):
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(run_warmup))
+    else:
+        mark_ready_without_warmup()
+    yield
+
 
 app = FastAPI(
     title="Financial RAG Chatbot",
     description="LLM-based chatbot for answering questions about company financials with citations.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS - allow frontend URL from environment or default to localhost
@@ -38,5 +55,6 @@ def root() -> dict:
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(chat.router, prefix="/chat", tags=["chat"])
 app.include_router(documents.router, tags=["documents"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 
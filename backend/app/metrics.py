@@ -0,0 +1,137 @@
+"""
+Prometheus metrics for the API.
+
+Everything is registered on the default `prometheus_client` registry and
+exposed by the `/metrics` route.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, Mapping
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily
+
+# Buckets in seconds, tuned for stages that range from sub-millisecond
+# formatting to multi-second LLM calls.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0,
+)
+
+STAGE_LATENCY = Histogram(
+    "rag_stage_latency_seconds",
+    "Latency of each /chat pipeline stage.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "LLM tokens consumed, by model and direction.",
+    ["model", "kind"],
+)
+
+LLM_COST = Counter(
+    "rag_llm_cost_usd_total",
+    "Estimated LLM spend in USD, by model.",
+    ["model"],
+)
+
+LLM_REQUESTS = Counter(
+    "rag_llm_requests_total",
+    "LLM completions issued, by model.",
+    ["model"],
+)
+
+ROUTER_DECISIONS = Counter(
+    "rag_router_decisions_total",
+    "Model router decisions for default chat requests, by mode and tier.",
+    ["mode", "tier"],
+)
+
+FACT_LOOKUPS = Counter(
+    "rag_fact_lookups_total",
+    "Exact metric lookups tried against the facts store, by result (answered/fallthrough).",
+    ["result"],
+)
+
+IN_FLIGHT = Gauge(
+    "rag_chat_in_flight_requests",
+    "Number of /chat requests currently being processed.",
+)
+
+QUEUE_DEPTH = Gauge(
+    "rag_chat_queue_depth",
+    "Number of /chat requests waiting for an admission slot.",
+)
+
+QUEUE_WAIT = Histogram(
+    "rag_chat_queue_wait_seconds",
+    "Time admitted /chat requests spent waiting for a slot.",
+    buckets=LATENCY_BUCKETS,
+)
+
+ADMISSION_REJECTIONS = Counter(
+    "rag_chat_admission_rejections_total",
+    "/chat requests rejected with 429, by reason.",
+    ["reason"],
+)
+
+WARMUP_STEP_SECONDS = Gauge(
+    "rag_warmup_step_seconds",
+    "Duration of each startup warm-up step.",
+    ["step"],
+)
+
+READY = Gauge(
+    "rag_ready",
+    "1 once startup warm-up has completed and the instance can take traffic.",
+)
+
+STARTUP_SECONDS = Gauge(
+    "rag_startup_seconds",
+    "Seconds from process start until the instance was ready.",
+)
+
+
+def observe_stage_timings(timings_ms: Mapping[str, float]) -> None:
+    for stage, duration_ms in timings_ms.items():
+        STAGE_LATENCY.labels(stage=stage).observe(duration_ms / 1000.0)
+
+
+def record_llm_usage(model: str, input_tokens: int, output_tokens: int, cost: float) -> None:
+    LLM_REQUESTS.labels(model=model).inc()
+    LLM_TOKENS.labels(model=model, kind="input").inc(input_tokens)
+    LLM_TOKENS.labels(model=model, kind="output").inc(output_tokens)
+    LLM_COST.labels(model=model).inc(cost)
+
+
+class _LruCacheCollector:
+    """Reports hit/miss counts of `functools.lru_cache` wrapped dependencies."""
+
+    def __init__(self) -> None:
+        self._caches: Dict[str, Callable] = {}
+
+    def register(self, name: str, cached_fn: Callable) -> None:
+        self._caches[name] = cached_fn
+
+    def collect(self) -> Iterable[CounterMetricFamily]:
+        family = CounterMetricFamily(
+            "rag_lru_cache_lookups",
+            "Lookups against lru_cache wrapped dependencies, by cache and result.",
+            labels=["cache", "result"],
+        )
+        for name, cached_fn in self._caches.items():
+            info = cached_fn.cache_info()
+            family.add_metric([name, "hit"], info.hits)
+            family.add_metric([name, "miss"], info.misses)
+        yield family
+
+
+_lru_collector = _LruCacheCollector()
+REGISTRY.register(_lru_collector)
+
+
+def register_lru_cache(name: str, cached_fn: Callable) -> None:
+    _lru_collector.register(name, cached_fn)
@@ -4,7 +4,7 @@ Model registry for multi-model evaluation.
 All models are accessed via OpenRouter using their OpenRouter model identifiers.
 """
 
-from typing import Dict
+from typing import Dict, List
 
 # Models available for evaluation via OpenRouter
 EVAL_MODELS: Dict[str, str] = {
@@ -21,6 +21,14 @@ EVAL_MODELS: Dict[str, str] = {
     "llama-4-maverick": "meta-llama/llama-4-maverick",
 }
 
+# Tiers used by the model router for requests that do not pin a model.
+# Entries are EVAL_MODELS aliases; an empty tier means "use the configured
+# OpenAI chat model" (the pre-routing default).
+MODEL_TIERS: Dict[str, List[str]] = {
+    "fast": ["llama-4-maverick"],
+    "standard": [],
+}
+
 # Judge model for evaluating answer correctness
 JUDGE_MODEL = "anthropic/claude-opus-4.5"
 
@@ -31,6 +39,8 @@ MODEL_COSTS_PER_1M_TOKENS: Dict[str, Dict[str, float]] = {
     "anthropic/claude-sonnet-4.5": {"input": 3.0, "output": 15.0},
     "google/gemini-3-pro-preview": {"input": 2.0, "output": 12.0},
     "openai/gpt-5.1": {"input": 1.25, "output": 10.0},
+    # Default OPENAI_CHAT_MODEL (called directly, priced the same)
+    "openai/gpt-4.1-mini": {"input": 0.40, "output": 1.60},
     "moonshotai/kimi-k2-thinking": {"input": 0.45, "output": 2.35},
     "meta-llama/llama-4-maverick": {"input": 0.136, "output": 0.68},
 }
@@ -51,6 +61,11 @@ def get_all_model_names() -> list[str]:
     return list(EVAL_MODELS.keys())
 
 
+def get_tier_model_ids(tier: str) -> List[str]:
+    """Get the OpenRouter model IDs configured for a routing tier."""
+    return [get_model_id(name) for name in MODEL_TIERS.get(tier, [])]
+
+
 def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
     """Estimate cost for a model based on token counts (fallback if OpenRouter doesn't provide cost)."""
     if model_id in MODEL_COSTS_PER_1M_TOKENS:
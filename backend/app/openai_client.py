@@ -4,6 +4,9 @@ from typing import Iterable, List, Optional
 
 from openai import OpenAI
 
+from .models_registry import estimate_cost
+from .openrouter_client import ChatResult
+
 
 class OpenAIClient:
     def __init__(
@@ -20,17 +23,31 @@ class OpenAIClient:
         self.chat_model = chat_model
         self.embedding_model = embedding_model
 
-    def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
+    def embed_texts(self, texts: Iterable[str], max_retries: Optional[int] = None) -> List[List[float]]:
+        """
+        Args:
+            texts: Texts to embed in one request
+            max_retries: Override the SDK's retry count (0 lets the caller handle 429s)
+        """
         texts_list = list(texts)
         if not texts_list:
             return []
-        response = self._client.embeddings.create(
+        client = self._client if max_retries is None else self._client.with_options(max_retries=max_retries)
+        response = client.embeddings.create(
             model=self.embedding_model,
             input=texts_list,
         )
         return [item.embedding for item in response.data]
 
+    def warm_up(self, timeout: float = 10.0) -> None:
+        """Open a pooled connection (DNS + TLS) to the provider without spending tokens."""
+        self._client.with_options(timeout=timeout, max_retries=0).models.list()
+
     def chat(self, system_prompt: str, user_message: str) -> str:
+        return self.chat_with_usage(system_prompt, user_message).answer
+
+    def chat_with_usage(self, system_prompt: str, user_message: str) -> ChatResult:
+        """Like `chat`, with token counts from `response.usage` and their estimated cost."""
         response = self._client.chat.completions.create(
             model=self.chat_model,
             messages=[
@@ -39,7 +56,18 @@ class OpenAIClient:
             ],
             temperature=0.1,
         )
-        return response.choices[0].message.content or ""
+        usage = response.usage
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+        return ChatResult(
+            answer=response.choices[0].message.content or "",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=usage.total_tokens if usage else 0,
+            # Priced under the OpenRouter ID of the same model.
+            cost=estimate_cost(f"openai/{self.chat_model}", input_tokens, output_tokens),
+            model=self.chat_model,
+        )
 
 
 
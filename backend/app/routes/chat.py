@@ -1,21 +1,54 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from ..services.llm_text_formatter import format_llm_response
 
+from ..metrics import IN_FLIGHT, observe_stage_timings
+from ..services.admission import AdmissionController, AdmissionRejected, get_admission_controller
 from ..schemas import ChatRequest, ChatResponse, ParseQueryRequest, ParseQueryResponse
 from ..services.rag_service import RAGService, get_rag_service
 from ..services.query_parser import QueryParser, get_query_parser
+from ..services.timing import StageTimer
 
 router = APIRouter()
 
 
-@router.post("", response_model=ChatResponse)
+@router.post("", response_model=ChatResponse, response_model_exclude_none=True)
 def chat(
     request: ChatRequest,
     rag_service: RAGService = Depends(get_rag_service),
-) -> ChatResponse:
-    raw_response = rag_service.answer(request)
-    raw_response.answer = format_llm_response(raw_response.answer)
-    return raw_response
+    admission: AdmissionController = Depends(get_admission_controller),
+) -> Response:
+    timer = StageTimer()
+    try:
+        with admission.admit() as queue_wait_s, IN_FLIGHT.track_inprogress():
+            timer.record("queue", queue_wait_s * 1000.0)
+            raw_response = rag_service.answer(request, timer=timer)
+            with timer.stage("format"):
+                raw_response.answer = format_llm_response(raw_response.answer)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server is busy ({e.reason}). Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+    timer.record("total", timer.elapsed_ms())
+
+    include = set(request.include or ())
+    if "retrieval_debug" in include:
+        exclude = None
+        if raw_response.retrieval_debug is not None:
+            raw_response.retrieval_debug["timings"] = timer.as_dict()
+    else:
+        exclude = {"retrieval_debug"}
+    with timer.stage("serialize"):
+        # Pydantic's Rust serializer is much faster than FastAPI's default
+        # jsonable_encoder + json.dumps round trip for large responses.
+        body = raw_response.model_dump_json(exclude=exclude, exclude_none=True)
+    observe_stage_timings(timer.as_dict())
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Server-Timing": timer.server_timing_header()},
+    )
 
 
 @router.post("/parse-query", response_model=ParseQueryResponse)
@@ -33,6 +66,3 @@ def parse_query(
         needs_clarification=needs_clarification,
         clarification_message=clarification_message,
     )
-
-
-
@@ -7,8 +7,11 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse, HTMLResponse
 
+from ...ingestion.dedup import chunk_sources
+from ...ingestion.manifest import IngestionManifest, manifest_path_for
+from ...ingestion.metadata_schema import Chunk
 from ...vectorstore.chroma_store import ChromaVectorStore
-from ..dependencies import get_app_settings
+from ..dependencies import get_app_settings, get_vector_store
 from ..services.highlight import build_search_phrase
 
 
@@ -16,16 +19,27 @@ router = APIRouter()
 
 
 def _get_vector_store() -> ChromaVectorStore:
-    settings = get_app_settings()
-    return ChromaVectorStore(persist_directory=str(settings.chroma_persist_dir))
+    return get_vector_store()
+
+
+def _resolve_redirect(chunk_id: str) -> str:
+    """Map a chunk ID deleted by a re-index to its replacement (old citation URLs)."""
+    manifest = IngestionManifest.load(manifest_path_for(get_app_settings().chroma_persist_dir))
+    return manifest.resolve(chunk_id) or chunk_id
 
 
 def _load_chunk(doc_id: str, chunk_id: str, store: ChromaVectorStore):
     chunk = store.get_chunk(chunk_id)
+    if chunk is None:
+        chunk = store.get_chunk(_resolve_redirect(chunk_id))
     if chunk is None:
         raise HTTPException(status_code=404, detail="Chunk not found.")
     chunk_doc_id = str(chunk.metadata.get("doc_id") or "")
     if chunk_doc_id and chunk_doc_id != doc_id:
+        # A deduplicated chunk is shared; view it at the requested document's copy.
+        for source in chunk_sources(chunk.metadata):
+            if source.get("doc_id") == doc_id:
+                return Chunk(chunk_id=chunk.chunk_id, text=chunk.text, metadata={**chunk.metadata, **source})
         raise HTTPException(status_code=404, detail="Chunk does not belong to the requested document.")
     return chunk
 
@@ -98,7 +112,7 @@ def view_document_chunk(doc_id: str, chunk_id: str, store: ChromaVectorStore = D
         raise HTTPException(status_code=404, detail="Local file path is not available for this chunk.")
     page = chunk.metadata.get("page_start") or 1
     phrase = build_search_phrase(chunk.text)
-    pdf_src = f"/documents/{doc_id}/chunks/{chunk_id}/file"
+    pdf_src = f"/documents/{doc_id}/chunks/{chunk.chunk_id}/file"
     snippet_source = chunk.text
     snippet_html = _format_snippet(snippet_source, phrase)
     page_label = escape(str(page))
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..warmup import WARMUP_STATE
 
 router = APIRouter()
 
@@ -8,4 +11,20 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/live")
+def live() -> dict:
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
 
+@router.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness: 503 until startup warm-up has finished successfully."""
+    report = WARMUP_STATE.as_dict()
+    if report["ready"]:
+        status = "ready"
+    elif report["warmup_finished"]:
+        status = "warmup_failed"
+    else:
+        status = "warming_up"
+    return JSONResponse(status_code=200 if report["ready"] else 503, content={"status": status, **report})
@@ -1,8 +1,21 @@
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel
 
 
+class CitationSource(BaseModel):
+    """Another document the cited chunk's text appears in (deduplicated at index time)."""
+    doc_id: str
+    doc_title: Optional[str] = None
+    filing_type: Optional[str] = None
+    period: Optional[str] = None
+    page: Optional[int] = None
+    line_start: Optional[int] = None
+    line_end: Optional[int] = None
+    source_url: Optional[str] = None
+    highlight_url: Optional[str] = None
+
+
 class Citation(BaseModel):
     doc_id: str
     doc_title: Optional[str] = None
@@ -19,6 +32,7 @@ class Citation(BaseModel):
     highlight_url: Optional[str] = None
     text: Optional[str] = None  # Text preview for citation
     relevance_score: Optional[float] = None  # Relevance score (lower = more relevant)
+    sources: Optional[List[CitationSource]] = None  # Every document with this text, when shared
 
 
 class UsageInfo(BaseModel):
@@ -29,12 +43,18 @@ class UsageInfo(BaseModel):
     cost: float = 0.0  # Cost in USD
 
 
+# Optional ChatResponse content a client can opt in to via ChatRequest.include.
+# By default a response carries the answer plus compact citations.
+ResponseField = Literal["raw_context", "retrieval_debug", "citation_text"]
+
+
 class ChatRequest(BaseModel):
     question: str
     tickers: Optional[List[str]] = None
     period: Optional[str] = None
     top_k: int = 8
     model: Optional[str] = None  # OpenRouter model ID for evaluation
+    include: Optional[List[ResponseField]] = None  # Opt-in debug fields (raw_context, retrieval_debug, full citation text)
 
 
 class ChatResponse(BaseModel):
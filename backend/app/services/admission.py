@@ -0,0 +1,121 @@
+"""
+Admission control for /chat.
+
+A global concurrency cap bounds how many requests run the RAG pipeline at
+once; excess requests wait in a bounded queue until a slot frees up or their
+deadline passes. OpenRouter models additionally get per-model semaphores so a
+single slow provider cannot absorb every slot.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator
+
+from ..dependencies import get_app_settings
+from ..metrics import ADMISSION_REJECTIONS, QUEUE_DEPTH, QUEUE_WAIT
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after_s: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 16,
+        queue_timeout_s: float = 10.0,
+        per_model_concurrency: int = 4,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_queue = max(0, max_queue)
+        self._queue_timeout_s = queue_timeout_s
+        self._per_model_concurrency = max(1, per_model_concurrency)
+        self._alpha = ewma_alpha
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._avg_service_s = 1.0
+
+        self._model_lock = threading.Lock()
+        self._model_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def retry_after_s(self) -> int:
+        """Rough time until a queued request would be served, in whole seconds."""
+        backlog = self._waiting + self._active
+        return max(1, math.ceil(backlog * self._avg_service_s / self._max_concurrency))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        return AdmissionRejected(reason, self.retry_after_s())
+
+    @contextmanager
+    def admit(self) -> Iterator[float]:
+        """Hold one of the global slots for the duration of the block; yields the queue wait in seconds."""
+        enqueued = time.perf_counter()
+        with self._cond:
+            if self._active >= self._max_concurrency:
+                if self._waiting >= self._max_queue:
+                    raise self._reject("queue_full")
+                self._waiting += 1
+                QUEUE_DEPTH.set(self._waiting)
+                try:
+                    deadline = enqueued + self._queue_timeout_s
+                    while self._active >= self._max_concurrency:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            raise self._reject("queue_timeout")
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                    QUEUE_DEPTH.set(self._waiting)
+            self._active += 1
+
+        started = time.perf_counter()
+        QUEUE_WAIT.observe(started - enqueued)
+        try:
+            yield started - enqueued
+        finally:
+            service_s = time.perf_counter() - started
+            with self._cond:
+                self._active -= 1
+                self._avg_service_s = self._alpha * service_s + (1 - self._alpha) * self._avg_service_s
+                self._cond.notify()
+
+    @contextmanager
+    def model_slot(self, model_id: str) -> Iterator[None]:
+        """Hold a per-model slot; waits at most the queue timeout."""
+        with self._model_lock:
+            semaphore = self._model_semaphores.get(model_id)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self._per_model_concurrency)
+                self._model_semaphores[model_id] = semaphore
+        if not semaphore.acquire(timeout=self._queue_timeout_s):
+            raise self._reject("model_busy")
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    settings = get_app_settings()
+    return AdmissionController(
+        max_concurrency=settings.chat_max_concurrency,
+        max_queue=settings.chat_max_queue,
+        queue_timeout_s=settings.chat_queue_timeout_s,
+        per_model_concurrency=settings.openrouter_model_concurrency,
+    )
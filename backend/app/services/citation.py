@@ -2,13 +2,25 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
+from ...ingestion.dedup import chunk_sources
 from ...ingestion.metadata_schema import Chunk
-from ..schemas import Citation
+from ..schemas import Citation, CitationSource
 from .highlight import append_pdf_fragment, build_search_phrase
 
+CITATION_PREVIEW_CHARS = 500  # full preview, returned when a client includes "citation_text"
+COMPACT_PREVIEW_CHARS = 200
 
-def _build_highlight_url(chunk: Chunk) -> Optional[str]:
-    meta: Dict[str, Any] = chunk.metadata
+
+def _positive_int(value: Any) -> Optional[int]:
+    try:
+        number = int(value)
+    except (ValueError, TypeError):
+        return None
+    return number if number > 0 else None
+
+
+def _build_highlight_url(chunk: Chunk, source: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    meta: Dict[str, Any] = {**chunk.metadata, **(source or {})}
     doc_id = str(meta.get("doc_id") or "")
     chunk_id = str(meta.get("chunk_id") or "")
     page = meta.get("page_start")
@@ -24,12 +36,37 @@ def _build_highlight_url(chunk: Chunk) -> Optional[str]:
     return None
 
 
-def build_citations(chunks_with_scores: List[Tuple[Chunk, float]]) -> List[Citation]:
+def _build_sources(chunk: Chunk) -> Optional[List[CitationSource]]:
+    """Locations of every copy of a deduplicated chunk's text, or None for unshared chunks."""
+    sources = chunk_sources(chunk.metadata)
+    if len(sources) < 2:
+        return None
+    return [
+        CitationSource(
+            doc_id=str(src.get("doc_id") or ""),
+            doc_title=str(src.get("title") or ""),
+            filing_type=str(src.get("filing_type") or ""),
+            period=str(src.get("period") or ""),
+            page=_positive_int(src.get("page_start")),
+            line_start=_positive_int(src.get("line_start")),
+            line_end=_positive_int(src.get("line_end")),
+            source_url=str(src.get("source_url") or "") or None,
+            highlight_url=_build_highlight_url(chunk, src),
+        )
+        for src in sources
+    ]
+
+
+def build_citations(
+    chunks_with_scores: List[Tuple[Chunk, float]],
+    preview_chars: int = CITATION_PREVIEW_CHARS,
+) -> List[Citation]:
     """
     Build citations from chunks with their relevance scores.
     
     Args:
         chunks_with_scores: List of (Chunk, score) tuples where score is distance (lower = more relevant)
+        preview_chars: Length of the text preview attached to each citation
     
     Returns:
         List of Citation objects ordered by relevance
@@ -85,8 +122,9 @@ def build_citations(chunks_with_scores: List[Tuple[Chunk, float]]) -> List[Citat
                 source_url=str(meta.get("source_url") or "") or None,
                 chunk_id=str(meta.get("chunk_id") or "") or None,
                 highlight_url=_build_highlight_url(ch),
-                text=ch.text[:500] if ch.text else None,  # Add text preview (first 500 chars)
+                text=ch.text[:preview_chars] if ch.text else None,  # Text preview
                 relevance_score=similarity_score,  # Relevance score (0-1, higher = more relevant)
+                sources=_build_sources(ch),
             )
         )
     return citations
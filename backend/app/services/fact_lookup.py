@@ -0,0 +1,325 @@
+"""
+Fast path for exact metric lookups ("What were LOW's net sales in Q1-2026?").
+
+Questions naming one ticker, one period and a metric that is a row label of
+an indexed table are answered straight from the facts store
+(`ingestion/facts.py`), with a citation of the table row, in a few
+milliseconds and without embedding or LLM calls. Confidence is the share of
+the question's content words the matched metric name covers; below the
+threshold, or when the matching rows disagree, the question falls through to
+full RAG.
+
+When SEC XBRL company facts are loaded (`ingestion/sources/xbrl_client.py`),
+metrics with a standard concept (revenue, net income, EPS, ...) are looked up
+there first: one tagged value per filing period, cited to the filing on EDGAR.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...ingestion.facts import Fact, FactDocument, FactsStore, facts_path_for, normalize_metric
+from ...ingestion.metadata_schema import Chunk
+from ...ingestion.sources.xbrl_client import XbrlFact, XbrlFactsStore
+from ..dependencies import get_app_settings
+from ..metrics import FACT_LOOKUPS
+from ..schemas import ChatRequest, Citation
+from .citation import build_citations
+from .model_router import RoutingFeatures
+
+# Row labels that name the same figure in different companies' statements.
+METRIC_ALIASES: Tuple[Tuple[str, ...], ...] = (
+    ("revenue", "revenues", "total revenue", "total revenues", "net revenue", "net revenues",
+     "net sales", "total net sales", "sales"),
+    ("net income", "net earnings", "net income loss", "net earnings loss", "profit"),
+    ("diluted eps", "diluted earnings per share", "earnings per share diluted", "diluted net income per share",
+     "net income per share diluted", "diluted earnings per common share"),
+    ("operating income", "operating income loss", "income from operations", "operating profit"),
+    ("basic eps", "basic earnings per share", "earnings per share basic", "basic net income per share",
+     "net income per share basic", "basic earnings per common share"),
+    ("gross profit", "gross margin", "total gross margin"),
+    ("research and development", "research and development expense", "research and development expenses",
+     "r and d"),
+    ("operating cash flow", "cash flow from operations", "cash generated by operating activities",
+     "net cash provided by operating activities", "cash provided by operating activities"),
+    ("capex", "capital expenditures", "purchases of property and equipment",
+     "payments for acquisition of property plant and equipment"),
+)
+_ALIASES: Dict[str, Tuple[str, ...]] = {name: group for group in METRIC_ALIASES for name in group}
+
+# Question words that never distinguish one metric from another.
+_STOPWORDS = frozenset(
+    """
+    a an and are as at by company did do does during for from give how in is it its me much of on please quarter
+    quarterly fiscal period report reported reports s show tell the their they this total value was were what
+    which year
+    """.split()
+)
+_PERIOD = re.compile(r"\b(?:q([1-4])[-\s]?(?:fy)?[-\s]?(\d{4})|fy[-\s]?(\d{4}))\b", re.IGNORECASE)
+_UPPER_WORD = re.compile(r"\b[A-Z]{1,5}\b")
+_SCALE_WORDS = {1e3: "thousand", 1e6: "million", 1e9: "billion"}
+
+
+@dataclass
+class FactMatch:
+    """Outcome of a lookup: the facts answering the question, or why there are none."""
+    ticker: Optional[str] = None
+    period: Optional[str] = None
+    metrics: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+    reason: str = ""
+    facts: List[Fact] = field(default_factory=list)
+    documents: Dict[str, FactDocument] = field(default_factory=dict)
+    # "tables" (facts.sqlite rows from indexed documents) or "xbrl" (SEC company facts).
+    source: str = "tables"
+
+    @property
+    def answered(self) -> bool:
+        return self.reason == "answered"
+
+    def as_debug(self) -> Dict[str, Any]:
+        return {
+            "ticker": self.ticker,
+            "period": self.period,
+            "metrics": self.metrics,
+            "confidence": round(self.confidence, 3),
+            "reason": self.reason,
+            "source": self.source,
+            "facts": len(self.facts),
+        }
+
+
+def format_fact_value(fact: Fact) -> str:
+    """'$20,930 million', '-$926 million', '$4.27 per share', '33.8%', '572 million shares'."""
+    if fact.value.is_integer():
+        number = f"{abs(fact.value):,.0f}"
+    elif fact.unit in ("USD", "USD/share"):
+        number = f"{abs(fact.value):,.2f}"
+    else:
+        number = f"{abs(fact.value):,.4f}".rstrip("0")
+    sign = "-" if fact.value < 0 else ""
+    scale_word = _SCALE_WORDS.get(fact.scale)
+    suffix = f" {scale_word}" if scale_word else ""
+    if fact.unit == "%":
+        return f"{sign}{number}%"
+    if fact.unit == "USD/share":
+        return f"{sign}${number} per share"
+    if fact.unit == "USD":
+        return f"{sign}${number}{suffix}"
+    if fact.unit == "shares":
+        return f"{sign}{number}{suffix} shares"
+    return f"{sign}{number}{suffix}"
+
+
+def _from_xbrl(fact: XbrlFact, metric: str) -> Tuple[Fact, FactDocument]:
+    """An XBRL value as a Fact (in millions where the table facts would be) and its filing as the document."""
+    unit = {"USD/shares": "USD/share", "pure": ""}.get(fact.unit, fact.unit)
+    scale = 1e6 if unit in ("USD", "shares") and abs(fact.value) >= 1e6 else 1.0
+    doc_id = f"{fact.ticker}_{fact.period}_xbrl_{fact.accession}"
+    span = f"{fact.start} to {fact.end}" if fact.start else f"as of {fact.end}"
+    number = f"{fact.value:,.0f}" if fact.value.is_integer() else f"{fact.value:,}"
+    converted = Fact(
+        doc_id=doc_id,
+        ticker=fact.ticker,
+        period=fact.period,
+        metric=metric,
+        label=metric,
+        value=fact.value / scale,
+        unit=unit,
+        scale=scale,
+        column_index=0,
+        column_header=span,
+        is_current=True,
+        page=None,
+        table_id=fact.concept,
+        line=None,
+        row_text=f"{fact.concept} ({fact.unit}, {span}): {number}",
+    )
+    document = FactDocument(
+        doc_id=doc_id,
+        ticker=fact.ticker,
+        period=fact.period,
+        filing_type=fact.form,
+        title=f"{fact.ticker} {fact.form} filed {fact.filed} (XBRL)",
+        source_url=fact.filing_url,
+    )
+    return converted, document
+
+
+def _question_period(question: str) -> List[str]:
+    periods = []
+    for quarter, year, fiscal_year in _PERIOD.findall(question):
+        periods.append(f"Q{quarter}-{year}" if quarter else f"FY-{fiscal_year}")
+    return list(dict.fromkeys(periods))
+
+
+class FactLookup:
+    def __init__(
+        self, store: FactsStore, min_confidence: float = 0.75, xbrl: Optional[XbrlFactsStore] = None
+    ) -> None:
+        self.store = store
+        self.min_confidence = min_confidence
+        self.xbrl = xbrl
+
+    def _resolve_ticker(self, request: ChatRequest) -> Tuple[Optional[str], str]:
+        if request.tickers:
+            tickers = list(dict.fromkeys(t.upper() for t in request.tickers))
+        else:
+            known = set(self.store.tickers()) | set(self.xbrl.tickers() if self.xbrl else [])
+            tickers = list(dict.fromkeys(w for w in _UPPER_WORD.findall(request.question) if w in known))
+        if len(tickers) != 1:
+            return None, "no_ticker" if not tickers else "multiple_tickers"
+        return tickers[0], ""
+
+    def _resolve_period(self, request: ChatRequest) -> Tuple[Optional[str], str]:
+        periods = [request.period] if request.period else _question_period(request.question)
+        if len(periods) != 1:
+            return None, "no_period" if not periods else "multiple_periods"
+        return periods[0].upper(), ""
+
+    def _match_metrics(self, words: List[str], content: set, metrics: List[str]) -> Tuple[List[str], float]:
+        """Metrics whose name (or an alias) appears in the question, best coverage first."""
+        text = f" {' '.join(words)} "
+        scored: Dict[str, Tuple[float, int, int]] = {}
+        for metric in metrics:
+            for phrase in (metric,) + tuple(p for p in _ALIASES.get(metric, ()) if p != metric):
+                if f" {phrase} " not in text:
+                    continue
+                covered = len(content & set(phrase.split()))
+                # Exact label matches beat aliases, longer labels beat their prefixes.
+                key = (covered / len(content) if content else 0.0, int(phrase == metric), len(metric.split()))
+                scored[metric] = max(scored.get(metric, key), key)
+        if not scored:
+            return [], 0.0
+        best = max(scored.values())
+        return [m for m, key in scored.items() if key == best], best[0]
+
+    def lookup(self, request: ChatRequest, features: Optional[RoutingFeatures] = None) -> FactMatch:
+        """
+        Find the facts answering `request`.
+
+        `features` (from the model router) rule out comparisons and questions
+        spanning several periods, which need the full pipeline.
+        """
+        match = FactMatch()
+        if features is not None and (features.comparison or features.period_count > 1):
+            match.reason = "not_a_lookup"
+            return match
+        match.ticker, reason = self._resolve_ticker(request)
+        if match.ticker is None:
+            match.reason = reason
+            return match
+        match.period, reason = self._resolve_period(request)
+        if match.period is None:
+            match.reason = reason
+            return match
+        metrics = self.store.metrics(match.ticker, match.period)
+        xbrl_metrics = self.xbrl.metrics(match.ticker, match.period) if self.xbrl else []
+        if not metrics and not xbrl_metrics:
+            match.reason = "no_facts"
+            return match
+
+        # Ticker, period and company-name words (from document titles) are not part of the metric.
+        ignored = {match.ticker.lower()} | set(normalize_metric(match.period).split())
+        for title in self.store.titles(match.ticker, match.period):
+            ignored |= set(normalize_metric(title).split())
+        words = normalize_metric(request.question).split()
+        content = {w for w in words if w not in _STOPWORDS and w not in ignored}
+        if xbrl_metrics and self._lookup_xbrl(match, words, content, xbrl_metrics):
+            return match
+        match.metrics, match.confidence = self._match_metrics(words, content, metrics)
+        if not match.metrics:
+            match.reason = "no_metric"
+            return match
+
+        facts = [f for metric in match.metrics for f in self.store.lookup(match.ticker, match.period, metric)]
+        if not facts:
+            match.reason = "no_current_value"
+            return match
+        values = {(round(f.scaled_value, 6), f.unit) for f in facts}
+        if len(values) > 1:
+            # Several rows with this label (segments, restated tables) disagree.
+            match.reason = "conflicting_values"
+            match.confidence = 0.0
+            return match
+        match.facts = facts
+        if match.confidence < self.min_confidence:
+            match.reason = "low_confidence"
+            return match
+        for fact in facts:
+            if fact.doc_id not in match.documents:
+                document = self.store.document(fact.doc_id)
+                if document is not None:
+                    match.documents[fact.doc_id] = document
+        match.reason = "answered"
+        return match
+
+    def _lookup_xbrl(self, match: FactMatch, words: List[str], content: set, metrics: List[str]) -> bool:
+        """Answer from XBRL company facts when a standard metric matches confidently and has a value."""
+        names, confidence = self._match_metrics(words, content, metrics)
+        if not names or confidence < self.min_confidence:
+            return False
+        found = [(name, self.xbrl.lookup(match.ticker, match.period, name)) for name in names]
+        found = [(name, fact) for name, fact in found if fact is not None]
+        if len(found) != 1:
+            # No value spanning the period (a Q2 filing's cash flows are year-to-date), or ambiguous.
+            return False
+        fact, document = _from_xbrl(found[0][1], found[0][0])
+        match.metrics, match.confidence = names, confidence
+        match.facts = [fact]
+        match.documents = {document.doc_id: document}
+        match.source = "xbrl"
+        match.reason = "answered"
+        return True
+
+    def answer_text(self, match: FactMatch) -> str:
+        fact = match.facts[0]
+        cited: List[str] = []
+        for doc_id, document in list(match.documents.items())[:2]:
+            page = next((f.page for f in match.facts if f.doc_id == doc_id and f.page), None)
+            cited.append(f"{document.title or doc_id}" + (f" (page {page})" if page else ""))
+        source = f", according to {' and '.join(cited)}" if cited else ""
+        return f"{match.ticker} reported {fact.label} of {format_fact_value(fact)} for {match.period}{source}."
+
+    def citations(self, match: FactMatch, preview_chars: int) -> List[Citation]:
+        """One citation per document, pointing at the first matching table row."""
+        chunks = []
+        seen = set()
+        for fact in match.facts:
+            document = match.documents.get(fact.doc_id)
+            if fact.doc_id in seen or document is None:
+                continue
+            seen.add(fact.doc_id)
+            metadata = {
+                "doc_id": fact.doc_id,
+                "title": document.title,
+                "ticker": fact.ticker,
+                "filing_type": document.filing_type,
+                "period": fact.period,
+                "page_start": fact.page,
+                "line_start": fact.line,
+                "line_end": fact.line,
+                "table_id": fact.table_id,
+                "source_url": document.source_url,
+                "local_path": document.local_path,
+                "chunk_id": fact.chunk_id or "",
+            }
+            chunks.append((Chunk(chunk_id=fact.chunk_id or "", text=fact.row_text, metadata=metadata), None))
+        return build_citations(chunks, preview_chars=preview_chars)
+
+
+def record_fact_lookup(match: FactMatch) -> None:
+    FACT_LOOKUPS.labels(result="answered" if match.answered else "fallthrough").inc()
+
+
+@lru_cache
+def get_fact_lookup() -> Optional[FactLookup]:
+    """Shared lookup over the facts store next to the Chroma directory (None when disabled)."""
+    settings = get_app_settings()
+    if not settings.facts_fast_path:
+        return None
+    path = facts_path_for(settings.chroma_persist_dir)
+    return FactLookup(FactsStore(path), min_confidence=settings.facts_min_confidence, xbrl=XbrlFactsStore(path))
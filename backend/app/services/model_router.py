@@ -0,0 +1,222 @@
+"""
+Latency/cost-aware model routing for chat requests that do not pin a model.
+
+The router scores a question with cheap features (length, number of tickers
+and periods, comparison wording, spread of retrieval distances) and maps it
+to a tier from `models_registry.MODEL_TIERS`. Within a tier it prefers the
+model with the lowest exponentially weighted latency, skipping models whose
+recent error rate is too high. A skipped model gets one probe call per
+`error_cooldown_s`; a successful probe clears its error rate.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...ingestion.metadata_schema import Chunk
+from ..config import MODEL_ROUTING_MODES
+from ..dependencies import get_app_settings
+from ..metrics import ROUTER_DECISIONS
+from ..models_registry import MODEL_COSTS_PER_1M_TOKENS, get_tier_model_ids
+from ..schemas import ChatRequest
+
+_PERIOD_MENTION = re.compile(r"\b(?:q[1-4][-\s]?(?:fy)?\d{2,4}|fy[-\s]?\d{2,4}|(?:19|20)\d{2})\b", re.IGNORECASE)
+_COMPARISON_WORDS = re.compile(
+    r"\b(compare|compared|comparison|versus|vs\.?|relative to|difference|differ|trend|"
+    r"why|explain|drivers?|outlook|guidance|over time|between|each|all)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class RoutingFeatures:
+    word_count: int
+    ticker_count: int
+    period_count: int
+    comparison: bool
+    best_distance: Optional[float]
+    score_spread: Optional[float]
+
+
+@dataclass
+class RoutingDecision:
+    mode: str
+    tier: str
+    model_id: Optional[str]  # None means the configured OpenAI chat model
+    reason: str
+    features: RoutingFeatures
+
+    def as_debug(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "tier": self.tier,
+            "model": self.model_id,
+            "reason": self.reason,
+            "features": asdict(self.features),
+        }
+
+
+@dataclass
+class ModelStats:
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    samples: int = 0
+    # While unhealthy, the model is skipped until this (clock) time, then probed.
+    retry_at: float = 0.0
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        mode: str = "shadow",
+        *,
+        fast_tier_available: bool = True,
+        ewma_alpha: float = 0.2,
+        max_error_rate: float = 0.3,
+        min_error_samples: int = 5,
+        error_cooldown_s: float = 60.0,
+        fast_max_words: int = 25,
+        flat_spread: float = 0.05,
+        weak_distance: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if mode not in MODEL_ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode: {mode}. Expected one of {MODEL_ROUTING_MODES}")
+        self.mode = mode
+        self._fast_tier_available = fast_tier_available
+        self._alpha = ewma_alpha
+        self._max_error_rate = max_error_rate
+        self._min_error_samples = min_error_samples
+        self._error_cooldown_s = error_cooldown_s
+        self._clock = clock
+        self._fast_max_words = fast_max_words
+        self._flat_spread = flat_spread
+        self._weak_distance = weak_distance
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def extract_features(
+        self, request: ChatRequest, ranked: List[Tuple[Chunk, float]]
+    ) -> RoutingFeatures:
+        question = request.question
+        if request.tickers:
+            ticker_count = len({t.upper() for t in request.tickers})
+        else:
+            # Without explicit filters, the retrieved chunks tell us how many
+            # companies the question touched.
+            ticker_count = len({str(c.metadata.get("ticker") or "").upper() for c, _ in ranked} - {""})
+
+        period_mentions = {m.lower().replace(" ", "-") for m in _PERIOD_MENTION.findall(question)}
+        period_count = len(period_mentions) or (1 if request.period else 0)
+
+        distances = [score for _, score in ranked]
+        return RoutingFeatures(
+            word_count=len(question.split()),
+            ticker_count=ticker_count,
+            period_count=period_count,
+            comparison=bool(_COMPARISON_WORDS.search(question)),
+            best_distance=min(distances) if distances else None,
+            score_spread=(max(distances) - min(distances)) if distances else None,
+        )
+
+    def _complexity_reasons(self, features: RoutingFeatures) -> List[str]:
+        reasons: List[str] = []
+        if features.word_count > self._fast_max_words:
+            reasons.append("long_question")
+        if features.ticker_count > 1:
+            reasons.append("multiple_tickers")
+        if features.period_count > 1:
+            reasons.append("multiple_periods")
+        if features.comparison:
+            reasons.append("comparison_wording")
+        if (
+            features.score_spread is not None
+            and features.best_distance is not None
+            and features.score_spread < self._flat_spread
+            and features.best_distance > self._weak_distance
+        ):
+            # Many equally mediocre chunks: the answer needs synthesis.
+            reasons.append("flat_retrieval")
+        return reasons
+
+    def _unhealthy(self, stats: ModelStats) -> bool:
+        return stats.samples >= self._min_error_samples and stats.error_rate > self._max_error_rate
+
+    def _pick_model(self, tier: str) -> Optional[str]:
+        candidates: List[Tuple[float, float, str]] = []
+        now = self._clock()
+        with self._lock:
+            for model_id in get_tier_model_ids(tier):
+                stats = self._stats.get(model_id, ModelStats())
+                if self._unhealthy(stats):
+                    if now < stats.retry_at:
+                        continue
+                    # Cooldown over: this request probes the model; others wait another cooldown.
+                    stats.retry_at = now + self._error_cooldown_s
+                    return model_id
+                expected_ms = (stats.latency_ms or 0.0) * (1.0 + stats.error_rate)
+                costs = MODEL_COSTS_PER_1M_TOKENS.get(model_id, {})
+                blended_cost = costs.get("input", 0.0) + costs.get("output", 0.0)
+                candidates.append((expected_ms, blended_cost, model_id))
+        if not candidates:
+            return None
+        return min(candidates)[2]
+
+    def choose(self, request: ChatRequest, ranked: List[Tuple[Chunk, float]]) -> RoutingDecision:
+        features = self.extract_features(request, ranked)
+        reasons = self._complexity_reasons(features)
+
+        tier, model_id = "standard", None
+        if reasons:
+            reason = ",".join(reasons)
+        elif not self._fast_tier_available:
+            reason = "fast_tier_unavailable"
+        else:
+            model_id = self._pick_model("fast")
+            if model_id is None:
+                reason = "fast_tier_unhealthy"
+            else:
+                tier, reason = "fast", "simple_lookup"
+
+        ROUTER_DECISIONS.labels(mode=self.mode, tier=tier).inc()
+        return RoutingDecision(mode=self.mode, tier=tier, model_id=model_id, reason=reason, features=features)
+
+    def record(self, model_id: str, latency_ms: float, error: bool) -> None:
+        """Fold one completed (or failed) call into the model's EWMA stats."""
+        with self._lock:
+            stats = self._stats.setdefault(model_id, ModelStats())
+            err = 1.0 if error else 0.0
+            if self._unhealthy(stats) and not error:
+                # A successful probe: the burst of errors is over.
+                stats.error_rate = 0.0
+            elif stats.samples == 0:
+                stats.error_rate = err
+            else:
+                stats.error_rate = self._alpha * err + (1 - self._alpha) * stats.error_rate
+            if not error:
+                if stats.latency_ms is None:
+                    stats.latency_ms = latency_ms
+                else:
+                    stats.latency_ms = self._alpha * latency_ms + (1 - self._alpha) * stats.latency_ms
+            stats.samples += 1
+            if error and self._unhealthy(stats):
+                stats.retry_at = self._clock() + self._error_cooldown_s
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {model_id: asdict(stats) for model_id, stats in self._stats.items()}
+
+
+@lru_cache
+def get_model_router() -> ModelRouter:
+    """Process-wide router so latency/error statistics survive across requests."""
+    settings = get_app_settings()
+    return ModelRouter(
+        mode=settings.model_routing_mode,
+        fast_tier_available=bool(settings.openrouter_api_key),
+    )
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import time
 from typing import List, Optional, Tuple, Dict
 
 from ...ingestion.metadata_schema import Chunk
 from ...vectorstore.chroma_store import ChromaVectorStore
-from ..dependencies import get_app_settings, get_openai_client, get_openrouter_client
+from ..dependencies import get_openai_client, get_openrouter_client, get_vector_store
+from ..metrics import record_llm_usage
 from ..models_registry import get_model_id
 from ..openai_client import OpenAIClient
 from ..openrouter_client import OpenRouterClient
 from ..schemas import ChatRequest, ChatResponse, UsageInfo
-from .citation import build_citations
+from .admission import AdmissionController, get_admission_controller
+from .citation import COMPACT_PREVIEW_CHARS, CITATION_PREVIEW_CHARS, build_citations
+from .fact_lookup import FactLookup, FactMatch, get_fact_lookup, record_fact_lookup
+from .model_router import ModelRouter, RoutingDecision, get_model_router
 from .ranking import rerank_by_distance
 from .retriever import Retriever
+from .timing import StageTimer
 
 MIN_SIMILARITY = 0.35  # drop low-signal chunks (cosine distance -> similarity)
 
@@ -49,11 +55,17 @@ class RAGService:
         vector_store: ChromaVectorStore,
         openai_client: Optional[OpenAIClient] = None,
         openrouter_client: Optional[OpenRouterClient] = None,
+        model_router: Optional[ModelRouter] = None,
+        admission: Optional[AdmissionController] = None,
+        facts: Optional[FactLookup] = None,
     ) -> None:
         self._vector_store = vector_store
         self._retriever = Retriever(vector_store)
         self._openai = openai_client or get_openai_client()
         self._openrouter = openrouter_client
+        self._router = model_router or get_model_router()
+        self._admission = admission or get_admission_controller()
+        self._facts = facts
 
     def get_available_periods(self, ticker: str) -> List[str]:
         """
@@ -220,7 +232,13 @@ class RAGService:
         
         return msg
 
-    def answer(self, request: ChatRequest) -> ChatResponse:
+    def answer(self, request: ChatRequest, timer: Optional[StageTimer] = None) -> ChatResponse:
+        """
+        Answer a chat request. Stage durations are recorded on `timer` (a fresh
+        one is created when omitted) and echoed in `retrieval_debug.timings`.
+        """
+        timer = timer or StageTimer()
+
         # Basic guardrail for empty/whitespace-only questions
         if not request.question.strip():
             return ChatResponse(
@@ -229,9 +247,24 @@ class RAGService:
                 raw_context=None,
                 model=None,
                 usage=None,
-                retrieval_debug={"skipped": True, "reason": "empty_question"},
+                retrieval_debug={"skipped": True, "reason": "empty_question", "timings": timer.as_dict()},
             )
 
+        # Exact metric lookups are answered from the facts store when confident.
+        # A pinned model means the caller wants that model's answer.
+        fact_match: Optional[FactMatch] = None
+        if self._facts is not None and not request.model:
+            with timer.stage("facts"):
+                try:
+                    fact_match = self._facts.lookup(request, self._router.extract_features(request, []))
+                except Exception as e:
+                    print(f"⚠️ Facts lookup failed, using full RAG: {e}")
+            if fact_match is not None:
+                record_fact_lookup(fact_match)
+                if fact_match.answered:
+                    return self._fact_response(request, fact_match, timer)
+        facts_debug = {"facts": fact_match.as_debug()} if fact_match is not None else {}
+
         # Retrieve relevant chunks
         chunks_with_scores = self._retriever.retrieve(
             query=request.question,
@@ -239,15 +272,17 @@ class RAGService:
             tickers=request.tickers,
             period=request.period,
             min_similarity=MIN_SIMILARITY,
+            timer=timer,
         )
         
         # ✅ CHECK IF NO RESULTS FOUND
         if not chunks_with_scores or len(chunks_with_scores) == 0:
             # Build helpful message with available periods
-            availability_msg = self._build_availability_message(
-                requested_tickers=request.tickers,
-                requested_period=request.period
-            )
+            with timer.stage("availability"):
+                availability_msg = self._build_availability_message(
+                    requested_tickers=request.tickers,
+                    requested_period=request.period
+                )
             
             return ChatResponse(
                 answer=availability_msg,
@@ -265,50 +300,70 @@ class RAGService:
                     "retrieved": 0,
                     "filtered": 0,
                     "min_similarity_threshold": MIN_SIMILARITY,
+                    "timings": timer.as_dict(),
+                    **facts_debug,
                 },
             )
         
         # Continue with normal RAG flow
-        ranked = rerank_by_distance(chunks_with_scores)
-        context = _format_context(ranked)
-        system_prompt = SYSTEM_PROMPT + "\n\nContext:\n" + context
+        with timer.stage("rerank"):
+            ranked = rerank_by_distance(chunks_with_scores)
+        with timer.stage("build_prompt"):
+            context = _format_context(ranked)
+            system_prompt = SYSTEM_PROMPT + "\n\nContext:\n" + context
 
-        # Use OpenRouter if a specific model is requested, otherwise use default OpenAI client
+        # Use OpenRouter if a specific model is requested. Otherwise the router
+        # may send simple lookups to a cheaper tier; the default OpenAI client
+        # handles everything else (and routed calls that fail).
         usage_info: Optional[UsageInfo] = None
         model_used: Optional[str] = None
+        decision: Optional[RoutingDecision] = None
 
         if request.model:
             # Use OpenRouter for multi-model evaluation
-            model_id = get_model_id(request.model)
-            openrouter = self._openrouter or get_openrouter_client(model_id)
-            result = openrouter.chat(
-                system_prompt=system_prompt,
-                user_message=request.question,
-                model=model_id,
+            answer_text, usage_info, model_used = self._chat_openrouter(
+                get_model_id(request.model), system_prompt, request.question, timer
             )
-            answer_text = result.answer
-            usage_info = UsageInfo(
-                input_tokens=result.input_tokens,
-                output_tokens=result.output_tokens,
-                total_tokens=result.total_tokens,
-                cost=result.cost,
-            )
-            model_used = result.model
         else:
-            # Use default OpenAI client
-            answer_text = self._openai.chat(system_prompt=system_prompt, user_message=request.question)
+            routed_model: Optional[str] = None
+            if self._router.mode != "off":
+                decision = self._router.choose(request, ranked)
+                if self._router.mode == "shadow":
+                    print(
+                        f"🔀 Router (shadow): would use tier={decision.tier} "
+                        f"model={decision.model_id or self._openai.chat_model} ({decision.reason})"
+                    )
+                else:
+                    routed_model = decision.model_id
+
+            answer_text = None
+            if routed_model:
+                try:
+                    answer_text, usage_info, model_used = self._chat_openrouter(
+                        routed_model, system_prompt, request.question, timer
+                    )
+                except Exception as e:
+                    print(f"⚠️ Routed model {routed_model} failed, falling back to default: {e}")
+            if answer_text is None:
+                answer_text, usage_info = self._chat_default(system_prompt, request.question, timer)
 
         chunks_with_scores = ranked  # Keep scores for citations
         chunks_only: List[Chunk] = [cw[0] for cw in ranked]
-        citations = build_citations(chunks_with_scores)
-        raw_context = [
-            {
-                "text": chunk.text,
-                "metadata": chunk.metadata,
-                "score": score,
-            }
-            for chunk, score in ranked
-        ]
+        include = set(request.include or ())
+        with timer.stage("citations"):
+            preview_chars = CITATION_PREVIEW_CHARS if "citation_text" in include else COMPACT_PREVIEW_CHARS
+            citations = build_citations(chunks_with_scores, preview_chars=preview_chars)
+            # Full chunk text + metadata is large; only build it for clients that ask.
+            raw_context = None
+            if "raw_context" in include:
+                raw_context = [
+                    {
+                        "text": chunk.text,
+                        "metadata": chunk.metadata,
+                        "score": score,
+                    }
+                    for chunk, score in ranked
+                ]
         return ChatResponse(
             answer=answer_text,
             citations=citations,
@@ -327,13 +382,79 @@ class RAGService:
                 "min_similarity_threshold": MIN_SIMILARITY,
                 "min_distance": min(score for _, score in ranked) if ranked else None,
                 "max_distance": max(score for _, score in ranked) if ranked else None,
+                "timings": timer.as_dict(),
+                **({"routing": decision.as_debug()} if decision else {}),
+                **facts_debug,
+            },
+        )
+
+    def _fact_response(self, request: ChatRequest, match: FactMatch, timer: StageTimer) -> ChatResponse:
+        include = set(request.include or ())
+        with timer.stage("citations"):
+            preview_chars = CITATION_PREVIEW_CHARS if "citation_text" in include else COMPACT_PREVIEW_CHARS
+            citations = self._facts.citations(match, preview_chars)
+        return ChatResponse(
+            answer=self._facts.answer_text(match),
+            citations=citations,
+            raw_context=None,
+            model=None,
+            usage=None,
+            retrieval_debug={
+                "query_length": len(request.question),
+                "fast_path": "facts",
+                "facts": match.as_debug(),
+                "timings": timer.as_dict(),
             },
         )
 
+    def _chat_openrouter(
+        self, model_id: str, system_prompt: str, question: str, timer: StageTimer
+    ) -> Tuple[str, UsageInfo, str]:
+        openrouter = self._openrouter or get_openrouter_client(model_id)
+        with self._admission.model_slot(model_id):
+            start = time.perf_counter()
+            try:
+                with timer.stage("llm"):
+                    result = openrouter.chat(
+                        system_prompt=system_prompt,
+                        user_message=question,
+                        model=model_id,
+                    )
+            except Exception:
+                self._router.record(model_id, (time.perf_counter() - start) * 1000.0, error=True)
+                raise
+            self._router.record(model_id, (time.perf_counter() - start) * 1000.0, error=False)
+        record_llm_usage(result.model, result.input_tokens, result.output_tokens, result.cost)
+        usage_info = UsageInfo(
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            total_tokens=result.total_tokens,
+            cost=result.cost,
+        )
+        return result.answer, usage_info, result.model
+
+    def _chat_default(self, system_prompt: str, question: str, timer: StageTimer) -> Tuple[str, UsageInfo]:
+        model_id = self._openai.chat_model
+        start = time.perf_counter()
+        try:
+            with timer.stage("llm"):
+                result = self._openai.chat_with_usage(system_prompt=system_prompt, user_message=question)
+        except Exception:
+            self._router.record(model_id, (time.perf_counter() - start) * 1000.0, error=True)
+            raise
+        self._router.record(model_id, (time.perf_counter() - start) * 1000.0, error=False)
+        record_llm_usage(model_id, result.input_tokens, result.output_tokens, result.cost)
+        usage_info = UsageInfo(
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            total_tokens=result.total_tokens,
+            cost=result.cost,
+        )
+        return result.answer, usage_info
+
 
 def get_rag_service() -> RAGService:
-    settings = get_app_settings()
-    vector_store = ChromaVectorStore(persist_directory=str(settings.chroma_persist_dir))
+    vector_store = get_vector_store()
     openai_client = get_openai_client()
-    return RAGService(vector_store=vector_store, openai_client=openai_client)
+    return RAGService(vector_store=vector_store, openai_client=openai_client, facts=get_fact_lookup())
 
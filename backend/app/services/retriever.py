@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from typing import Any, Dict, List, Optional, Tuple
 
 from ...vectorstore.chroma_store import ChromaVectorStore
 from ...ingestion.metadata_schema import Chunk
+from .timing import StageTimer
 
 
 class Retriever:
@@ -19,6 +21,7 @@ class Retriever:
         period: Optional[str] = None,
         min_similarity: Optional[float] = None,
         allow_blank_query: bool = False,
+        timer: Optional[StageTimer] = None,
     ) -> List[Tuple[Chunk, float]]:
         """
         Run a vector search with optional filters and guardrails.
@@ -30,6 +33,7 @@ class Retriever:
             period: Optional period filter (e.g., Q3-2025).
             min_similarity: If provided, drop results whose similarity falls below this threshold.
             allow_blank_query: If False, short-circuit blank queries to avoid meaningless retrievals.
+            timer: Optional stage timer; records `embed` and `vector_search` durations.
         """
         if not query.strip() and not allow_blank_query:
             return []
@@ -49,7 +53,10 @@ class Retriever:
         else:
             where = {"$and": conditions}
 
-        results = self._store.query(query_text=query, k=k, where=where)
+        with timer.stage("embed") if timer else nullcontext():
+            embedding = self._store.embed_query(query)
+        with timer.stage("vector_search") if timer else nullcontext():
+            results = self._store.query_by_embedding(embedding, k=k, where=where)
 
         if min_similarity is None:
             return results
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StageTimer:
+    """
+    Collects wall-clock durations (in milliseconds) for named request stages.
+
+    Stages that run more than once within a request are accumulated, so the
+    totals always describe where the request spent its time.
+    """
+
+    def __init__(self) -> None:
+        self._created = time.perf_counter()
+        self._durations_ms: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        self._durations_ms[name] = self._durations_ms.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._created) * 1000.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(ms, 3) for name, ms in self._durations_ms.items()}
+
+    def server_timing_header(self) -> str:
+        """Render the stages in the `Server-Timing` header format."""
+        return ", ".join(f"{name};dur={ms:.3f}" for name, ms in self._durations_ms.items())
@@ -0,0 +1,175 @@
+"""
+Startup warm-up.
+
+Loads everything the first /chat would otherwise pay for (Chroma client and
+collection, HNSW index, embedding model, provider TLS connection), optionally
+runs a canned query, and records how long each step took. `/health/ready`
+reports not-ready until this has finished.
+
+With INDEX_SNAPSHOT_URL set, the first step installs that index snapshot
+(`ingestion/snapshot.py`) unless it is installed already, so a fresh
+container starts from a packaged index instead of rebuilding one. The time
+from process start to ready is reported as `startup_s`, to compare against
+a rebuild.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..ingestion.snapshot import ensure_snapshot
+from ..vectorstore.chroma_store import ChromaVectorStore
+from .dependencies import get_app_settings, get_openai_client, get_vector_store
+from .metrics import READY, STARTUP_SECONDS, WARMUP_STEP_SECONDS
+from .services.retriever import Retriever
+
+PROCESS_START = time.time()
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    duration_ms: float
+    ok: bool
+    required: bool
+    error: Optional[str] = None
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.ready = False
+        self.ready_at: Optional[float] = None
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.steps: List[WarmupStep] = []
+
+    def add_step(self, step: WarmupStep) -> None:
+        with self._lock:
+            self.steps.append(step)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "warmup_started": self.started_at is not None,
+                "warmup_finished": self.finished_at is not None,
+                "warmup_ms": (
+                    round((self.finished_at - self.started_at) * 1000.0, 1)
+                    if self.started_at and self.finished_at
+                    else None
+                ),
+                "seconds_since_process_start": round(time.time() - PROCESS_START, 3),
+                "startup_s": round(self.ready_at - PROCESS_START, 3) if self.ready_at else None,
+                "snapshot": self.snapshot,
+                "steps": [asdict(step) for step in self.steps],
+            }
+
+
+WARMUP_STATE = WarmupState()
+
+
+def _run_step(state: WarmupState, name: str, fn: Callable[[], Any], required: bool) -> bool:
+    start = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"⚠️ Warm-up step '{name}' failed: {error}")
+        traceback.print_exc()
+    duration_s = time.perf_counter() - start
+    WARMUP_STEP_SECONDS.labels(step=name).set(duration_s)
+    state.add_step(
+        WarmupStep(name=name, duration_ms=round(duration_s * 1000.0, 1), ok=error is None, required=required, error=error)
+    )
+    return error is None
+
+
+def _install_snapshot(state: WarmupState) -> None:
+    settings = get_app_settings()
+    result = ensure_snapshot(
+        settings.index_snapshot_url,
+        settings.chroma_persist_dir.parent,
+        settings.data_dir / "snapshots",
+        expected_sha256=settings.index_snapshot_sha256,
+        expected_embedding_model=ChromaVectorStore.embedding_model,
+    )
+    info = result.info
+    state.snapshot = {
+        "snapshot_id": info.snapshot_id,
+        "status": result.status,
+        "chunks": info.chunks,
+        "download_ms": round(result.download_seconds * 1000.0, 1),
+        "install_ms": round(result.install_seconds * 1000.0, 1),
+    }
+    print(f"📦 Index snapshot {info.snapshot_id}: {result.status} ({info.chunks} chunks)")
+
+
+def run_warmup(state: WarmupState = WARMUP_STATE) -> None:
+    """Run every warm-up step; mark the process ready if all required steps succeed."""
+    state.started_at = time.time()
+    ok = _run_step(state, "settings", get_app_settings, required=True)
+
+    if ok and get_app_settings().index_snapshot_url:
+        # Before anything opens the index directory it replaces.
+        ok = _run_step(state, "index_snapshot", lambda: _install_snapshot(state), required=True)
+
+    if ok:
+        store_holder: Dict[str, Any] = {}
+
+        def load_store() -> None:
+            store_holder["store"] = get_vector_store()
+
+        def embed() -> None:
+            store_holder["embedding"] = store_holder["store"].embed_query("warm-up")
+
+        def load_hnsw() -> None:
+            # A k=1 search forces the persisted HNSW segment into memory.
+            if store_holder["store"].count() > 0:
+                store_holder["store"].query_by_embedding(store_holder["embedding"], k=1)
+
+        for name, fn in (
+            ("chroma_client", load_store),
+            ("collection_load", lambda: store_holder["store"].count()),
+            ("embedding_function", embed),
+            ("hnsw_index", load_hnsw),
+        ):
+            ok = _run_step(state, name, fn, required=True)
+            if not ok:
+                break
+
+    if ok:
+        settings = get_app_settings()
+        # Provider connectivity is best-effort: a flaky provider should not keep
+        # an otherwise healthy instance out of rotation.
+        _run_step(state, "provider_connection", lambda: get_openai_client().warm_up(), required=False)
+        if settings.warmup_query:
+            _run_step(
+                state,
+                "canned_query",
+                lambda: Retriever(get_vector_store()).retrieve(settings.warmup_query, k=8),
+                required=False,
+            )
+
+    state.finished_at = time.time()
+    state.ready = ok
+    READY.set(1 if ok else 0)
+    if ok:
+        state.ready_at = state.finished_at
+        STARTUP_SECONDS.set(state.ready_at - PROCESS_START)
+    summary = ", ".join(f"{s.name}={s.duration_ms:.0f}ms{'' if s.ok else ' (failed)'}" for s in state.steps)
+    startup = f"; ready {state.ready_at - PROCESS_START:.1f}s after process start" if ok else ""
+    print(f"{'✅' if ok else '❌'} Warm-up finished (ready={ok}): {summary}{startup}")
+
+
+def mark_ready_without_warmup(state: WarmupState = WARMUP_STATE) -> None:
+    state.started_at = state.finished_at = state.ready_at = time.time()
+    state.ready = True
+    READY.set(1)
+    STARTUP_SECONDS.set(state.ready_at - PROCESS_START)
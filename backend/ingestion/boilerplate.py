@@ -0,0 +1,200 @@
+"""
+Corpus-level boilerplate removal between parsing and chunking.
+
+Headers, footers, safe-harbor paragraphs and "Source: ..." lines repeat on
+every page of a deck and in every filing of a ticker. They chunk, embed and
+retrieve as noise. This stage counts hashed line shingles (pairs of adjacent
+normalized lines, with page start/end sentinels) over all pages of a ticker's
+documents, and drops paragraph lines that belong to shingles seen on at least
+`min_pages` pages.
+
+Long lines must repeat verbatim, so templated sentences that differ only in
+their figures ("revenue of $124.3 billion, up 4 percent") are kept. Short
+lines are compared with digits masked, so "Page 3" matches "Page 4", but are
+only dropped when they hang off a page edge through other dropped lines, as
+header and footer stacks do; speaker labels and "Thank you." survive.
+Surviving lines keep their original line numbers, so chunk citations
+(line_start/line_end) still point at the source page. Table blocks are never
+modified.
+
+Counting needs every document of a ticker before any can be stripped, so the
+stream is buffered one ticker at a time (documents must arrive grouped by
+ticker, which build_index guarantees). For incremental builds, documents of
+the ticker that are not being re-indexed can be supplied as `reference`
+blocks so the counts match a full build.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .embedding import CHARS_PER_TOKEN
+from .metadata_schema import Block, Document
+
+_START = "\x00start"
+_END = "\x00end"
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass
+class BoilerplateConfig:
+    # A shingle seen on this many pages (across the ticker's documents) is boilerplate.
+    min_pages: int = 3
+    # Lines shorter than this are only dropped as part of a page header/footer stack.
+    min_line_chars: int = 20
+
+
+@dataclass
+class BoilerplateReport:
+    documents: int = 0
+    lines_removed: int = 0
+    chars_removed: int = 0
+    blocks_emptied: int = 0
+    removed_by_ticker: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tokens_removed(self) -> int:
+        """Estimated tokens that no longer reach the embedding model."""
+        return self.chars_removed // CHARS_PER_TOKEN
+
+
+def normalize_line(text: str, mask_digits: bool = False) -> str:
+    """Case- and whitespace-insensitive form; `mask_digits` makes "Page 3 of 40" match "Page 4 of 40"."""
+    text = _SPACES.sub(" ", text.lower()).strip()
+    return _DIGITS.sub("#", text) if mask_digits else text
+
+
+def _shingle_hash(a: str, b: str, mask_digits: bool) -> bytes:
+    # Masked and exact shingles share one counter, so the flag is part of the key.
+    key = f"{int(mask_digits)}{a}\n{b}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+def _page_units(blocks: Sequence[Block]) -> Dict[object, List[Tuple[Block, int]]]:
+    """Paragraph lines grouped by page, as (block, index into block.lines)."""
+    units: Dict[object, List[Tuple[Block, int]]] = {}
+    for position, block in enumerate(blocks):
+        if block.type == "table":
+            continue
+        # HTML blocks have no page; treat each as its own unit.
+        key = block.page_number if block.page_number is not None else ("block", position)
+        unit = units.setdefault(key, [])
+        unit.extend((block, i) for i, line in enumerate(block.lines) if line.text.strip())
+    return units
+
+
+def _unit_shingles(unit: List[Tuple[Block, int]], mask_digits: bool) -> List[bytes]:
+    """Shingle hashes between consecutive lines, sentinels included (len(unit) + 1 of them)."""
+    texts = [_START] + [normalize_line(block.lines[i].text, mask_digits) for block, i in unit] + [_END]
+    return [_shingle_hash(a, b, mask_digits) for a, b in zip(texts, texts[1:])]
+
+
+class BoilerplateDetector:
+    def __init__(self, config: Optional[BoilerplateConfig] = None) -> None:
+        self.config = config or BoilerplateConfig()
+        # Shingle hash -> number of pages it appears on.
+        self._page_counts: Dict[bytes, int] = {}
+
+    def observe(self, blocks: Sequence[Block]) -> None:
+        for unit in _page_units(blocks).values():
+            for shingle in set(_unit_shingles(unit, False) + _unit_shingles(unit, True)):
+                self._page_counts[shingle] = self._page_counts.get(shingle, 0) + 1
+
+    def _boilerplate_lines(self, unit: List[Tuple[Block, int]]) -> List[bool]:
+        min_pages = self.config.min_pages
+        exact = [self._page_counts.get(s, 0) >= min_pages for s in _unit_shingles(unit, False)]
+        masked = [self._page_counts.get(s, 0) >= min_pages for s in _unit_shingles(unit, True)]
+        n = len(unit)
+        long_line = [
+            len(normalize_line(block.lines[i].text)) >= self.config.min_line_chars for block, i in unit
+        ]
+
+        # Shingle s sits between line s-1 and line s (lines -1 and n are the sentinels).
+        def repeated(k: int, s: int) -> bool:
+            return exact[s] or (not long_line[k] and masked[s])
+
+        drop = [long_line[k] and (exact[k] or exact[k + 1]) for k in range(n)]
+        # Header/footer stacks: lines chained to a page edge through repeated shingles.
+        k = 0
+        while k < n and repeated(k, k):
+            drop[k] = True
+            k += 1
+        k = n - 1
+        while k >= 0 and repeated(k, k + 1):
+            drop[k] = True
+            k -= 1
+        return drop
+
+    def strip(self, doc: Document, report: BoilerplateReport) -> None:
+        """Remove boilerplate lines from `doc`'s paragraph blocks in place."""
+        removed: Dict[int, set] = {}
+        for unit in _page_units(doc.blocks).values():
+            for (block, i), drop in zip(unit, self._boilerplate_lines(unit)):
+                if drop:
+                    removed.setdefault(id(block), set()).add(i)
+
+        ticker = doc.metadata.ticker.upper()
+        kept_blocks: List[Block] = []
+        for block in doc.blocks:
+            drop = removed.get(id(block))
+            if not drop:
+                kept_blocks.append(block)
+                continue
+            for i in drop:
+                text = block.lines[i].text
+                report.lines_removed += 1
+                report.chars_removed += len(text)
+                report.removed_by_ticker[ticker] = report.removed_by_ticker.get(ticker, 0) + 1
+            # Keep original line numbers so citations still match the page.
+            block.lines = [line for i, line in enumerate(block.lines) if i not in drop]
+            block.text = "\n".join(line.text for line in block.lines)
+            if block.text.strip():
+                kept_blocks.append(block)
+            else:
+                report.blocks_emptied += 1
+        doc.blocks = kept_blocks
+        report.documents += 1
+
+
+def strip_boilerplate(
+    documents: Iterable[Document],
+    config: Optional[BoilerplateConfig] = None,
+    report: Optional[BoilerplateReport] = None,
+    reference: Optional[Callable[[str], Iterable[Sequence[Block]]]] = None,
+) -> Iterator[Document]:
+    """
+    Yield `documents` with boilerplate removed, one ticker group at a time.
+
+    Args:
+        documents: Parsed documents, grouped by ticker
+        config: Detection thresholds
+        report: Accumulates lines/tokens removed
+        reference: Returns block lists of the ticker's other documents (not
+            in this stream) to include in the counts
+    """
+    config = config or BoilerplateConfig()
+    report = report if report is not None else BoilerplateReport()
+
+    def flush(group: List[Document]) -> Iterator[Document]:
+        detector = BoilerplateDetector(config)
+        for doc in group:
+            detector.observe(doc.blocks)
+        if reference is not None:
+            for blocks in reference(group[0].metadata.ticker):
+                detector.observe(blocks)
+        while group:
+            doc = group.pop(0)
+            detector.strip(doc, report)
+            yield doc
+
+    group: List[Document] = []
+    for doc in documents:
+        if group and doc.metadata.ticker.upper() != group[0].metadata.ticker.upper():
+            yield from flush(group)
+        group.append(doc)
+    if group:
+        yield from flush(group)
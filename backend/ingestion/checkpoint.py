@@ -0,0 +1,203 @@
+"""
+Build checkpoints for resumable index builds.
+
+While a build runs, every upserted batch and every fully indexed document is
+appended to a JSON-lines file beside the manifest, flushed to disk as it
+happens. If the build dies, `build_index.py --resume` folds the completed
+documents into the manifest (so they are skipped like unchanged files) and
+filters already-upserted chunks out of partially indexed documents, so no
+completed chunk is embedded twice. A successful build deletes the file.
+
+Chunk IDs are content-addressed: `{doc_id}_chunk_{digest}`, where the digest
+is a blake2b hash of the chunk text and which repeat of that text it is in the
+document (`chunking.chunk_id_for`). An ID therefore names the same text in any
+build, and IDs deleted when a file is re-indexed are mapped to their
+replacements by the manifest's redirect table. Completed chunks are still
+keyed by their source's fingerprint as `<content hash>/<parser version>:<chunk
+ID>`, because an upserted chunk carries page and line metadata of the file
+version it came from: if the file changed before the resume, its chunks are
+upserted again. The checkpoint as a whole is keyed by the chunking config,
+since other boundaries produce other chunks; nothing is reused if it changed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
+
+from .manifest import IngestionManifest, SourceFile
+
+CHECKPOINT_FILENAME = "ingestion_checkpoint.jsonl"
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class CompletedDocument:
+    source_key: str
+    doc_id: str
+    content_hash: str
+    parser_version: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+def source_fingerprint(source: SourceFile) -> str:
+    return f"{source.content_hash}/{source.parser_version}"
+
+
+def checkpoint_path_for(persist_dir: Path) -> Path:
+    """Stored next to the manifest, outside the Chroma directory."""
+    return Path(persist_dir).parent / CHECKPOINT_FILENAME
+
+
+class BuildCheckpoint:
+    def __init__(self, path: Path, chunking_hash: str) -> None:
+        self.path = Path(path)
+        self.chunking_hash = chunking_hash
+        self.completed_documents: Dict[str, CompletedDocument] = {}
+        # "<source fingerprint>:<chunk_id>" for every upserted chunk.
+        self._completed_chunks: Set[str] = set()
+        self.batches_recorded = 0
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, chunking_hash: str) -> "BuildCheckpoint":
+        """
+        Read a previous run's checkpoint.
+
+        A torn final line (the process died mid-write) is ignored; a checkpoint
+        written with a different chunking config is discarded entirely.
+        """
+        checkpoint = cls(path, chunking_hash)
+        if not checkpoint.path.exists():
+            return checkpoint
+        with checkpoint.path.open("r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {}
+                kind = record.get("kind")
+                if line_no == 0:
+                    if (
+                        kind != "header"
+                        or record.get("version") != CHECKPOINT_VERSION
+                        or record.get("chunking_hash") != chunking_hash
+                    ):
+                        print(f"⚠️ Checkpoint {checkpoint.path} is from a different build config; ignoring it")
+                        return cls(path, chunking_hash)
+                elif kind == "batch":
+                    checkpoint._completed_chunks.update(record["chunks"])
+                    checkpoint.batches_recorded += 1
+                elif kind == "document":
+                    doc = CompletedDocument(**record["document"])
+                    checkpoint.completed_documents[doc.source_key] = doc
+        return checkpoint
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.completed_documents and not self._completed_chunks
+
+    @property
+    def completed_chunk_count(self) -> int:
+        return len(self._completed_chunks)
+
+    def is_chunk_done(self, source: SourceFile, chunk_id: str) -> bool:
+        return f"{source_fingerprint(source)}:{chunk_id}" in self._completed_chunks
+
+    def start(self, fresh: bool) -> None:
+        """Open for appending; `fresh` discards anything recorded by a previous run."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fresh or not self.path.exists():
+            self.completed_documents.clear()
+            self._completed_chunks.clear()
+            self.batches_recorded = 0
+            self._file = self.path.open("w", encoding="utf-8")
+            self._write(
+                {
+                    "kind": "header",
+                    "version": CHECKPOINT_VERSION,
+                    "chunking_hash": self.chunking_hash,
+                    "started_at": time.time(),
+                }
+            )
+        else:
+            self._file = self.path.open("a", encoding="utf-8")
+
+    def _write(self, record: dict) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_batch(self, chunks: Iterable[Tuple[SourceFile, str]]) -> None:
+        """Record upserted chunks, given as `(source, chunk_id)` pairs."""
+        keys = [f"{source_fingerprint(source)}:{chunk_id}" for source, chunk_id in chunks]
+        self._write({"kind": "batch", "chunks": keys})
+        with self._lock:
+            self._completed_chunks.update(keys)
+            self.batches_recorded += 1
+
+    def record_document(self, source: SourceFile, chunk_ids: List[str]) -> None:
+        doc = CompletedDocument(
+            source_key=source.source_key,
+            doc_id=source.job.doc_id,
+            content_hash=source.content_hash,
+            parser_version=source.parser_version,
+            chunk_ids=list(chunk_ids),
+        )
+        self._write({"kind": "document", "document": asdict(doc)})
+        with self._lock:
+            self.completed_documents[doc.source_key] = doc
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Delete the checkpoint once the build it covers has completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def resume_completed_documents(
+    checkpoint: BuildCheckpoint,
+    manifest: IngestionManifest,
+    sources: Iterable[SourceFile],
+) -> Tuple[Set[str], List[str]]:
+    """
+    Record documents the interrupted run finished in the manifest.
+
+    Returns `(resumed_source_keys, stale_chunk_ids)`: the sources that no
+    longer need indexing, and chunk IDs from their previous manifest entries
+    that the interrupted run did not re-produce (`index_builder.resume_checkpoint`
+    deletes those no other document references).
+    Documents whose source changed since the interrupted run are left alone.
+    """
+    resumed: Set[str] = set()
+    stale: List[str] = []
+    for source in sources:
+        done = checkpoint.completed_documents.get(source.source_key)
+        if (
+            done is None
+            or done.doc_id != source.job.doc_id
+            or done.content_hash != source.content_hash
+            or done.parser_version != source.parser_version
+        ):
+            continue
+        previous = manifest.entries.get(source.source_key)
+        if previous is not None:
+            new_ids = set(done.chunk_ids)
+            stale.extend(cid for cid in previous.chunk_ids if cid not in new_ids)
+        manifest.record(source, checkpoint.chunking_hash, done.chunk_ids)
+        resumed.add(source.source_key)
+    return resumed, stale
@@ -1,10 +1,19 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple
+import bisect
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
 from dataclasses import dataclass
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from .metadata_schema import Block, Chunk, Document
 
+# Bumped whenever the same blocks would produce different chunks; part of the
+# manifest's chunking hash so a splitter change re-indexes.
+CHUNKER_VERSION = "3"
+
+_NON_SPACE = re.compile(r"\S")
+
 @dataclass
 class ChunkingConfig:
     max_tokens: int = 800
@@ -27,111 +36,154 @@ class ChunkingConfig:
             self.separators = ["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""]
 
 
-def _split_large_blocks(blocks: List[Block], max_block_tokens: int):
-    """Split blocks that exceed max_block_tokens, while safely handling missing attributes."""
-    new_blocks = []
-
-    for block in blocks:
-        words = block.text.split()
-        total_words = len(words)
-
-        if total_words <= max_block_tokens:
-            new_blocks.append(block)
-            continue
-
-        # Safe defaults for metadata (these may not exist)
-        block_line_start = getattr(block, "line_start", None)
-        block_line_end = getattr(block, "line_end", None)
-
-        # Allowed Block fields — we extract them directly from the instance
-        allowed_keys = set(block.__dataclass_fields__.keys())
-
-        start_idx = 0
-        chunk_id = 0
-
-        while start_idx < total_words:
-            end_idx = min(start_idx + max_block_tokens, total_words)
-
-            chunk_text = " ".join(words[start_idx:end_idx])
-
-            # Estimate line metadata ONLY if block originally had it
-            if block_line_start is not None and block_line_end is not None:
-                approx_lines = block_line_end - block_line_start + 1
-                words_per_line = max(total_words / approx_lines, 1)
-
-                est_line_start = block_line_start + int(start_idx / words_per_line)
-                est_line_end = block_line_start + int(end_idx / words_per_line)
-            else:
-                est_line_start = None
-                est_line_end = None
-
-            # Prepare safe dict for Block init
-            new_block_dict = {}
+@dataclass
+class TextSpan:
+    """One chunk of a block: its text, character offsets into block.text and source lines."""
+    text: str
+    char_start: int
+    char_end: int
+    line_start: Optional[int]
+    line_end: Optional[int]
 
-            for key in allowed_keys:
-                # Copy existing metadata
-                new_block_dict[key] = getattr(block, key, None)
 
-            # Override block_id and text
-            new_block_dict["block_id"] = f"{block.block_id}_split_{chunk_id}"
-            new_block_dict["text"] = chunk_text
+@lru_cache(maxsize=None)
+def _words_pattern(count: int) -> Pattern[str]:
+    return re.compile(r"(?:\S+\s*){0,%d}" % count)
 
-            # Only include line metadata if Block supports it
-            if "line_start" in allowed_keys:
-                new_block_dict["line_start"] = est_line_start
-            if "line_end" in allowed_keys:
-                new_block_dict["line_end"] = est_line_end
 
-            # Construct the new block safely
-            new_blocks.append(Block(**new_block_dict))
+def _skip_words(text: str, pos: int, count: int) -> int:
+    """Offset of the word `count` words after the word starting at `pos` (len(text) if there are fewer)."""
+    return _words_pattern(count).match(text, pos).end()
 
-            start_idx = end_idx
-            chunk_id += 1
 
-    return new_blocks
+def _best_cut(text: str, start: int, lo: int, hi: int, separators: List[str]) -> int:
+    """
+    Offset of the word to cut before, between the words starting at lo and hi.
 
-def _build_chunk_metadata(blocks: List[Block]) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+    Tries separators in priority order and takes the last occurrence of the
+    first one found. The search starts on the last character of the word
+    before lo so that ". " and ", " match; `start` is the window start.
     """
-    Calculate line and page start/end for a chunk.
+    search_from = start + len(text[start:lo].rstrip()) - 1
+    for sep in separators:
+        if not sep:
+            continue
+        pos = text.rfind(sep, search_from, hi)
+        if pos >= 0:
+            return _NON_SPACE.search(text, pos + 1).start()
+    return hi
+
+
+def _line_numbers_at(block: Block) -> Tuple[List[int], List[Optional[int]]]:
+    """Start offset of each text line in block.text and the source line number it maps to."""
+    text_lines = block.text.splitlines(keepends=True) or [""]
+    starts: List[int] = []
+    offset = 0
+    for line in text_lines:
+        starts.append(offset)
+        offset += len(line)
+    if len(block.lines) == len(text_lines):
+        numbers: List[Optional[int]] = [line.line_number for line in block.lines]
+    else:
+        # Text and lines disagree (e.g. a parser joined lines); cite the whole block.
+        first = block.lines[0].line_number if block.lines else None
+        last = block.lines[-1].line_number if block.lines else None
+        numbers = [first] * (len(text_lines) - 1) + [last]
+    return starts, numbers
+
+
+def split_block(
+    block: Block,
+    max_words: int,
+    overlap_words: int,
+    min_words: int,
+    separators: List[str],
+) -> List[TextSpan]:
     """
-    line_numbers = [b.line_number for b in blocks if hasattr(b, "line_number") and b.line_number is not None]
-    page_numbers = [b.page_number for b in blocks if hasattr(b, "page_number") and b.page_number is not None]
-
-    line_start = min(line_numbers) if line_numbers else None
-    line_end = max(line_numbers) if line_numbers else None
-    page_start = min(page_numbers) if page_numbers else None
-    page_end = max(page_numbers) if page_numbers else None
-
-    return line_start, line_end, page_start, page_end
+    Split a block into windows of at most `max_words` words.
+
+    Windows are found by index arithmetic on character offsets: compiled
+    regexes skip N words in one call, so each window costs a few C-level
+    scans and the block is never re-tokenized. Each window ends at the
+    highest-priority separator (in `separators` order) found between
+    `min_words` and `max_words` words into it, taking the last one on ties,
+    and the next window starts `overlap_words` words before that cut. Chunk
+    text is sliced from block.text, so newlines survive, and every span
+    carries exact character offsets and source line numbers.
+    """
+    text = block.text
+    if not text.strip():
+        return []
+    line_starts, line_numbers = _line_numbers_at(block)
+
+    def span(char_start: int, char_end: int) -> TextSpan:
+        first_line = bisect.bisect_right(line_starts, char_start) - 1
+        last_line = bisect.bisect_right(line_starts, char_end - 1) - 1
+        return TextSpan(
+            text=text[char_start:char_end],
+            char_start=char_start,
+            char_end=char_end,
+            line_start=line_numbers[first_line],
+            line_end=line_numbers[last_line],
+        )
+
+    max_words = max(1, max_words)
+    start = len(text) - len(text.lstrip())
+    if len(text.split()) <= max_words:
+        # Most blocks fit in one window; str.split is cheaper than the word regex.
+        return [span(start, len(text.rstrip()))]
+    spans: List[TextSpan] = []
+    while True:
+        end = _skip_words(text, start, max_words)
+        if end >= len(text):
+            spans.append(span(start, len(text.rstrip())))
+            return spans
+        earliest = min(_skip_words(text, start, max(1, min_words)), end)
+        cut = _best_cut(text, start, earliest, end, separators)
+        window = text[start:cut]
+        spans.append(span(start, start + len(window.rstrip())))
+        # Overlap at most half the window so short windows still make progress.
+        words = len(window.split())
+        start = _skip_words(text, start, words - min(overlap_words, words // 2))
+
+
+def content_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def chunk_id_for(doc_id: str, text: str, occurrence: int = 0) -> str:
+    """
+    Stable chunk ID from the document, the chunk text and which repeat of that
+    text it is within the document, so edits elsewhere never change it.
+    """
+    digest = content_digest(text if not occurrence else f"{text}\x00{occurrence}")
+    return f"{doc_id}_chunk_{digest}"
 
 
 def chunk_document(doc: Document, config: ChunkingConfig) -> List[Chunk]:
     """
     Chunk a document into smaller pieces using config.
-    """
-    all_chunks: List[Chunk] = []
 
-    # Fix: doc.blocks is a flat list of Block objects, not a list of lists
-    # Step 1: Split large blocks
-    blocks = _split_large_blocks(doc.blocks, config.max_block_tokens)
+    Each block is split on its own (chunks never span blocks) into windows of
+    at most min(max_tokens, max_block_tokens) words, overlapping by
+    overlap_tokens. Tables are split only when too long and, with
+    keep_tables_intact, without overlap, so no row is embedded twice.
+    Chunk IDs are content-addressed (see chunk_id_for).
 
-    # Step 2: Use text splitter on block text
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=config.max_tokens,
-        chunk_overlap=config.overlap_tokens,
-        separators=config.separators,
-        length_function=lambda t: len(t.split())
-    )
-
-    for block in blocks:
-        text_chunks = splitter.split_text(block.text)
-        for idx, chunk_text in enumerate(text_chunks):
-            # Compute chunk metadata
-            blocks_in_chunk = [block]  # simple case: one block per chunk
-            line_start, line_end, page_start, page_end = _build_chunk_metadata(blocks_in_chunk)
+    Unlike the langchain chunker this replaced, whose pre-split into
+    back-to-back max_block_tokens runs left the overlap unused, long blocks
+    now overlap: a 3000-word block gives 10 chunks instead of 6 (4,161 ->
+    4,172 chunks on the current corpus).
+    """
+    all_chunks: List[Chunk] = []
+    occurrences: Dict[str, int] = {}
+    max_words = min(config.max_tokens, config.max_block_tokens)
 
-            # Optional page_number for single-page chunks
-            page_number = page_start if page_start == page_end else None
+    for block in doc.blocks:
+        is_table = getattr(block, "type", None) == "table"
+        overlap = 0 if is_table and config.keep_tables_intact else config.overlap_tokens
+        for piece in split_block(block, max_words, overlap, config.min_chunk_size, config.separators):
+            page_number = block.page_number
 
             metadata = {
                 "doc_id": doc.metadata.doc_id,
@@ -140,19 +192,23 @@ def chunk_document(doc: Document, config: ChunkingConfig) -> List[Chunk]:
                 "period": doc.metadata.period or "",
                 "source_url": doc.metadata.source_url or "",
                 "title": doc.metadata.title or "",
-                "page_start": page_start,
-                "page_end": page_end,
+                "page_start": page_number,
+                "page_end": page_number,
                 "page_number": page_number,
-                "line_start": line_start,
-                "line_end": line_end,
+                "line_start": piece.line_start,
+                "line_end": piece.line_end,
+                "char_start": piece.char_start,
+                "char_end": piece.char_end,
                 "block_ids": block.block_id,
                 "block_type": getattr(block, "type", "unknown"),
                 "local_path": str(doc.metadata.local_path) if doc.metadata.local_path else "",
             }
 
+            occurrence = occurrences.get(piece.text, 0)
+            occurrences[piece.text] = occurrence + 1
             chunk = Chunk(
-                chunk_id=f"{doc.metadata.doc_id}_chunk_{len(all_chunks)+1}",
-                text=chunk_text,
+                chunk_id=chunk_id_for(doc.metadata.doc_id, piece.text, occurrence),
+                text=piece.text,
                 metadata=metadata
             )
             all_chunks.append(chunk)
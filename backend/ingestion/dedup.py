@@ -0,0 +1,209 @@
+"""
+Cross-document duplicate chunk detection.
+
+A company's press release, call deck and 10-Q for the same quarter repeat the
+same paragraphs and tables. Indexed separately, each copy is embedded and
+retrieval returns the same passage several times. During a build every chunk
+is checked against the chunks already seen (or, in incremental builds, already
+stored) for the same ticker and period:
+
+- exact duplicates share a hash of their normalized tokens (lowercased words
+  and numbers, so whitespace, punctuation and table pipes do not matter);
+- near duplicates are found with MinHash over 5-token shingles and LSH
+  banding, then confirmed by the estimated Jaccard similarity.
+
+A duplicate is not embedded. Its document references the first copy's chunk
+ID instead, and that chunk keeps a `sources` list (JSON, since Chroma metadata
+must be scalar) with the doc, page and line span of every copy, so citations
+can point at any of them. Groups never cross periods or tickers, because
+retrieval filters on both.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding import estimate_tokens
+from .metadata_schema import Chunk
+
+SHINGLE_TOKENS = 5
+# Metadata copied into each provenance entry: enough to cite and open the source.
+SOURCE_FIELDS = (
+    "doc_id",
+    "title",
+    "filing_type",
+    "period",
+    "source_url",
+    "local_path",
+    "page_start",
+    "page_end",
+    "line_start",
+    "line_end",
+)
+
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass
+class DedupConfig:
+    # Estimated Jaccard similarity of shingle sets at which two chunks are merged.
+    threshold: float = 0.85
+    num_perm: int = 64
+    bands: int = 8
+
+
+@dataclass
+class DedupReport:
+    chunks_seen: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    tokens_saved: int = 0
+    # Canonical chunk ID -> provenance of every copy, canonical first.
+    groups: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def duplicates(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+
+def source_entry(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: metadata.get(key) for key in SOURCE_FIELDS}
+
+
+def chunk_sources(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every location a stored chunk's text appears at (just its own for unshared chunks)."""
+    raw = metadata.get("sources")
+    if raw:
+        try:
+            sources = json.loads(raw)
+            if isinstance(sources, list) and sources:
+                return sources
+        except ValueError:
+            pass
+    return [source_entry(metadata)]
+
+
+class MinHasher:
+    """MinHash signatures of 5-token shingles, vectorized with numpy."""
+
+    def __init__(self, num_perm: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        # Odd multipliers keep each multiply-add a bijection on uint64.
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: List[str]) -> np.ndarray:
+        token_hashes = np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens)
+        )
+        n = len(tokens) - SHINGLE_TOKENS + 1
+        with np.errstate(over="ignore"):
+            shingles = np.zeros(n, dtype=np.uint64)
+            for j in range(SHINGLE_TOKENS):
+                shingles = shingles * np.uint64(1_000_003) + token_hashes[j : j + n]
+            shingles = np.unique(shingles)
+            mixed = shingles[None, :] * self._a[:, None] + self._b[:, None]
+        mixed ^= mixed >> np.uint64(29)
+        return mixed.min(axis=1)
+
+
+class ChunkDeduplicator:
+    def __init__(self, config: Optional[DedupConfig] = None, report: Optional[DedupReport] = None) -> None:
+        self.config = config or DedupConfig()
+        self.report = report if report is not None else DedupReport()
+        self._rows = self.config.num_perm // self.config.bands
+        self._hasher = MinHasher(self._rows * self.config.bands)
+        self._exact: Dict[Tuple[str, str, bytes], str] = {}
+        self._buckets: Dict[Tuple[str, str, int, bytes], List[str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        # Canonical chunk ID -> provenance it had before this build's duplicates.
+        self._sources: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _near_duplicate(self, scope: Tuple[str, str], signature: np.ndarray) -> Tuple[Optional[str], List[tuple]]:
+        keys = []
+        best_id, best_score = None, self.config.threshold
+        for band in range(self.config.bands):
+            key = scope + (band, signature[band * self._rows : (band + 1) * self._rows].tobytes())
+            keys.append(key)
+            for candidate in self._buckets.get(key, ()):
+                score = float(np.mean(self._signatures[candidate] == signature))
+                if score >= best_score:
+                    best_id, best_score = candidate, score
+        return best_id, keys
+
+    @staticmethod
+    def _keys(chunk: Chunk) -> Tuple[Tuple[str, str], Tuple[str, str, bytes], List[str]]:
+        meta = chunk.metadata
+        scope = (str(meta.get("ticker") or "").lower(), str(meta.get("period") or ""))
+        tokens = _TOKEN.findall(chunk.text.lower())
+        digest = hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=16).digest()
+        return scope, scope + (digest,), tokens
+
+    def _register(
+        self,
+        chunk: Chunk,
+        exact_key: Tuple[str, str, bytes],
+        signature: Optional[np.ndarray],
+        band_keys: List[tuple],
+        sources: List[Dict[str, Any]],
+    ) -> None:
+        self._exact.setdefault(exact_key, chunk.chunk_id)
+        self._sources[chunk.chunk_id] = sources
+        if signature is not None:
+            self._signatures[chunk.chunk_id] = signature
+            for key in band_keys:
+                self._buckets.setdefault(key, []).append(chunk.chunk_id)
+
+    def add_stored(self, chunk: Chunk, sources: List[Dict[str, Any]]) -> None:
+        """
+        Make a chunk stored by an earlier build a candidate for this build's chunks.
+
+        `sources` is its current provenance, so new duplicates extend it.
+        """
+        scope, exact_key, tokens = self._keys(chunk)
+        signature, band_keys = None, []
+        if len(tokens) >= 2 * SHINGLE_TOKENS:
+            signature = self._hasher.signature(tokens)
+            band_keys = [
+                scope + (band, signature[band * self._rows : (band + 1) * self._rows].tobytes())
+                for band in range(self.config.bands)
+            ]
+        self._register(chunk, exact_key, signature, band_keys, sources or [source_entry(chunk.metadata)])
+
+    def canonical_for(self, chunk: Chunk) -> Optional[str]:
+        """
+        Return the ID of an earlier chunk `chunk` duplicates, or None.
+
+        A chunk that is not a duplicate becomes a candidate for later ones.
+        For a duplicate, its provenance is added to the canonical chunk's group.
+        """
+        meta = chunk.metadata
+        self.report.chunks_seen += 1
+        scope, exact_key, tokens = self._keys(chunk)
+
+        canonical = self._exact.get(exact_key)
+        if canonical is not None:
+            self.report.exact_duplicates += 1
+        signature = None
+        band_keys: List[tuple] = []
+        if canonical is None and len(tokens) >= 2 * SHINGLE_TOKENS:
+            signature = self._hasher.signature(tokens)
+            canonical, band_keys = self._near_duplicate(scope, signature)
+            if canonical is not None:
+                self.report.near_duplicates += 1
+
+        if canonical is not None:
+            group = self.report.groups.setdefault(canonical, list(self._sources[canonical]))
+            group.append(source_entry(meta))
+            self.report.tokens_saved += estimate_tokens(chunk.text)
+            return canonical
+
+        self._register(chunk, exact_key, signature, band_keys, [source_entry(meta)])
+        return None
@@ -0,0 +1,195 @@
+"""
+On-disk cache of parsed documents under `Settings.processed_dir`.
+
+Parser output depends only on the file's bytes and the parser version, so
+entries are keyed by `(content sha256, kind, parser version)`. Document-level
+metadata (doc_id, ticker, period, ...) comes from the parse job and is not
+stored.
+
+Each entry is one file:
+
+    MAGIC | uint32 header length | header JSON | zlib(pickle(block tuples))
+
+The header is small and can be read without touching the payload, so listing
+or validating the cache is cheap; blocks are decoded only when loaded.
+Blocks are stored as plain tuples, before section tagging, so the format does
+not depend on dataclass layout and tagging changes apply on load.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .metadata_schema import Block, Line, TableCell
+
+MAGIC = b"RAGDOC\x00\x01"
+FORMAT_VERSION = 1
+CACHE_SUFFIX = ".doccache"
+CACHE_SUBDIR = "doc_cache"  # under Settings.processed_dir
+_HEADER_LEN = struct.Struct(">I")
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Header of one cache file; blocks are loaded separately."""
+
+    path: Path
+    kind: str
+    parser_version: str
+    content_hash: str
+    source_name: str
+    page_count: Optional[int]
+    block_count: int
+    created_at: float
+    payload_bytes: int
+    raw_bytes: int
+
+    @property
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size
+
+
+def _encode_blocks(blocks: List[Block]) -> bytes:
+    rows = [
+        (
+            b.block_id,
+            b.type,
+            b.page_number,
+            b.text,
+            [(line.line_number, line.text) for line in b.lines],
+            [(c.row, c.col, c.text) for c in b.cells] if b.cells is not None else None,
+        )
+        for b in blocks
+    ]
+    return pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_blocks(raw: bytes) -> List[Block]:
+    return [
+        Block(
+            block_id=block_id,
+            type=block_type,
+            page_number=page_number,
+            text=text,
+            lines=[Line(line_number=n, text=t) for n, t in lines],
+            cells=[TableCell(row=r, col=c, text=t) for r, c, t in cells] if cells is not None else None,
+        )
+        for block_id, block_type, page_number, text, lines, cells in pickle.loads(raw)
+    ]
+
+
+def _read_header(f) -> Dict[str, Any]:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a document cache file")
+    (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+    header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported cache format {header.get('format')}")
+    return header
+
+
+class DocumentCache:
+    def __init__(self, cache_dir: Path, compress_level: int = 1) -> None:
+        self.cache_dir = Path(cache_dir)
+        self._compress_level = compress_level
+
+    def path_for(self, content_hash: str, kind: str, parser_version: str) -> Path:
+        return self.cache_dir / f"{content_hash}_{kind}_v{parser_version}{CACHE_SUFFIX}"
+
+    def read_entry(self, path: Path) -> CacheEntry:
+        with open(path, "rb") as f:
+            header = _read_header(f)
+        return CacheEntry(
+            path=path,
+            kind=header["kind"],
+            parser_version=header["parser_version"],
+            content_hash=header["content_hash"],
+            source_name=header.get("source_name", ""),
+            page_count=header.get("page_count"),
+            block_count=header["block_count"],
+            created_at=header["created_at"],
+            payload_bytes=header["payload_bytes"],
+            raw_bytes=header["raw_bytes"],
+        )
+
+    def entries(self) -> Iterator[CacheEntry]:
+        """Headers of every readable entry; corrupt files are skipped with a warning."""
+        if not self.cache_dir.exists():
+            return
+        for path in sorted(self.cache_dir.glob(f"*{CACHE_SUFFIX}")):
+            try:
+                yield self.read_entry(path)
+            except (OSError, ValueError, KeyError, struct.error) as e:
+                print(f"⚠️ Unreadable cache entry {path.name}: {e}")
+
+    def get(self, content_hash: str, kind: str, parser_version: str) -> Optional[Tuple[List[Block], Optional[int]]]:
+        """Return `(blocks, page_count)` on a hit, None on a miss or unreadable entry."""
+        path = self.path_for(content_hash, kind, parser_version)
+        try:
+            with open(path, "rb") as f:
+                header = _read_header(f)
+                payload = f.read()
+            if len(payload) != header["payload_bytes"]:
+                raise ValueError("truncated payload")
+            blocks = _decode_blocks(zlib.decompress(payload))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring corrupt cache entry {path.name}: {e}")
+            return None
+        return blocks, header.get("page_count")
+
+    def put(
+        self,
+        content_hash: str,
+        kind: str,
+        parser_version: str,
+        blocks: List[Block],
+        page_count: Optional[int],
+        source_name: str = "",
+    ) -> Path:
+        raw = _encode_blocks(blocks)
+        payload = zlib.compress(raw, self._compress_level)
+        header = json.dumps(
+            {
+                "format": FORMAT_VERSION,
+                "kind": kind,
+                "parser_version": parser_version,
+                "content_hash": content_hash,
+                "source_name": source_name,
+                "page_count": page_count,
+                "block_count": len(blocks),
+                "created_at": time.time(),
+                "payload_bytes": len(payload),
+                "raw_bytes": len(raw),
+            }
+        ).encode("utf-8")
+
+        path = self.path_for(content_hash, kind, parser_version)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Unique temp name so parallel builds never interleave writes.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,319 @@
+"""
+Concurrent, rate-limited embedding for index builds.
+
+`AdaptiveEmbedder.embed` is safe to call from many threads. Each call:
+
+1. takes a concurrency slot (the limit adapts: halved on a 429, raised by one
+   after a streak of successes, never above `max_concurrency`);
+2. reserves request and token budget from per-minute token buckets, sleeping
+   if the budget is overdrawn;
+3. on a 429, pauses *all* callers for the server's Retry-After (or an
+   exponential backoff) and retries;
+4. on a transient failure (connection error, timeout, 5xx), retries that call
+   with exponential backoff without touching the concurrency limit.
+
+`BatchPacker` decides what goes into each request: items are packed greedily
+by estimated token count up to a per-request token and item limit, so short
+table fragments share a request while long chunks never push it over the
+provider's cap.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterator, List, Optional, Sequence, TypeVar
+
+from openai import APIConnectionError
+
+# Rough BPE average for English prose and numbers; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+# Provider limits for text-embedding-3-*: 8191 tokens per input, 2048 inputs
+# and 300k tokens per request. Defaults stay well inside them because token
+# counts are only estimated.
+MAX_INPUT_TOKENS = 8000
+DEFAULT_BATCH_MAX_TOKENS = 50_000
+DEFAULT_BATCH_MAX_ITEMS = 256
+
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` so its estimated token count is at most `max_tokens`."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars]
+
+
+@dataclass
+class BatchingStats:
+    batches: int = 0
+    items: int = 0
+    estimated_tokens: int = 0
+    # Items that alone exceed the per-request token limit (sent on their own).
+    oversized: int = 0
+    max_tokens: int = 0
+    max_items: int = 0
+    fill_ratio_sum: float = 0.0
+
+    @property
+    def avg_fill_ratio(self) -> float:
+        """Mean of each batch's share of its binding limit (tokens or items)."""
+        return self.fill_ratio_sum / self.batches if self.batches else 0.0
+
+    @property
+    def avg_items_per_batch(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+class BatchPacker(Generic[T]):
+    """
+    Greedy first-fit packing of a stream of items into request-sized batches.
+
+    Items keep their order. A batch is closed when the next item would take it
+    past `max_tokens` or `max_items`; an item that alone exceeds `max_tokens`
+    is flushed as a batch of one (the caller truncates its text to fit).
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[T], int],
+        max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+        max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+    ) -> None:
+        self._count_tokens = count_tokens
+        self._max_tokens = max(1, max_tokens)
+        self._max_items = max(1, max_items)
+        self._items: List[T] = []
+        self._tokens = 0
+        self.stats = BatchingStats(max_tokens=self._max_tokens, max_items=self._max_items)
+
+    def _close(self) -> List[T]:
+        batch, tokens = self._items, self._tokens
+        self._items, self._tokens = [], 0
+        self.stats.batches += 1
+        self.stats.items += len(batch)
+        self.stats.estimated_tokens += tokens
+        self.stats.fill_ratio_sum += min(1.0, max(tokens / self._max_tokens, len(batch) / self._max_items))
+        return batch
+
+    def add(self, item: T) -> List[List[T]]:
+        """Add one item; returns the batches (zero, one or two) it closed."""
+        tokens = self._count_tokens(item)
+        closed: List[List[T]] = []
+        if self._items and (
+            self._tokens + tokens > self._max_tokens or len(self._items) >= self._max_items
+        ):
+            closed.append(self._close())
+        self._items.append(item)
+        self._tokens += tokens
+        if tokens > self._max_tokens:
+            self.stats.oversized += 1
+            closed.append(self._close())
+        return closed
+
+    def flush(self) -> Optional[List[T]]:
+        """Close the partially filled batch at the end of the stream."""
+        return self._close() if self._items else None
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously; callers may overdraw and then wait."""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None) -> None:
+        self._rate = per_minute / 60.0
+        self._capacity = burst if burst is not None else per_minute
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` now; returns how long the caller must sleep before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            # A single request larger than the bucket can still go through once
+            # the bucket is full, rather than waiting forever.
+            self._tokens -= min(amount, self._capacity)
+            return max(0.0, -self._tokens / self._rate)
+
+
+@dataclass
+class EmbeddingStats:
+    requests: int = 0
+    texts: int = 0
+    estimated_tokens: int = 0
+    rate_limited: int = 0
+    throttle_wait_s: float = 0.0
+    backoff_wait_s: float = 0.0
+    transient_errors: int = 0
+    peak_concurrency: int = 0
+    final_concurrency_limit: int = 0
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Failures worth retrying as-is: dropped connections, timeouts, server errors."""
+    if isinstance(error, (APIConnectionError, ConnectionError, TimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in TRANSIENT_STATUS_CODES
+
+
+def retry_after_s(error: BaseException) -> Optional[float]:
+    """Server-provided delay from `retry-after-ms` / `retry-after` headers, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class AdaptiveEmbedder:
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        *,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_rate_limit_retries: int = 8,
+        max_transient_retries: int = 5,
+        base_backoff_s: float = 1.0,
+        max_backoff_s: float = 60.0,
+        increase_after: int = 8,
+    ) -> None:
+        """
+        Args:
+            embed_fn: Sends one embedding request (should not retry 429s itself)
+            max_concurrency: Upper bound on requests in flight
+            requests_per_minute: Request budget (None = unlimited)
+            tokens_per_minute: Estimated-token budget (None = unlimited)
+            max_rate_limit_retries: 429s tolerated per call before giving up
+            max_transient_retries: Transient failures tolerated per call
+            increase_after: Consecutive successes before raising the limit by one
+        """
+        self._embed_fn = embed_fn
+        self._max_concurrency = max(1, max_concurrency)
+        self._rpm = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tpm = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._max_retries = max_rate_limit_retries
+        self._max_transient_retries = max_transient_retries
+        self._base_backoff_s = base_backoff_s
+        self._max_backoff_s = max_backoff_s
+        self._increase_after = increase_after
+
+        self._cond = threading.Condition()
+        self._limit = self._max_concurrency
+        self._active = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self.stats = EmbeddingStats(final_concurrency_limit=self._limit)
+
+    @property
+    def concurrency_limit(self) -> int:
+        return self._limit
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+            self.stats.peak_concurrency = max(self.stats.peak_concurrency, self._active)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _wait_for_budget(self, tokens: int) -> None:
+        wait = max(
+            self._rpm.reserve(1) if self._rpm else 0.0,
+            self._tpm.reserve(tokens) if self._tpm else 0.0,
+        )
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            self.stats.backoff_wait_s += pause
+        if wait > 0:
+            self.stats.throttle_wait_s += wait
+        delay = max(wait, pause)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._increase_after and self._limit < self._max_concurrency:
+                self._limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+            self.stats.final_concurrency_limit = self._limit
+
+    def _on_rate_limited(self, attempt: int, server_delay: Optional[float]) -> None:
+        delay = server_delay if server_delay is not None else self._backoff_s(attempt)
+        with self._cond:
+            self.stats.rate_limited += 1
+            self._successes = 0
+            self._limit = max(1, self._limit // 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.stats.final_concurrency_limit = self._limit
+
+    def _backoff_s(self, attempt: int) -> float:
+        return min(self._max_backoff_s, self._base_backoff_s * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        texts = list(texts)
+        tokens = sum(estimate_tokens(t) for t in texts)
+        attempt = 0
+        transient_attempt = 0
+        while True:
+            delay = 0.0
+            with self._slot():
+                self._wait_for_budget(tokens)
+                try:
+                    result = self._embed_fn(texts)
+                except Exception as e:
+                    if is_rate_limit_error(e) and attempt < self._max_retries:
+                        self._on_rate_limited(attempt, retry_after_s(e))
+                        attempt += 1
+                        continue
+                    if not is_transient_error(e) or transient_attempt >= self._max_transient_retries:
+                        raise
+                    delay = self._backoff_s(transient_attempt)
+                    transient_attempt += 1
+                    with self._cond:
+                        self.stats.transient_errors += 1
+                        self.stats.backoff_wait_s += delay
+                    print(f"⚠️ Embedding request failed ({e}); retry {transient_attempt} in {delay:.1f}s")
+            if delay:
+                # Sleep outside the slot so other requests can proceed.
+                time.sleep(delay)
+                continue
+            with self._cond:
+                self.stats.requests += 1
+                self.stats.texts += len(texts)
+                self.stats.estimated_tokens += tokens
+            self._on_success()
+            return result
@@ -0,0 +1,439 @@
+"""
+Numeric facts extracted from table blocks, for exact metric lookups.
+
+Financial statement tables (from PDFs and EDGAR HTML alike) are rows of a
+label followed by one value per column. At index time every such row becomes
+one fact per column: ticker, period, normalized metric name (the label,
+lowercased, without footnote markers or punctuation), value, unit ("USD",
+"USD/share", "%", "shares" or ""), scale (from an "in millions"-style note in
+or just above the table) and the table's page, block and line. The column
+holding the document's own period is flagged as current: the one headed by
+the latest year when the header row gives one year per column, otherwise the
+first (statements list the current period first).
+
+Facts live in a SQLite file next to the ingestion manifest, so the API can
+answer "What were AMZN's net sales in Q3-2025?" without embedding or LLM
+calls (see `services/fact_lookup.py`).
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .metadata_schema import Block, Document
+
+FACTS_FILENAME = "facts.sqlite"
+# Bump whenever extraction output changes so builds re-extract unchanged files.
+EXTRACTOR_VERSION = "1"
+
+MAX_LABEL_CHARS = 120
+# One-word labels ("Diluted", "Products") are qualified by their section header.
+MAX_BARE_LABEL_WORDS = 1
+SCALES = {"thousands": 1e3, "millions": 1e6, "billions": 1e9}
+
+_SCALE_NOTE = re.compile(r"\bin\s+(thousands|millions|billions)\b", re.IGNORECASE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+_AMOUNT = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?")
+_DASHES = frozenset({"-", "–", "—", "−", "n/a", "n.a.", "nm"})
+# Cells some filings split off the number next to them.
+_SUFFIX_CELLS = frozenset({")", "%", ")%", "%)"})
+_FOOTNOTE_MARK = re.compile(r"\(\d{1,2}\)|\[\d{1,2}\]")
+_FOOTNOTE = re.compile(r"\(\d{1,2}\)|\[\d{1,2}\]|\*+|(?<=[a-z]{2})[1-9]\b")
+_NON_WORD = re.compile(r"[^a-z0-9%]+")
+_PER_SHARE = re.compile(r"per\s+(?:diluted\s+|basic\s+)?share|\beps\b", re.IGNORECASE)
+_SHARE_COUNT = re.compile(r"\bshares\b|weighted[-\s]average", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    period TEXT NOT NULL,
+    filing_type TEXT,
+    title TEXT,
+    source_url TEXT,
+    local_path TEXT,
+    extractor_version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS facts (
+    doc_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    period TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    scale REAL NOT NULL,
+    column_index INTEGER NOT NULL,
+    column_header TEXT,
+    is_current INTEGER NOT NULL,
+    page INTEGER,
+    table_id TEXT NOT NULL,
+    line INTEGER,
+    row_text TEXT NOT NULL,
+    chunk_id TEXT
+);
+CREATE INDEX IF NOT EXISTS facts_lookup ON facts (ticker, period, metric);
+CREATE INDEX IF NOT EXISTS facts_doc ON facts (doc_id);
+"""
+
+
+@dataclass
+class Fact:
+    doc_id: str
+    ticker: str
+    period: str
+    metric: str
+    label: str
+    value: float
+    unit: str
+    scale: float
+    column_index: int
+    column_header: Optional[str]
+    is_current: bool
+    page: Optional[int]
+    table_id: str
+    line: Optional[int]
+    row_text: str
+    chunk_id: Optional[str] = None
+
+    @property
+    def scaled_value(self) -> float:
+        return self.value * self.scale
+
+
+@dataclass
+class FactDocument:
+    """Where a document's facts came from, for citations."""
+    doc_id: str
+    ticker: str
+    period: str
+    filing_type: str = ""
+    title: str = ""
+    source_url: str = ""
+    local_path: str = ""
+
+
+def normalize_metric(label: str) -> str:
+    """'Net sales (1)' / 'NET SALES' / 'Net sales:' -> 'net sales'."""
+    text = _FOOTNOTE.sub(" ", label.lower().replace("&", " and "))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def parse_amount(text: str) -> Optional[Tuple[float, bool, bool]]:
+    """
+    Parse a table cell as a number.
+
+    Returns:
+        (value, is_percent, has_dollar), or None if the cell is not a number.
+        Parentheses and leading minus signs make the value negative.
+    """
+    t = text.replace(" ", "").replace("−", "-")
+    has_dollar = "$" in t
+    t = t.replace("$", "")
+    negative = t.startswith("(") and t.endswith(")")
+    t = t.strip("()")
+    is_percent = t.endswith("%")
+    t = t.rstrip("%")
+    if t.startswith("-"):
+        negative, t = True, t[1:]
+    if not _AMOUNT.fullmatch(t):
+        return None
+    value = float(t.replace(",", ""))
+    return (-value if negative else value), is_percent, has_dollar
+
+
+def _row_values(cells: Sequence[str]) -> Optional[List[Optional[Tuple[float, bool, bool]]]]:
+    """
+    Values of a row's cells after the label, one per column (None for dashes).
+
+    Returns None unless every non-empty cell is a number or a dash.
+    """
+    tokens: List[str] = []
+    dollar = False
+    for text in cells:
+        text = text.strip()
+        if not text:
+            continue
+        if text == "$":
+            dollar = True
+        elif text in _SUFFIX_CELLS and tokens:
+            tokens[-1] += text
+        else:
+            tokens.append(("$" if dollar else "") + text)
+            dollar = False
+    values: List[Optional[Tuple[float, bool, bool]]] = []
+    for token in tokens:
+        if token.lstrip("$").lower() in _DASHES:
+            values.append(None)
+            continue
+        parsed = parse_amount(token)
+        if parsed is None:
+            return None
+        values.append(parsed)
+    return values if any(v is not None for v in values) else None
+
+
+def _table_rows(block: Block) -> List[List[str]]:
+    rows: Dict[int, Dict[int, str]] = {}
+    for cell in block.cells or []:
+        rows.setdefault(cell.row, {})[cell.col] = cell.text or ""
+    return [[cols[c] for c in sorted(cols)] for _, cols in sorted(rows.items())]
+
+
+def _table_scale(block: Block, text_above: Optional[Block]) -> Optional[float]:
+    """
+    Scale from a note in the table's first rows, else the last note in the text above it.
+
+    A note's first scale wins: "In millions, except shares, which are in thousands".
+    """
+    lines = [line.text for line in block.lines[:3]]
+    if text_above is not None and text_above.page_number == block.page_number:
+        lines.extend(reversed([line.text for line in text_above.lines]))
+    for text in lines:
+        match = _SCALE_NOTE.search(text)
+        if match:
+            return SCALES[match.group(1).lower()]
+    return None
+
+
+def _header_years(rows: List[List[str]]) -> Optional[List[str]]:
+    """Years named by the header row (e.g. "(In millions) | 2025 | 2024"), in column order."""
+    for row in rows:
+        cells = [c.strip() for c in row if c.strip()]
+        if not cells:
+            continue
+        years = [y for c in cells for y in _YEAR.findall(c)]
+        if len(years) >= 2 and all(_YEAR.search(c) or parse_amount(c) is None for c in cells):
+            return years
+        if _row_values(row[1:]) is not None:
+            # Reached the data rows without a header.
+            return None
+    return None
+
+
+def _unit_and_scale(label: str, values, table_scale: Optional[float], dollar_table: bool) -> Tuple[str, float]:
+    if any(v is not None and v[1] for v in values):
+        return "%", 1.0
+    if _SHARE_COUNT.search(label):
+        return "shares", table_scale or 1.0
+    if _PER_SHARE.search(label):
+        # "(In millions, except per share data)"
+        return "USD/share", 1.0
+    if dollar_table or any(v is not None and v[2] for v in values):
+        return "USD", table_scale or 1.0
+    return "", table_scale or 1.0
+
+
+def extract_table_facts(block: Block, document: FactDocument, text_above: Optional[Block] = None) -> List[Fact]:
+    """
+    Facts of one table block.
+
+    `text_above` is the nearest paragraph block before the table (a PDF
+    page's text, or the HTML paragraph above), searched for a scale note.
+    """
+    if block.type != "table" or not block.cells:
+        return []
+    rows = _table_rows(block)
+    table_scale = _table_scale(block, text_above)
+    years = _header_years(rows)
+    dollar_table = any("$" in text for row in rows for text in row)
+    # Table lines skip empty rows in HTML blocks, so find each row's line by its text.
+    line_numbers = {}
+    for line in block.lines:
+        line_numbers.setdefault(line.text, line.line_number)
+
+    facts: List[Fact] = []
+    section = ""
+    for row in rows:
+        if not row or not row[0].strip():
+            continue
+        label = " ".join(_FOOTNOTE_MARK.sub(" ", row[0]).split())
+        if len(label) > MAX_LABEL_CHARS or not any(ch.isalpha() for ch in label):
+            continue
+        if not any(cell.strip() for cell in row[1:]):
+            # "Earnings per share:" heads the rows below it.
+            section = label.rstrip(":").strip()
+            continue
+        values = _row_values(row[1:])
+        if values is None:
+            continue
+        if section and len(normalize_metric(label).split()) <= MAX_BARE_LABEL_WORDS:
+            label = f"{section}: {label}"
+        metric = normalize_metric(label)
+        if not metric:
+            continue
+        headers = years if years is not None and len(years) == len(values) else None
+        current = headers.index(max(headers)) if headers else 0
+        unit, scale = _unit_and_scale(label, values, table_scale, dollar_table)
+        row_text = " | ".join(row)
+        for col, parsed in enumerate(values):
+            if parsed is None:
+                continue
+            facts.append(
+                Fact(
+                    doc_id=document.doc_id,
+                    ticker=document.ticker,
+                    period=document.period,
+                    metric=metric,
+                    label=label,
+                    value=parsed[0],
+                    unit=unit,
+                    scale=scale,
+                    column_index=col,
+                    column_header=headers[col] if headers else None,
+                    is_current=col == current,
+                    page=block.page_number,
+                    table_id=block.block_id,
+                    line=line_numbers.get(row_text),
+                    row_text=row_text,
+                )
+            )
+    return facts
+
+
+def fact_document_for(doc: Document) -> FactDocument:
+    meta = doc.metadata
+    return FactDocument(
+        doc_id=meta.doc_id,
+        ticker=(meta.ticker or "").upper(),
+        period=meta.period or "",
+        filing_type=meta.filing_type or "",
+        title=meta.title or "",
+        source_url=meta.source_url or "",
+        local_path=str(meta.local_path) if meta.local_path else "",
+    )
+
+
+def extract_facts(doc: Document) -> List[Fact]:
+    """Facts of every table block in `doc`."""
+    document = fact_document_for(doc)
+    facts: List[Fact] = []
+    text_above: Optional[Block] = None
+    for block in doc.blocks:
+        if block.type == "table":
+            facts.extend(extract_table_facts(block, document, text_above))
+        else:
+            text_above = block
+    return facts
+
+
+def link_chunks(facts: List[Fact], chunks: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    Point each fact at the chunk holding its table row, given (chunk ID, metadata) pairs.
+
+    Chunks record their block and line span, so a fact belongs to the chunk
+    of its table whose lines include the fact's line.
+    """
+    spans: Dict[str, List[Tuple[int, int, str]]] = {}
+    for chunk_id, meta in chunks:
+        if meta.get("block_type") == "table":
+            spans.setdefault(str(meta.get("block_ids")), []).append(
+                (meta.get("line_start") or 0, meta.get("line_end") or 0, chunk_id)
+            )
+    for fact in facts:
+        candidates = spans.get(fact.table_id, [])
+        matching = [cid for start, end, cid in candidates if fact.line is not None and start <= fact.line <= end]
+        fact.chunk_id = (matching or [cid for _, _, cid in candidates] or [None])[0]
+
+
+def facts_path_for(persist_dir: Path) -> Path:
+    """The facts store lives next to the Chroma directory, like the manifest."""
+    return Path(persist_dir).parent / FACTS_FILENAME
+
+
+_FACT_COLUMNS = (
+    "doc_id", "ticker", "period", "metric", "label", "value", "unit", "scale", "column_index",
+    "column_header", "is_current", "page", "table_id", "line", "row_text", "chunk_id",
+)
+_DOCUMENT_COLUMNS = ("doc_id", "ticker", "period", "filing_type", "title", "source_url", "local_path")
+
+
+class FactsStore:
+    """SQLite table of facts, indexed by (ticker, period, metric). Safe to share between threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def replace_document(self, document: FactDocument, facts: Iterable[Fact]) -> int:
+        """Replace everything stored for `document` with `facts`; returns how many were stored."""
+        rows = [tuple(getattr(f, c) for c in _FACT_COLUMNS) for f in facts]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM facts WHERE doc_id = ?", (document.doc_id,))
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO documents ({', '.join(_DOCUMENT_COLUMNS)}, extractor_version) "
+                f"VALUES ({', '.join('?' * (len(_DOCUMENT_COLUMNS) + 1))})",
+                tuple(getattr(document, c) for c in _DOCUMENT_COLUMNS) + (EXTRACTOR_VERSION,),
+            )
+            self._conn.executemany(
+                f"INSERT INTO facts ({', '.join(_FACT_COLUMNS)}) VALUES ({', '.join('?' * len(_FACT_COLUMNS))})",
+                rows,
+            )
+        return len(rows)
+
+    def remove_documents(self, doc_ids: Iterable[str]) -> None:
+        ids = [(doc_id,) for doc_id in doc_ids]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM facts WHERE doc_id = ?", ids)
+            self._conn.executemany("DELETE FROM documents WHERE doc_id = ?", ids)
+
+    def document_versions(self) -> Dict[str, str]:
+        """doc_id -> extractor version of every document with extracted facts."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT doc_id, extractor_version FROM documents"))
+
+    def document(self, doc_id: str) -> Optional[FactDocument]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_DOCUMENT_COLUMNS)} FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return FactDocument(*row) if row else None
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT ticker FROM documents")]
+
+    def titles(self, ticker: str, period: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT title FROM documents WHERE ticker = ? AND period = ?", (ticker.upper(), period)
+            )
+            return [row[0] for row in rows if row[0]]
+
+    def metrics(self, ticker: str, period: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT metric FROM facts WHERE ticker = ? AND period = ?", (ticker.upper(), period)
+            )
+            return [row[0] for row in rows]
+
+    def lookup(self, ticker: str, period: str, metric: str, current_only: bool = True) -> List[Fact]:
+        """Facts for a metric, ordered by document and position."""
+        sql = (
+            f"SELECT {', '.join(_FACT_COLUMNS)} FROM facts WHERE ticker = ? AND period = ? AND metric = ?"
+            + (" AND is_current = 1" if current_only else "")
+            + " ORDER BY doc_id, page, table_id, line, column_index"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (ticker.upper(), period, metric)).fetchall()
+        facts = [Fact(*row) for row in rows]
+        for fact in facts:
+            fact.is_current = bool(fact.is_current)
+        return facts
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
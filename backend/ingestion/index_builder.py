@@ -1,20 +1,67 @@
 from __future__ import annotations
 
+import json
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
 
 from tqdm import tqdm
 
-from ..app.openai_client import OpenAIClient
-from .chunking import chunk_document, ChunkingConfig
-from .metadata_schema import Chunk, Document
+from .boilerplate import BoilerplateConfig, BoilerplateReport, strip_boilerplate
+from .checkpoint import BuildCheckpoint, resume_completed_documents
+from .chunking import chunk_document, content_digest, ChunkingConfig
+from .dedup import SOURCE_FIELDS, ChunkDeduplicator, DedupConfig, DedupReport, chunk_sources
+from .embedding import (
+    DEFAULT_BATCH_MAX_ITEMS,
+    DEFAULT_BATCH_MAX_TOKENS,
+    MAX_INPUT_TOKENS,
+    AdaptiveEmbedder,
+    BatchPacker,
+    EmbeddingStats,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+from .facts import FactsStore, extract_facts, fact_document_for, link_chunks
+from .manifest import IndexPlan, IngestionManifest, SourceFile, chunking_config_hash
+from .metadata_schema import Block, Chunk, Document
+from .pipeline import IngestionPipeline, PipelineReport
 from ..vectorstore.chroma_store import ChromaVectorStore
 
+@dataclass
+class IndexReport:
+    files_indexed: int = 0
+    files_added: int = 0
+    files_updated: int = 0
+    files_skipped: int = 0
+    files_deleted: int = 0
+    chunks_upserted: int = 0
+    chunks_deleted: int = 0
+    chunks_reused: int = 0
+    chunks_resumed: int = 0
+    # Chunks of re-indexed files whose content (and so ID) did not change.
+    chunks_kept: int = 0
+    chunks_redirected: int = 0
+    embedding_calls: int = 0
+    chunks_truncated: int = 0
+    facts_stored: int = 0
+    pipeline: Optional[PipelineReport] = None
+    embedding: Optional[EmbeddingStats] = None
+    boilerplate: Optional[BoilerplateReport] = None
+    dedup: Optional[DedupReport] = None
 
-def build_chunks_for_documents(documents: Iterable[Document]) -> List[Chunk]:
-    """Build chunks from documents using the default chunking configuration."""
-    # Create chunking config with default values
-    config = ChunkingConfig(
+    @property
+    def embedding_calls_saved(self) -> int:
+        """Batched embedding requests the skipped files would have cost (at this run's batch sizes)."""
+        batching = self.pipeline.batching if self.pipeline is not None else None
+        per_batch = batching.avg_items_per_batch if batching is not None and batching.batches else 0.0
+        return math.ceil(self.chunks_reused / (per_batch or DEFAULT_BATCH_MAX_ITEMS))
+
+
+def default_chunking_config() -> ChunkingConfig:
+    return ChunkingConfig(
         max_tokens=800,
         overlap_tokens=200,
         min_chunk_size=100,
@@ -25,6 +72,13 @@ def build_chunks_for_documents(documents: Iterable[Document]) -> List[Chunk]:
         add_section_headers=True,
         use_semantic_boundaries=True,
     )
+
+
+def build_chunks_for_documents(
+    documents: Iterable[Document], config: Optional[ChunkingConfig] = None
+) -> List[Chunk]:
+    """Build chunks from documents using the default chunking configuration."""
+    config = config or default_chunking_config()
     
     chunks: List[Chunk] = []
     for doc in documents:
@@ -36,45 +90,467 @@ def build_chunks_for_documents(documents: Iterable[Document]) -> List[Chunk]:
     return chunks
 
 
+@dataclass
+class _ChunkPosition:
+    """Where a re-indexed document's chunk sits, for redirecting the IDs it replaced."""
+    chunk_id: str
+    digest: str
+    page: Optional[int]
+    line_start: Optional[int]
+    line_end: Optional[int]
+
+
+def _redirect_target(old: Chunk, positions: List[_ChunkPosition]) -> Optional[str]:
+    """The new chunk with the same text, else the one closest to the old chunk's page and lines."""
+    if not positions:
+        return None
+    digest = content_digest(old.text)
+    for position in positions:
+        if position.digest == digest:
+            return position.chunk_id
+    page = old.metadata.get("page_start") or 0
+    start, end = old.metadata.get("line_start"), old.metadata.get("line_end")
+
+    def distance(position: _ChunkPosition):
+        page_gap = abs((position.page or 0) - page)
+        if None in (start, end, position.line_start, position.line_end):
+            return (page_gap, 0, 0)
+        overlap = min(end, position.line_end) - max(start, position.line_start)
+        return (page_gap, -overlap, abs(position.line_start - start))
+
+    return min(positions, key=distance).chunk_id
+
+
+def _with_facts(documents: Iterable[Document], facts_by_doc: Dict[str, tuple]) -> Iterator[Document]:
+    """Extract each document's table facts before boilerplate removal can drop their scale notes."""
+    for doc in documents:
+        facts_by_doc[doc.metadata.doc_id] = (fact_document_for(doc), extract_facts(doc))
+        yield doc
+
+
+def backfill_facts(
+    store: FactsStore,
+    documents: Iterable[Document],
+    chunk_ids_by_doc: Dict[str, List[str]],
+    vector_store: ChromaVectorStore,
+) -> int:
+    """
+    Extract facts of documents that are already indexed and are not being re-indexed.
+
+    Used when the facts store is new or its extractor changed. Facts are
+    linked to the document's stored chunks (`chunk_ids_by_doc`, from the
+    manifest). Returns the number of facts stored.
+    """
+    stored = 0
+    for doc in documents:
+        doc_facts = extract_facts(doc)
+        chunks = vector_store.get_chunks(chunk_ids_by_doc.get(doc.metadata.doc_id, []))
+        link_chunks(doc_facts, ((c.chunk_id, c.metadata) for c in chunks))
+        stored += store.replace_document(fact_document_for(doc), doc_facts)
+    return stored
+
+
+def _prune_shared_sources(vector_store: ChromaVectorStore, chunk_ids: List[str], manifest: IngestionManifest) -> None:
+    """
+    Drop provenance of documents that no longer reference these shared chunks.
+
+    If the chunk's own document is among them, the first remaining source
+    becomes the chunk's primary location, so filters and citations follow it.
+    """
+    referencing: Dict[str, set] = {}
+    for entry in manifest.entries.values():
+        for cid in entry.chunk_ids:
+            referencing.setdefault(cid, set()).add(entry.doc_id)
+    ids: List[str] = []
+    updates: List[Dict[str, object]] = []
+    for cid in chunk_ids:
+        chunk = vector_store.get_chunk(cid)
+        if chunk is None:
+            continue
+        docs = referencing.get(cid, set())
+        kept = [src for src in chunk_sources(chunk.metadata) if src.get("doc_id") in docs]
+        if not kept:
+            continue
+        update: Dict[str, object] = {"sources": json.dumps(kept) if len(kept) > 1 else None}
+        if chunk.metadata.get("doc_id") not in docs:
+            update.update({key: kept[0].get(key) for key in SOURCE_FIELDS})
+            page_start, page_end = kept[0].get("page_start"), kept[0].get("page_end")
+            update["page_number"] = page_start if page_start == page_end else None
+        ids.append(cid)
+        updates.append(update)
+    if ids:
+        vector_store.update_metadata(ids, updates)
+
+
+def release_chunks(vector_store: ChromaVectorStore, chunk_ids: Iterable[str], manifest: IngestionManifest) -> List[str]:
+    """
+    Of chunk IDs documents stopped producing, the ones safe to delete.
+
+    Chunks shared between documents (deduplicated) survive while any manifest
+    entry still references them; their provenance is pruned to the documents
+    that do. Call after the manifest records the new chunk IDs.
+    """
+    referenced = {cid for entry in manifest.entries.values() for cid in entry.chunk_ids}
+    candidates = list(dict.fromkeys(chunk_ids))
+    shared = [cid for cid in candidates if cid in referenced]
+    if shared:
+        _prune_shared_sources(vector_store, shared, manifest)
+    return [cid for cid in candidates if cid not in referenced]
+
+
+def resume_checkpoint(
+    checkpoint: BuildCheckpoint,
+    manifest: IngestionManifest,
+    sources: Iterable[SourceFile],
+    vector_store: ChromaVectorStore,
+) -> Set[str]:
+    """
+    Fold the documents an interrupted build finished into the manifest.
+
+    Chunks their previous entries listed that the interrupted run did not
+    re-produce are deleted, except those another document still references.
+    Returns the source keys that no longer need indexing.
+    """
+    resumed, stale_ids = resume_completed_documents(checkpoint, manifest, sources)
+    stale_ids = release_chunks(vector_store, stale_ids, manifest)
+    if stale_ids:
+        vector_store.delete(stale_ids)
+    return resumed
+
+
+def _apply_plan(
+    vector_store: ChromaVectorStore,
+    chunk_ids_by_doc: Dict[str, List[str]],
+    manifest: IngestionManifest,
+    plan: IndexPlan,
+    chunking_hash: str,
+    report: IndexReport,
+    positions_by_doc: Optional[Dict[str, List[_ChunkPosition]]] = None,
+) -> None:
+    """
+    Record indexed files in the manifest and delete chunks nothing produces any more.
+
+    Deleted chunks of re-indexed files are redirected to their replacement
+    (see `positions_by_doc`) in the manifest's redirect table.
+    """
+    sources_by_doc = {source.job.doc_id: source for source in plan.to_index}
+    changed_keys = {source.source_key for source in plan.changed}
+    stale_ids: List[str] = []
+    vanished_by_doc: Dict[str, List[str]] = {}
+
+    for doc_id, new_ids in chunk_ids_by_doc.items():
+        source = sources_by_doc.get(doc_id)
+        if source is None:
+            continue
+        previous = manifest.entries.get(source.source_key)
+        if previous is not None:
+            new_set = set(new_ids)
+            vanished_by_doc[doc_id] = [cid for cid in previous.chunk_ids if cid not in new_set]
+            stale_ids.extend(vanished_by_doc[doc_id])
+        manifest.record(source, chunking_hash, new_ids)
+        if source.source_key in changed_keys:
+            report.files_updated += 1
+        else:
+            report.files_added += 1
+
+    for entry in plan.removed:
+        stale_ids.extend(entry.chunk_ids)
+        manifest.remove(entry.source_key)
+    report.files_deleted = len(plan.removed)
+
+    report.files_skipped = len(plan.unchanged)
+    report.chunks_reused = report.chunks_kept + sum(
+        len(manifest.entries[s.source_key].chunk_ids) for s in plan.unchanged
+    )
+
+    stale_ids = release_chunks(vector_store, stale_ids, manifest)
+
+    # Old citation URLs of re-indexed files keep working through redirects.
+    redirects: Dict[str, str] = {}
+    stale_set = set(stale_ids)
+    old_ids = [cid for ids in vanished_by_doc.values() for cid in ids if cid in stale_set]
+    if old_ids and positions_by_doc:
+        old_chunks = {c.chunk_id: c for c in vector_store.get_chunks(old_ids)}
+        for doc_id, ids in vanished_by_doc.items():
+            for cid in ids:
+                old = old_chunks.get(cid)
+                target = _redirect_target(old, positions_by_doc.get(doc_id, [])) if old is not None else None
+                if target is not None:
+                    redirects[cid] = target
+    manifest.add_redirects(redirects)
+    report.chunks_redirected = len(redirects)
+
+    if stale_ids:
+        print(f"Deleting {len(stale_ids)} stale chunks...")
+        report.chunks_deleted = vector_store.delete(stale_ids)
+    manifest.save()
+
+
 def index_documents(
     documents: Iterable[Document],
     *,
-    openai_client: OpenAIClient,
     persist_dir: Path,
     collection_name: str = "financial_docs",
-) -> None:
+    manifest: Optional[IngestionManifest] = None,
+    plan: Optional[IndexPlan] = None,
+    queue_size: int = 4,
+    embedding_concurrency: int = 1,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    batch_max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+    batch_max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+    checkpoint: Optional[BuildCheckpoint] = None,
+    boilerplate: Optional[BoilerplateConfig] = None,
+    boilerplate_reference: Optional[Callable[[str], Iterable[Sequence[Block]]]] = None,
+    dedup: Optional[DedupConfig] = None,
+    facts: Optional[FactsStore] = None,
+) -> IndexReport:
+    """
+    Chunk, embed and upsert documents as a streaming pipeline.
+
+    `documents` is consumed lazily (it may be a generator driving the parse
+    pool), so embedding starts with the first document and at most
+    `queue_size` documents and batches are buffered between stages. Chunks
+    are embedded with the collection's own embedding function, so stored
+    vectors match the ones queries are embedded with, and the vectors are
+    upserted with them. Up to `embedding_concurrency` batches are embedded at
+    once, throttled to the given per-minute request/token budgets and backing
+    off on 429s. Chunks are packed into batches by estimated token count, up
+    to `batch_max_tokens` and `batch_max_items` per batch.
+
+    When `manifest` and `plan` are given (incremental builds), the manifest is
+    updated with each indexed file's chunk IDs, and chunks belonging to changed
+    or removed files that were not re-produced are deleted in bulk. Chunk IDs
+    are content-addressed, so a changed file's chunks that are re-produced
+    unchanged are not embedded or upserted again (only their metadata is
+    refreshed), and its deleted chunk IDs are redirected to their replacements.
+
+    With a `checkpoint` (which needs `plan`), every upserted batch and every
+    completed document is recorded as it happens, and chunks the checkpoint
+    already lists (from an interrupted run) are skipped instead of re-embedded.
+
+    With a `boilerplate` config, lines repeated across a ticker's pages and
+    documents are removed before chunking (see `boilerplate.py`);
+    `boilerplate_reference` supplies blocks of the ticker's documents that are
+    not being re-indexed, so incremental builds count the same corpus.
+
+    With a `dedup` config, chunks that duplicate (exactly or nearly) an earlier
+    chunk of the same ticker and period, from this build or from an unchanged
+    document already in the store, are not embedded: their document references
+    the earlier chunk, whose `sources` metadata lists every location (see
+    `dedup.py`).
+
+    With a `facts` store, each document's table rows are extracted as
+    numeric facts (see `facts.py`), linked to the chunks holding them, and
+    replace the document's previous facts; removed files lose theirs.
+    """
     vector_store = ChromaVectorStore(persist_directory=str(persist_dir), collection_name=collection_name)
-    chunks = build_chunks_for_documents(documents)
-    
-    print(f"Created {len(chunks)} chunks from documents")
+    config = default_chunking_config()
+    report = IndexReport()
+    # doc_id -> (FactDocument, facts), extracted before boilerplate removal.
+    facts_by_doc: Dict[str, tuple] = {}
+    if facts is not None:
+        documents = _with_facts(documents, facts_by_doc)
+    if boilerplate is not None:
+        report.boilerplate = BoilerplateReport()
+        documents = strip_boilerplate(documents, boilerplate, report.boilerplate, boilerplate_reference)
+    # Only IDs are kept per document; the chunks themselves are released once upserted.
+    chunk_ids_by_doc: Dict[str, List[str]] = {}
+    sources_by_doc = {source.job.doc_id: source for source in plan.to_index} if plan is not None else {}
+    # Chunks of each document still waiting to be upserted (checkpointing only).
+    pending_by_doc: Dict[str, int] = {}
+    pending_lock = threading.Lock()
+    deduplicator: Optional[ChunkDeduplicator] = None
+    if dedup is not None:
+        report.dedup = DedupReport()
+        deduplicator = ChunkDeduplicator(dedup, report.dedup)
+    # Canonical chunks that gained duplicates since their provenance was last written.
+    pending_sources: set = set()
+    upserted_ids: set = set()
+    seeded_scopes: set = set()
+    positions_by_doc: Dict[str, List[_ChunkPosition]] = {}
+    kept_metadata: List[tuple] = []
+    sources_lock = threading.Lock()
+    # The total grows as documents are chunked, so the bar tracks known work.
+    progress = tqdm(desc="Indexing chunks", unit="chunk", total=0)
+    embedder = AdaptiveEmbedder(
+        vector_store.embed_texts,
+        max_concurrency=embedding_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+    )
 
-    if not chunks:
-        print("WARNING: No chunks created! Check document parsing.")
-        return
+    def seed_deduplicator(doc: Document) -> None:
+        """Offer stored chunks of unchanged documents in this doc's ticker and period as canonical copies."""
+        scope = (doc.metadata.ticker.lower(), doc.metadata.period)
+        if plan is None or scope in seeded_scopes:
+            return
+        seeded_scopes.add(scope)
+        for stored in vector_store.get_period_chunks(*scope):
+            if stored.metadata.get("doc_id") in sources_by_doc:
+                continue
+            sources = [s for s in chunk_sources(stored.metadata) if s.get("doc_id") not in sources_by_doc]
+            deduplicator.add_stored(stored, sources)
+            upserted_ids.add(stored.chunk_id)
 
-    # Embed in batches to avoid very large requests
-    batch_size = 64
-    total_batches = (len(chunks) + batch_size - 1) // batch_size
-    print(f"Indexing {len(chunks)} chunks in {total_batches} batches...")
-    
-    for i in tqdm(range(0, len(chunks), batch_size), desc="Indexing chunks"):
-        batch = chunks[i : i + batch_size]
+    def chunk(doc: Document) -> List[Chunk]:
+        all_chunks = build_chunks_for_documents([doc], config)
+        doc_id = doc.metadata.doc_id
+        resolved = [c.chunk_id for c in all_chunks]
+        doc_chunks = all_chunks
+        if deduplicator is not None:
+            # The document references shared chunks instead of storing its own copies.
+            unique: List[Chunk] = []
+            with sources_lock:
+                seed_deduplicator(doc)
+                for i, c in enumerate(all_chunks):
+                    canonical = deduplicator.canonical_for(c)
+                    if canonical is None:
+                        unique.append(c)
+                    else:
+                        resolved[i] = canonical
+                        pending_sources.add(canonical)
+            doc_chunks = unique
+        chunk_ids_by_doc[doc_id] = list(dict.fromkeys(resolved))
+        if doc_id in facts_by_doc:
+            link_chunks(facts_by_doc[doc_id][1], zip(resolved, (c.metadata for c in all_chunks)))
+        source = sources_by_doc.get(doc_id)
+        previous = manifest.entries.get(source.source_key) if manifest is not None and source is not None else None
+        if previous is not None:
+            # Re-indexed file: chunks whose content (and so ID) is already stored are not embedded again.
+            positions_by_doc[doc_id] = [
+                _ChunkPosition(
+                    cid, content_digest(c.text), c.metadata["page_start"], c.metadata["line_start"], c.metadata["line_end"]
+                )
+                for c, cid in zip(all_chunks, resolved)
+            ]
+            stored = set(previous.chunk_ids)
+            kept = [c for c in doc_chunks if c.chunk_id in stored]
+            if kept:
+                with sources_lock:
+                    # Page and line numbers can move even when the text does not.
+                    kept_metadata.extend((c.chunk_id, c.metadata) for c in kept)
+                    upserted_ids.update(c.chunk_id for c in kept)
+                report.chunks_kept += len(kept)
+                doc_chunks = [c for c in doc_chunks if c.chunk_id not in stored]
+        if checkpoint is not None and source is not None:
+            todo = [c for c in doc_chunks if not checkpoint.is_chunk_done(source, c.chunk_id)]
+            report.chunks_resumed += len(doc_chunks) - len(todo)
+            doc_chunks = todo
+            if doc_chunks:
+                with pending_lock:
+                    pending_by_doc[doc_id] = len(doc_chunks)
+            else:
+                checkpoint.record_document(source, chunk_ids_by_doc[doc_id])
+        progress.total += len(doc_chunks)
+        progress.refresh()
+        return doc_chunks
+
+    # The embedded text is capped per input; the stored chunk keeps its full text.
+    input_tokens = min(MAX_INPUT_TOKENS, batch_max_tokens)
+
+    def count_tokens(chunk: Chunk) -> int:
+        # Called once per chunk, on the chunk thread.
+        tokens = estimate_tokens(chunk.text)
+        if tokens > input_tokens:
+            report.chunks_truncated += 1
+        return min(tokens, input_tokens)
+
+    def embed(batch: List[Chunk]) -> List[List[float]]:
         try:
-            embeddings = openai_client.embed_texts([c.text for c in batch])
-            # Chroma can accept embeddings directly, but to keep things simple and
-            # avoid tight coupling we store only texts + metadata and let Chroma
-            # do its own embedding if configured. For now, we ignore embeddings.
-            vector_store.upsert(batch)
+            return embedder.embed([truncate_to_tokens(c.text, input_tokens) for c in batch])
         except Exception as e:
-            print(f"ERROR in batch {i//batch_size + 1}: {e}")
+            print(f"ERROR embedding batch starting at {batch[0].chunk_id}: {e}")
             import traceback
             traceback.print_exc()
             raise
+
+    def checkpoint_batch(batch: List[Chunk]) -> None:
+        checkpoint.record_batch(
+            (sources_by_doc[c.metadata["doc_id"]], c.chunk_id)
+            for c in batch
+            if c.metadata["doc_id"] in sources_by_doc
+        )
+        for doc_id, count in Counter(c.metadata["doc_id"] for c in batch).items():
+            with pending_lock:
+                if doc_id not in pending_by_doc:
+                    continue
+                pending_by_doc[doc_id] -= count
+                finished = pending_by_doc[doc_id] <= 0
+                if finished:
+                    del pending_by_doc[doc_id]
+            if finished:
+                checkpoint.record_document(sources_by_doc[doc_id], chunk_ids_by_doc[doc_id])
+
+    def write_sources(ready_only: bool) -> None:
+        """Store provenance of canonical chunks that gained duplicates (once they exist in the store)."""
+        with sources_lock:
+            ready = [cid for cid in pending_sources if not ready_only or cid in upserted_ids]
+            pending_sources.difference_update(ready)
+            updates = [{"sources": json.dumps(report.dedup.groups[cid])} for cid in ready]
+        if ready:
+            vector_store.update_metadata(ready, updates)
+
+    def upsert(batch: List[Chunk], embeddings: List[List[float]]) -> None:
+        vector_store.upsert(batch, embeddings)
+        if deduplicator is not None:
+            with sources_lock:
+                upserted_ids.update(c.chunk_id for c in batch)
+            write_sources(ready_only=True)
+        report.chunks_upserted += len(batch)
+        progress.update(len(batch))
+        if checkpoint is not None:
+            checkpoint_batch(batch)
+
+    pipeline = IngestionPipeline(
+        chunk=chunk,
+        embed=embed,
+        store=upsert,
+        make_packer=lambda: BatchPacker(count_tokens, max_tokens=batch_max_tokens, max_items=batch_max_items),
+        queue_size=queue_size,
+        embed_concurrency=embedding_concurrency,
+    )
+    try:
+        report.pipeline = pipeline.run(documents)
+    finally:
+        progress.close()
+        report.embedding_calls = embedder.stats.requests
+        report.embedding = embedder.stats
+    if kept_metadata:
+        vector_store.update_metadata([cid for cid, _ in kept_metadata], [meta for _, meta in kept_metadata])
+    if deduplicator is not None:
+        # Canonical chunks skipped by a resumed build are already stored.
+        write_sources(ready_only=False)
+    if facts is not None:
+        if plan is not None:
+            facts.remove_documents(e.doc_id for e in plan.removed if e.doc_id not in chunk_ids_by_doc)
+        for doc_id, (document, doc_facts) in facts_by_doc.items():
+            if doc_id in chunk_ids_by_doc:
+                report.facts_stored += facts.replace_document(document, doc_facts)
+    report.files_indexed = report.pipeline.documents
+    print(f"Created {report.pipeline.chunks} chunks from {report.files_indexed} documents")
+    if report.chunks_resumed:
+        print(f"Resumed: {report.chunks_resumed} chunks were already upserted by the interrupted build")
+
+    if report.files_indexed and not report.chunks_upserted and not report.chunks_resumed:
+        print("WARNING: No chunks created! Check document parsing.")
+
+    if manifest is not None and plan is not None:
+        _apply_plan(
+            vector_store,
+            chunk_ids_by_doc,
+            manifest,
+            plan,
+            chunking_config_hash(config, boilerplate, dedup),
+            report,
+            positions_by_doc,
+        )
     
     # Verify storage
-    collection = vector_store._collection
-    stored_count = collection.count()
+    stored_count = vector_store.count()
     print(f"Verification: {stored_count} chunks stored in vector database")
+    return report
+
 
 # from __future__ import annotations
 
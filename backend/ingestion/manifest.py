@@ -0,0 +1,209 @@
+"""
+Ingestion manifest for incremental index builds.
+
+A JSON file next to the Chroma directory records, per source file, the content
+hash, parser version and chunking config it was indexed with, plus the chunk
+IDs it produced. `plan_incremental_build` compares the files on disk against
+it to decide what to skip, re-index or delete.
+
+It also keeps a redirect table from chunk IDs that were deleted when their
+file was re-indexed to the closest chunk that replaced them, so old citation
+URLs keep resolving.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .boilerplate import BoilerplateConfig
+from .chunking import CHUNKER_VERSION, ChunkingConfig
+from .dedup import DedupConfig
+from .doc_cache import hash_file
+from .parallel_parse import PARSER_VERSIONS, ParseJob
+
+MANIFEST_FILENAME = "ingestion_manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    source_key: str
+    doc_id: str
+    ticker: str
+    content_hash: str
+    parser_version: str
+    chunking_hash: str
+    chunk_ids: List[str] = field(default_factory=list)
+    indexed_at: float = 0.0
+
+
+@dataclass
+class SourceFile:
+    source_key: str
+    job: ParseJob
+    content_hash: str
+    parser_version: str
+
+
+@dataclass
+class IndexPlan:
+    unchanged: List[SourceFile] = field(default_factory=list)
+    changed: List[SourceFile] = field(default_factory=list)
+    added: List[SourceFile] = field(default_factory=list)
+    removed: List[ManifestEntry] = field(default_factory=list)
+
+    @property
+    def to_index(self) -> List[SourceFile]:
+        return self.changed + self.added
+
+
+def manifest_path_for(persist_dir: Path) -> Path:
+    """The manifest sits beside the Chroma directory so both move together."""
+    return Path(persist_dir).parent / MANIFEST_FILENAME
+
+
+def chunking_config_hash(
+    config: ChunkingConfig,
+    boilerplate: Optional[BoilerplateConfig] = None,
+    dedup: Optional[DedupConfig] = None,
+) -> str:
+    """Changes whenever chunk text or IDs would change, including boilerplate and dedup settings."""
+    fields = asdict(config)
+    fields["chunker_version"] = CHUNKER_VERSION
+    if boilerplate is not None:
+        fields["boilerplate"] = asdict(boilerplate)
+    if dedup is not None:
+        fields["dedup"] = asdict(dedup)
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def source_key_for(path: Path, raw_root: Path) -> str:
+    """Path relative to the raw data root, so the manifest survives moving the checkout."""
+    try:
+        return path.resolve().relative_to(raw_root.resolve()).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+def describe_source(job: ParseJob, raw_root: Path) -> SourceFile:
+    # Stored on the job too so the document cache does not hash the file again.
+    if job.content_hash is None:
+        job.content_hash = hash_file(job.path)
+    return SourceFile(
+        source_key=source_key_for(job.path, raw_root),
+        job=job,
+        content_hash=job.content_hash,
+        parser_version=PARSER_VERSIONS[job.kind],
+    )
+
+
+class IngestionManifest:
+    def __init__(
+        self,
+        path: Path,
+        entries: Optional[Dict[str, ManifestEntry]] = None,
+        redirects: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+        # Deleted chunk ID -> live chunk ID that replaced it.
+        self.redirects: Dict[str, str] = redirects or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestionManifest":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {path}: {e}")
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            print(f"⚠️ Manifest version {data.get('version')} != {MANIFEST_VERSION}; rebuilding from scratch")
+            return cls(path)
+        entries = {key: ManifestEntry(**value) for key, value in data.get("files", {}).items()}
+        return cls(path, entries, data.get("redirects", {}))
+
+    def save(self) -> None:
+        """Write atomically so an interrupted build never leaves a truncated manifest."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "files": {key: asdict(entry) for key, entry in sorted(self.entries.items())},
+            "redirects": dict(sorted(self.redirects.items())),
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def record(self, source: SourceFile, chunking_hash: str, chunk_ids: List[str]) -> None:
+        self.entries[source.source_key] = ManifestEntry(
+            source_key=source.source_key,
+            doc_id=source.job.doc_id,
+            ticker=source.job.ticker.upper(),
+            content_hash=source.content_hash,
+            parser_version=source.parser_version,
+            chunking_hash=chunking_hash,
+            chunk_ids=list(chunk_ids),
+            indexed_at=time.time(),
+        )
+
+    def remove(self, source_key: str) -> Optional[ManifestEntry]:
+        return self.entries.pop(source_key, None)
+
+    def add_redirects(self, redirects: Dict[str, str]) -> None:
+        """Record replacements for deleted chunk IDs, collapsing chains and dropping dead targets."""
+        for old_id, new_id in self.redirects.items():
+            self.redirects[old_id] = redirects.get(new_id, new_id)
+        self.redirects.update(redirects)
+        live = {cid for entry in self.entries.values() for cid in entry.chunk_ids}
+        self.redirects = {
+            old_id: new_id for old_id, new_id in self.redirects.items() if old_id not in live and new_id in live
+        }
+
+    def resolve(self, chunk_id: str) -> Optional[str]:
+        return self.redirects.get(chunk_id)
+
+
+def plan_incremental_build(
+    manifest: IngestionManifest,
+    sources: Iterable[SourceFile],
+    chunking_hash: str,
+    tickers: Iterable[str],
+) -> IndexPlan:
+    """
+    Classify sources against the manifest.
+
+    Only manifest entries for `tickers` can be marked removed, so indexing a
+    single ticker never deletes another ticker's chunks.
+    """
+    plan = IndexPlan()
+    seen: set = set()
+    for source in sources:
+        seen.add(source.source_key)
+        entry = manifest.entries.get(source.source_key)
+        if entry is None:
+            plan.added.append(source)
+        elif (
+            entry.content_hash == source.content_hash
+            and entry.parser_version == source.parser_version
+            and entry.chunking_hash == chunking_hash
+            and entry.doc_id == source.job.doc_id
+        ):
+            plan.unchanged.append(source)
+        else:
+            plan.changed.append(source)
+
+    scope = {t.upper() for t in tickers}
+    for key, entry in manifest.entries.items():
+        if key not in seen and entry.ticker.upper() in scope:
+            plan.removed.append(entry)
+    return plan
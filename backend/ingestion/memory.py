@@ -0,0 +1,84 @@
+"""
+Process memory helpers for ingestion reporting.
+
+`current_rss_bytes` reads /proc/self/statm where available (Linux); the peak
+helpers use getrusage, which every POSIX platform provides.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _maxrss_to_bytes(value: int) -> int:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return value if sys.platform == "darwin" else value * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water RSS of this process."""
+    if resource is None:
+        return None
+    return _maxrss_to_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def peak_child_rss_bytes() -> Optional[int]:
+    """High-water RSS of the largest reaped child (e.g. a finished parse worker)."""
+    if resource is None:
+        return None
+    return _maxrss_to_bytes(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def format_mb(n: Optional[int]) -> str:
+    return "n/a" if n is None else f"{n / (1024 * 1024):.0f} MB"
+
+
+class RssSampler:
+    """Background thread that tracks the RSS high-water mark over a window."""
+
+    def __init__(self, interval_s: float = 0.25) -> None:
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_bytes: Optional[int] = None
+        self.peak_bytes: Optional[int] = None
+
+    def _sample(self) -> None:
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self.start_bytes = current_rss_bytes()
+        self.peak_bytes = self.start_bytes
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
@@ -41,6 +41,7 @@ class DocumentMetadata:
     source_url: Optional[str]
     title: Optional[str] = None
     local_path: Optional[Path] = None
+    page_count: Optional[int] = None
 
 
 @dataclass
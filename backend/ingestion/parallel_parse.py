@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+import traceback
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from .doc_cache import DocumentCache, hash_file
+from .memory import RssSampler
+from .metadata_schema import Block, Document, DocumentMetadata
+from .parsers.html_parser import PARSER_VERSION as HTML_PARSER_VERSION
+from .parsers.html_parser import parse_html_to_document
+from .parsers.pdf_parser import PARSER_VERSION as PDF_PARSER_VERSION
+from .parsers.pdf_parser import (
+    count_pdf_pages,
+    parse_pdf_page_range,
+    parse_pdf_to_document,
+    renumber_blocks,
+)
+from .parsers.text_normalizer import tag_sections
+
+SourceKind = Literal["pdf", "html"]
+
+PARSER_VERSIONS: Dict[str, str] = {"pdf": PDF_PARSER_VERSION, "html": HTML_PARSER_VERSION}
+
+# Smallest page range worth its own worker: each range re-opens the PDF, so
+# tiny ranges spend more time in pdfplumber.open than in extraction.
+DEFAULT_MIN_PAGES_PER_RANGE = 16
+
+
+@dataclass
+class ParseJob:
+    path: Path
+    kind: SourceKind
+    doc_id: str
+    ticker: str
+    period: str
+    title: Optional[str] = None
+    source_url: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Run PDF table extraction on every page instead of gated candidates only.
+    force_tables: bool = False
+    # Sample this process's RSS while parsing (memory-budget reporting).
+    track_memory: bool = False
+
+
+@dataclass
+class ParseResult:
+    job: ParseJob
+    document: Optional[Document]
+    error: Optional[str]
+    elapsed_s: float
+    pages: int
+    worker_pid: int
+    parts: int = 1
+    cached: bool = False
+    block_count: int = 0
+    # Only set for jobs with track_memory: the worker's RSS high-water mark
+    # while parsing this file, and how far it rose above the starting RSS
+    # (summed over page ranges).
+    peak_rss_bytes: Optional[int] = None
+    rss_growth_bytes: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.document is not None:
+            self.block_count = len(self.document.blocks)
+
+    @property
+    def pages_per_mb(self) -> Optional[float]:
+        """Pages parsed per MB of RSS growth; None when memory was not tracked."""
+        if self.rss_growth_bytes is None or not self.pages:
+            return None
+        return self.pages / max(self.rss_growth_bytes / (1024 * 1024), 1.0)
+
+
+@dataclass
+class PageRangeTask:
+    job: ParseJob
+    first_page: int
+    last_page: int
+
+
+@dataclass
+class PageRangeResult:
+    blocks: List[Block]
+    elapsed_s: float
+    worker_pid: int
+    peak_rss_bytes: Optional[int] = None
+    rss_growth_bytes: Optional[int] = None
+
+
+def _memory_sampler(job: ParseJob):
+    return RssSampler(interval_s=0.05) if job.track_memory else nullcontext()
+
+
+def _rss_fields(sampler) -> Dict[str, Optional[int]]:
+    if not isinstance(sampler, RssSampler) or sampler.peak_bytes is None:
+        return {}
+    return {
+        "peak_rss_bytes": sampler.peak_bytes,
+        "rss_growth_bytes": max(0, sampler.peak_bytes - (sampler.start_bytes or 0)),
+    }
+
+
+def parse_job(job: ParseJob) -> ParseResult:
+    """
+    Parse one source file and tag its sections.
+
+    Top-level so it can run in a worker process; failures are captured in the
+    result instead of raised so one bad file never aborts the build.
+    """
+    start = time.perf_counter()
+    try:
+        with _memory_sampler(job) as sampler:
+            if job.kind == "pdf":
+                doc = parse_pdf_to_document(
+                    job.path,
+                    doc_id=job.doc_id,
+                    ticker=job.ticker,
+                    filing_type=job.kind,
+                    period=job.period,
+                    source_url=job.source_url,
+                    title=job.title,
+                    force_tables=job.force_tables,
+                )
+            else:
+                doc = parse_html_to_document(
+                    job.path,
+                    doc_id=job.doc_id,
+                    ticker=job.ticker,
+                    filing_type=job.kind,
+                    period=job.period,
+                    source_url=job.source_url,
+                    title=job.title,
+                )
+            tag_sections(doc.blocks)
+    except Exception:
+        return ParseResult(
+            job=job,
+            document=None,
+            error=traceback.format_exc(),
+            elapsed_s=time.perf_counter() - start,
+            pages=0,
+            worker_pid=os.getpid(),
+        )
+    return ParseResult(
+        job=job,
+        document=doc,
+        error=None,
+        elapsed_s=time.perf_counter() - start,
+        pages=doc.metadata.page_count or 0,
+        worker_pid=os.getpid(),
+        **_rss_fields(sampler),
+    )
+
+
+def parse_page_range(task: PageRangeTask) -> PageRangeResult:
+    """Worker entry point for one page range of a split PDF."""
+    start = time.perf_counter()
+    with _memory_sampler(task.job) as sampler:
+        blocks = parse_pdf_page_range(
+            task.job.path, task.first_page, task.last_page, force_tables=task.job.force_tables
+        )
+        tag_sections(blocks)
+    return PageRangeResult(
+        blocks=blocks,
+        elapsed_s=time.perf_counter() - start,
+        worker_pid=os.getpid(),
+        **_rss_fields(sampler),
+    )
+
+
+def plan_page_ranges(page_count: int, workers: int, min_pages_per_range: int) -> List[Tuple[int, int]]:
+    """
+    Split `page_count` pages into at most `workers` contiguous ranges.
+
+    Files with fewer than `2 * min_pages_per_range` pages stay whole, so the
+    threshold adapts to both file size and pool size.
+    """
+    if page_count <= 0 or min_pages_per_range <= 0:
+        return [(1, max(page_count, 1))]
+    n_ranges = min(workers, page_count // min_pages_per_range)
+    if n_ranges <= 1:
+        return [(1, page_count)]
+    size = math.ceil(page_count / n_ranges)
+    return [(first, min(first + size - 1, page_count)) for first in range(1, page_count + 1, size)]
+
+
+def _document_for_job(job: ParseJob, blocks: List[Block], page_count: Optional[int]) -> Document:
+    metadata = DocumentMetadata(
+        doc_id=job.doc_id,
+        ticker=job.ticker,
+        filing_type=job.kind,
+        period=job.period,
+        source_url=job.source_url,
+        title=job.title,
+        local_path=job.path,
+        page_count=page_count,
+    )
+    return Document(metadata=metadata, blocks=blocks)
+
+
+def _merge_page_ranges(job: ParseJob, parts: List[PageRangeResult], page_count: int, wall_s: float) -> ParseResult:
+    blocks: List[Block] = [block for part in parts for block in part.blocks]
+    renumber_blocks(blocks)
+    doc = _document_for_job(job, blocks, page_count)
+    return ParseResult(
+        job=job,
+        document=doc,
+        error=None,
+        elapsed_s=wall_s,
+        pages=page_count,
+        worker_pid=parts[0].worker_pid,
+        parts=len(parts),
+        peak_rss_bytes=max((p.peak_rss_bytes for p in parts if p.peak_rss_bytes is not None), default=None),
+        rss_growth_bytes=(
+            sum(p.rss_growth_bytes or 0 for p in parts)
+            if any(p.rss_growth_bytes is not None for p in parts)
+            else None
+        ),
+    )
+
+
+def _failed(job: ParseJob, error: str, elapsed_s: float = 0.0) -> ParseResult:
+    return ParseResult(job=job, document=None, error=error, elapsed_s=elapsed_s, pages=0, worker_pid=0)
+
+
+def _load_cached(job: ParseJob, cache: DocumentCache) -> Optional[ParseResult]:
+    start = time.perf_counter()
+    try:
+        if job.content_hash is None:
+            job.content_hash = hash_file(job.path)
+    except OSError:
+        # Missing/unreadable file: let the parser report it.
+        return None
+    hit = cache.get(job.content_hash, job.kind, PARSER_VERSIONS[job.kind])
+    if hit is None:
+        return None
+    blocks, page_count = hit
+    tag_sections(blocks)
+    return ParseResult(
+        job=job,
+        document=_document_for_job(job, blocks, page_count),
+        error=None,
+        elapsed_s=time.perf_counter() - start,
+        pages=page_count or 0,
+        worker_pid=os.getpid(),
+        cached=True,
+    )
+
+
+def _store_in_cache(result: ParseResult, cache: DocumentCache) -> None:
+    job, doc = result.job, result.document
+    if doc is None or result.cached or job.content_hash is None:
+        return
+    try:
+        cache.put(
+            job.content_hash,
+            job.kind,
+            PARSER_VERSIONS[job.kind],
+            doc.blocks,
+            doc.metadata.page_count,
+            source_name=job.path.name,
+        )
+    except OSError as e:
+        print(f"⚠️ Could not cache parsed {job.path.name}: {e}")
+
+
+def iter_parsed_documents(
+    jobs: Iterable[ParseJob],
+    workers: int = 1,
+    min_pages_per_range: int = DEFAULT_MIN_PAGES_PER_RANGE,
+    cache: Optional[DocumentCache] = None,
+) -> Iterator[ParseResult]:
+    """
+    Parse jobs and yield results in job order.
+
+    With `workers > 1` files are parsed in a process pool. Results are streamed
+    back as soon as every earlier job has finished, so downstream chunk IDs stay
+    deterministic. At most `2 * workers` tasks are in flight, which bounds the
+    reorder buffer and provides backpressure to slow consumers.
+
+    Large PDFs are split into page ranges (see `plan_page_ranges`) that run on
+    separate workers and are merged back in page order with the block IDs a
+    serial parse would assign. Set `min_pages_per_range=0` to never split.
+
+    With a `cache`, files whose parsed blocks are already cached are loaded in
+    this process instead of being parsed, and fresh parses are written back.
+    """
+    job_list: List[ParseJob] = list(jobs)
+    if workers <= 1 or (len(job_list) <= 1 and min_pages_per_range <= 0):
+        for job in job_list:
+            result = _load_cached(job, cache) if cache is not None else None
+            if result is None:
+                result = parse_job(job)
+                if cache is not None:
+                    _store_in_cache(result, cache)
+            yield result
+        return
+
+    max_in_flight = workers * 2
+
+    def tasks_for(position: int) -> List[Tuple[int, int, Callable[[Any], Any], Any]]:
+        job = job_list[position]
+        if job.kind == "pdf" and min_pages_per_range > 0:
+            try:
+                page_count = count_pdf_pages(job.path)
+            except Exception:
+                # Let the whole-file worker report the real error.
+                page_count = 0
+            ranges = plan_page_ranges(page_count, workers, min_pages_per_range)
+            if len(ranges) > 1:
+                page_counts[position] = page_count
+                return [
+                    (position, part, parse_page_range, PageRangeTask(job, first, last))
+                    for part, (first, last) in enumerate(ranges)
+                ]
+        return [(position, 0, parse_job, job)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Dict[Future, Tuple[int, int]] = {}
+        queued: Deque[Tuple[int, int, Callable[[Any], Any], Any]] = deque()
+        page_counts: Dict[int, int] = {}
+        parts: Dict[int, List[Optional[PageRangeResult]]] = {}
+        submitted_at: Dict[int, float] = {}
+        errors: Dict[int, str] = {}
+        finished: Dict[int, ParseResult] = {}
+        next_plan = 0
+        next_yield = 0
+        while next_yield < len(job_list):
+            while len(pending) < max_in_flight:
+                if not queued:
+                    if next_plan >= len(job_list) or next_plan - next_yield >= max_in_flight:
+                        break
+                    hit = _load_cached(job_list[next_plan], cache) if cache is not None else None
+                    if hit is not None:
+                        finished[next_plan] = hit
+                        next_plan += 1
+                        continue
+                    planned = tasks_for(next_plan)
+                    if len(planned) > 1:
+                        parts[next_plan] = [None] * len(planned)
+                    queued.extend(planned)
+                    next_plan += 1
+                position, part, fn, arg = queued.popleft()
+                submitted_at.setdefault(position, time.perf_counter())
+                pending[pool.submit(fn, arg)] = (position, part)
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED) if pending else (set(), set())
+            for future in done:
+                position, part = pending.pop(future)
+                job = job_list[position]
+                try:
+                    result = future.result()
+                except Exception:
+                    # Worker crashed (e.g. killed by the OOM killer) or a page
+                    # range failed to parse.
+                    result = None
+                    errors.setdefault(position, traceback.format_exc())
+
+                if position not in parts:
+                    finished[position] = result if result is not None else _failed(job, errors.pop(position))
+                    continue
+
+                parts[position][part] = result
+                outstanding = sum(1 for (p, _) in pending.values() if p == position) + sum(
+                    1 for (p, _, _, _) in queued if p == position
+                )
+                if outstanding:
+                    continue
+                wall_s = time.perf_counter() - submitted_at[position]
+                part_results = parts.pop(position)
+                if position in errors:
+                    finished[position] = _failed(job, errors.pop(position), wall_s)
+                else:
+                    finished[position] = _merge_page_ranges(job, part_results, page_counts[position], wall_s)
+
+            while next_yield in finished:
+                submitted_at.pop(next_yield, None)
+                page_counts.pop(next_yield, None)
+                result = finished.pop(next_yield)
+                if cache is not None:
+                    _store_in_cache(result, cache)
+                yield result
+                next_yield += 1
+
+
+def format_timing_table(
+    results: List[ParseResult], wall_s: float, memory_budget_mb: Optional[float] = None
+) -> str:
+    """
+    Render per-file parse timings plus aggregate throughput.
+
+    When any result tracked memory, adds peak worker RSS and pages per MB of
+    RSS growth, and marks files whose peak exceeded `memory_budget_mb`.
+    """
+    name_width = max([len(r.job.path.name) for r in results] + [4])
+    with_memory = any(r.peak_rss_bytes is not None for r in results)
+    memory_header = f"  {'Peak MB':>7}  {'Pages/MB':>8}" if with_memory else ""
+    width = name_width + 59 + (19 if with_memory else 0)
+    lines = [
+        f"{'File':<{name_width}}  {'Pages':>5}  {'Parts':>5}  {'Blocks':>6}  {'Seconds':>8}  {'Pages/s':>7}{memory_header}  {'PID':>7}  Status",
+        "-" * width,
+    ]
+    over_budget = 0
+    for r in results:
+        rate = r.pages / r.elapsed_s if r.elapsed_s > 0 and r.pages else 0.0
+        status = "FAILED" if r.error is not None else ("cached" if r.cached else "ok")
+        memory = ""
+        if with_memory:
+            peak_mb = r.peak_rss_bytes / (1024 * 1024) if r.peak_rss_bytes is not None else None
+            per_mb = r.pages_per_mb
+            memory = f"  {'-' if peak_mb is None else f'{peak_mb:.0f}':>7}  {'-' if per_mb is None else f'{per_mb:.1f}':>8}"
+            if memory_budget_mb and peak_mb is not None and peak_mb > memory_budget_mb:
+                status += " (over budget)"
+                over_budget += 1
+        lines.append(
+            f"{r.job.path.name:<{name_width}}  {r.pages:>5}  {r.parts:>5}  {r.block_count:>6}  {r.elapsed_s:>8.2f}  {rate:>7.1f}{memory}  {r.worker_pid:>7}  {status}"
+        )
+    total_pages = sum(r.pages for r in results)
+    cpu_s = sum(r.elapsed_s for r in results)
+    lines.append("-" * width)
+    lines.append(
+        f"{len(results)} files, {total_pages} pages in {wall_s:.2f}s wall "
+        f"({total_pages / wall_s if wall_s > 0 else 0.0:.1f} pages/s, {cpu_s:.2f}s summed parse time)"
+    )
+    if with_memory:
+        peaks = [r.peak_rss_bytes for r in results if r.peak_rss_bytes is not None]
+        budget = f"; {over_budget} over the {memory_budget_mb:.0f} MB budget" if memory_budget_mb else ""
+        lines.append(f"Peak worker RSS {max(peaks) / (1024 * 1024):.0f} MB{budget}")
+    return "\n".join(lines)
@@ -1,17 +1,216 @@
+"""
+HTML (EDGAR filing) parser.
+
+The document is read in one pass of parser events, without building a tree.
+Every text node is emitted exactly once, into the paragraph block of its
+nearest block-level element (text before and after a nested block becomes
+separate blocks, in reading order), and `<br>` starts a new line within a
+block. Tables are emitted as table blocks at their position, and their text
+never reaches a paragraph block. Scripts, styles, hidden elements and the
+inline XBRL header (hidden facts and contexts) are skipped.
+
+Events come from lxml's HTML parser when lxml is installed (it is several
+times faster and repairs unclosed tags), otherwise from Python's html.parser.
+"""
+
 from __future__ import annotations
 
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Optional
-
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
 
 from ..metadata_schema import Block, Document, DocumentMetadata, Line, TableCell
 
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+HTML_BACKEND = "lxml" if etree is not None else "html.parser"
+
+# Bump whenever extraction output changes so incremental builds re-parse.
+PARSER_VERSION = "2"
+
+_BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "body", "center", "dd", "div", "dl", "dt",
+        "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+        "hr", "li", "main", "nav", "ol", "p", "pre", "section", "ul",
+    }
+)
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "title", "ix:header"})
+# Elements without an end tag can never open a skipped region.
+_VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"})
+
 
 def _normalize_whitespace(text: str) -> str:
     return " ".join(text.split())
 
 
+def _is_hidden(style: Optional[str]) -> bool:
+    return bool(style) and "display:none" in style.replace(" ", "").lower()
+
+
+class _BlockBuilder:
+    """
+    Turns start/end/data events into blocks.
+
+    Its methods are lxml's parser-target interface; `_StdlibEvents` adapts
+    html.parser to it.
+    """
+
+    def __init__(self) -> None:
+        self.blocks: List[Block] = []
+        self._text: List[str] = []
+        # Tag of the skipped element being inside, and how many of that tag are open.
+        self._skip: Optional[str] = None
+        self._skip_depth = 0
+        # Nested tables are flattened into the outer table's cells.
+        self._table_depth = 0
+        self._rows: List[List[str]] = []
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def start(self, tag: str, attrib: Dict[str, Optional[str]]) -> None:
+        if self._skip is not None:
+            if tag == self._skip:
+                self._skip_depth += 1
+            return
+        if tag in _SKIP_TAGS or (tag not in _VOID_TAGS and _is_hidden(attrib.get("style"))):
+            self._skip, self._skip_depth = tag, 1
+            return
+        if tag == "table":
+            if not self._table_depth:
+                self._flush_text()
+            self._table_depth += 1
+        elif self._table_depth:
+            if self._table_depth == 1 and tag == "tr":
+                self._end_row()
+                self._row = []
+            elif self._table_depth == 1 and tag in ("td", "th"):
+                self._end_cell()
+                self._cell = []
+        elif tag == "br":
+            self._text.append("\n")
+        elif tag in _BLOCK_TAGS:
+            self._flush_text()
+
+    def end(self, tag: str) -> None:
+        if self._skip is not None:
+            if tag == self._skip:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip = None
+            return
+        if tag == "table" and self._table_depth:
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._end_table()
+        elif self._table_depth == 1:
+            if tag in ("td", "th"):
+                self._end_cell()
+            elif tag == "tr":
+                self._end_row()
+        elif not self._table_depth and tag in _BLOCK_TAGS:
+            self._flush_text()
+
+    def data(self, text: str) -> None:
+        if self._skip is not None:
+            return
+        if self._table_depth:
+            if self._cell is not None:
+                self._cell.append(text)
+        else:
+            self._text.append(text)
+
+    def close(self) -> List[Block]:
+        if self._table_depth:
+            self._end_table()
+        self._flush_text()
+        return self.blocks
+
+    def _flush_text(self) -> None:
+        if not self._text:
+            return
+        texts = [_normalize_whitespace(t) for t in "".join(self._text).split("\n")]
+        self._text.clear()
+        lines = [Line(line_number=i, text=t) for i, t in enumerate((t for t in texts if t), start=1)]
+        if lines:
+            self.blocks.append(
+                Block(
+                    block_id=f"p_{len(self.blocks)}",
+                    type="paragraph",
+                    page_number=None,
+                    text="\n".join(l.text for l in lines),
+                    lines=lines,
+                )
+            )
+
+    def _end_cell(self) -> None:
+        if self._cell is not None:
+            if self._row is None:
+                self._row = []
+            # Strings of a cell are space-separated, as get_text(" ") would.
+            self._row.append(_normalize_whitespace(" ".join(self._cell)))
+            self._cell = None
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row is not None:
+            self._rows.append(self._row)
+            self._row = None
+
+    def _end_table(self) -> None:
+        self._end_row()
+        self._table_depth = 0
+        cells: List[TableCell] = []
+        lines: List[Line] = []
+        for r_idx, row in enumerate(self._rows):
+            cells.extend(TableCell(row=r_idx, col=c_idx, text=text) for c_idx, text in enumerate(row))
+            if any(row):
+                lines.append(Line(line_number=len(lines) + 1, text=" | ".join(row)))
+        self._rows = []
+        if lines:
+            self.blocks.append(
+                Block(
+                    block_id=f"t_{len(self.blocks)}",
+                    type="table",
+                    page_number=None,
+                    text="\n".join(l.text for l in lines),
+                    lines=lines,
+                    cells=cells,
+                )
+            )
+
+
+class _StdlibEvents(HTMLParser):
+    def __init__(self, builder: _BlockBuilder) -> None:
+        super().__init__(convert_charrefs=True)
+        self._builder = builder
+
+    def handle_starttag(self, tag, attrs):
+        self._builder.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self._builder.end(tag)
+
+    def handle_data(self, data):
+        self._builder.data(data)
+
+
+def extract_html_blocks(html: str, backend: str = HTML_BACKEND) -> List[Block]:
+    """Paragraph and table blocks of `html` in document order ("lxml" or "html.parser" events)."""
+    builder = _BlockBuilder()
+    if backend == "lxml":
+        parser = etree.HTMLParser(target=builder)
+        parser.feed(html)
+        return parser.close()
+    events = _StdlibEvents(builder)
+    events.feed(html)
+    events.close()
+    return builder.close()
+
+
 def parse_html_to_document(
     file_path: Path,
     *,
@@ -23,55 +222,7 @@ def parse_html_to_document(
     title: Optional[str] = None,
 ) -> Document:
     html = file_path.read_text(encoding="utf-8", errors="ignore")
-    soup = BeautifulSoup(html, "html.parser")
-
-    blocks: List[Block] = []
-    block_index = 0
-
-    # Paragraph-like elements
-    for p in soup.find_all(["p", "div"]):
-        text = _normalize_whitespace(p.get_text(separator=" ", strip=True))
-        if not text:
-            continue
-        lines = [Line(line_number=1, text=text)]
-        block = Block(
-            block_id=f"p_{block_index}",
-            type="paragraph",
-            page_number=None,
-            text=text,
-            lines=lines,
-        )
-        blocks.append(block)
-        block_index += 1
-
-    # Simple table extraction
-    for table in soup.find_all("table"):
-        cells: List[TableCell] = []
-        lines: List[Line] = []
-        line_num = 1
-        for r_idx, row in enumerate(table.find_all("tr")):
-            row_texts: List[str] = []
-            cols = row.find_all(["td", "th"])
-            for c_idx, cell in enumerate(cols):
-                cell_text = _normalize_whitespace(cell.get_text(separator=" ", strip=True))
-                cells.append(TableCell(row=r_idx, col=c_idx, text=cell_text))
-                row_texts.append(cell_text)
-            if row_texts:
-                row_line = " | ".join(row_texts)
-                lines.append(Line(line_number=line_num, text=row_line))
-                line_num += 1
-        if lines:
-            text = "\n".join(l.text for l in lines)
-            block = Block(
-                block_id=f"t_{block_index}",
-                type="table",
-                page_number=None,
-                text=text,
-                lines=lines,
-                cells=cells,
-            )
-            blocks.append(block)
-            block_index += 1
+    blocks = extract_html_blocks(html)
 
     metadata = DocumentMetadata(
         doc_id=doc_id,
@@ -83,6 +234,3 @@ def parse_html_to_document(
         local_path=file_path,
     )
     return Document(metadata=metadata, blocks=blocks)
-
-
-
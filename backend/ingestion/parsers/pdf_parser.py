@@ -1,70 +1,289 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pdfplumber
 
 from ..metadata_schema import Block, Document, DocumentMetadata, Line, TableCell
 
+# Bump whenever extraction output changes so incremental builds re-parse.
+# 2: single-pass extraction; table text no longer repeated in paragraph blocks.
+PARSER_VERSION = "2"
 
-def _extract_paragraph_blocks(page, starting_block_id: int, page_number: int) -> List[Block]:
-    blocks: List[Block] = []
-    text = page.extract_text() or ""
-    
+# pdfplumber's default ("lines") table strategy builds cells from ruling edges,
+# and a table needs at least two cells: two adjacent cells take five edges (at
+# least two in each orientation). A page with fewer rulings cannot yield one.
+# Rules shorter than this are ignored (pdfplumber's default edge_min_length).
+MIN_RULING_LENGTH = 3.0
+# A page also qualifies if enough text rows hold several numeric tokens,
+# which keeps the gate valid for text-based table strategies too.
+MIN_NUMERIC_TOKENS_PER_ROW = 3
+MIN_NUMERIC_ROWS = 4
+_NUMERIC_CHARS = set("0123456789,.$%()-–")
+
+# (page_number, ran_table_extraction, reason) per page.
+GateLog = List[Tuple[int, bool, str]]
+
+
+def _paragraph_block(text, block_id: int, page_number: int) -> Optional[Block]:
     # Fix: Handle case where extract_text() returns a list instead of string
     if isinstance(text, list):
         text = ' '.join(str(item) for item in text if item)
-    
+    text = text or ""
     if not text.strip():
-        return blocks
-    
+        return None
+
     lines_obj: List[Line] = []
     for idx, raw_line in enumerate(text.splitlines(), start=1):
         lines_obj.append(Line(line_number=idx, text=raw_line.rstrip()))
-    
-    block = Block(
-        block_id=f"p_{page_number}_{starting_block_id}",
+
+    return Block(
+        block_id=f"p_{page_number}_{block_id}",
         type="paragraph",
         page_number=page_number,
         text=text,
         lines=lines_obj,
     )
-    blocks.append(block)
+
+
+def _table_block(rows: List[List[Optional[str]]], block_id: int, page_number: int) -> Block:
+    cells: List[TableCell] = []
+    text_lines: List[Line] = []
+    line_num = 1
+    for r_idx, row in enumerate(rows):
+        row_text_items: List[str] = []
+        for c_idx, cell in enumerate(row):
+            cell_text = (cell or "").strip()
+            cells.append(TableCell(row=r_idx, col=c_idx, text=cell_text))
+            row_text_items.append(cell_text)
+        row_text = " | ".join(row_text_items)
+        text_lines.append(Line(line_number=line_num, text=row_text))
+        line_num += 1
+    text = "\n".join(l.text for l in text_lines)
+    return Block(
+        block_id=f"t_{page_number}_{block_id}",
+        type="table",
+        page_number=page_number,
+        text=text,
+        lines=text_lines,
+        cells=cells,
+    )
+
+
+def _outside_tables(bboxes: List[Tuple[float, float, float, float]]):
+    """`page.filter` predicate dropping characters whose centre lies inside a table."""
+
+    def keep(obj) -> bool:
+        if obj.get("object_type") != "char":
+            return True
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in bboxes)
+
+    return keep
+
+
+def _count_rulings(page) -> Tuple[int, int]:
+    """Horizontal and vertical ruling edges from the page's lines, rects and curves."""
+    horizontal = vertical = 0
+    for line in page.objects.get("line", []):
+        if line["height"] < 1 and line["width"] >= MIN_RULING_LENGTH:
+            horizontal += 1
+        elif line["width"] < 1 and line["height"] >= MIN_RULING_LENGTH:
+            vertical += 1
+    for rect in page.objects.get("rect", []):
+        wide = rect["width"] >= MIN_RULING_LENGTH
+        tall = rect["height"] >= MIN_RULING_LENGTH
+        # Thin filled rects are how many PDFs draw rules; boxes give all four sides.
+        horizontal += 2 if wide and tall else int(wide)
+        vertical += 2 if wide and tall else int(tall)
+    # Curves contribute their straight axis-aligned segments, as in
+    # pdfplumber's curve_to_edges (logos and rounded rules mostly do not).
+    for curve in page.objects.get("curve", []):
+        points = curve["pts"]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if y0 == y1 and abs(x1 - x0) >= MIN_RULING_LENGTH:
+                horizontal += 1
+            elif x0 == x1 and abs(y1 - y0) >= MIN_RULING_LENGTH:
+                vertical += 1
+    return horizontal, vertical
+
+
+def _count_numeric_rows(page) -> int:
+    """Text rows containing at least MIN_NUMERIC_TOKENS_PER_ROW number-like tokens."""
+    rows: Dict[int, List[dict]] = {}
+    for char in page.objects.get("char", []):
+        rows.setdefault(round(char["top"]), []).append(char)
+
+    numeric_rows = 0
+    for chars in rows.values():
+        chars.sort(key=lambda c: c["x0"])
+        tokens: List[str] = []
+        current = ""
+        prev_x1 = None
+        for char in chars:
+            text = char["text"]
+            gap = prev_x1 is not None and char["x0"] - prev_x1 > char["size"] * 0.25
+            if (text.isspace() or gap) and current:
+                tokens.append(current)
+                current = ""
+            if not text.isspace():
+                current += text
+            prev_x1 = char["x1"]
+        if current:
+            tokens.append(current)
+        numeric = sum(1 for t in tokens if any(c.isdigit() for c in t) and set(t) <= _NUMERIC_CHARS)
+        if numeric >= MIN_NUMERIC_TOKENS_PER_ROW:
+            numeric_rows += 1
+    return numeric_rows
+
+
+def _may_contain_tables(page) -> Tuple[bool, str]:
+    """
+    Cheap pre-check on objects pdfplumber has already parsed for the page.
+
+    Errs towards "yes": a page is skipped only if it has neither enough
+    ruling edges nor rows of numeric columns.
+    """
+    horizontal, vertical = _count_rulings(page)
+    if horizontal >= 2 and vertical >= 2 and horizontal + vertical >= 5:
+        return True, f"{horizontal}h/{vertical}v rulings"
+    numeric_rows = _count_numeric_rows(page)
+    if numeric_rows >= MIN_NUMERIC_ROWS:
+        return True, f"{numeric_rows} numeric rows"
+    return False, f"{horizontal}h/{vertical}v rulings, {numeric_rows} numeric rows"
+
+
+def _page_ranges(pages: List[int]) -> str:
+    """Compact page list, e.g. [1, 3, 4, 5, 9] -> "1, 3-5, 9"."""
+    ranges: List[str] = []
+    start = prev = None
+    for page in sorted(pages) + [None]:
+        if start is not None and page != prev + 1:
+            ranges.append(str(start) if start == prev else f"{start}-{prev}")
+            start = None
+        if start is None:
+            start = page
+        prev = page
+    return ", ".join(ranges)
+
+
+def _print_gate_summary(label: str, gate_log: GateLog) -> None:
+    """One line per document: pages checked for tables (by reason) and the page numbers skipped."""
+    checked = [reason for _, ran, reason in gate_log if ran]
+    skipped = [page_number for page_number, ran, _ in gate_log if not ran]
+    by_reason: Dict[str, int] = {}
+    for reason in checked:
+        kind = "forced" if reason == "forced" else ("by rulings" if "rulings" in reason else "by numeric rows")
+        by_reason[kind] = by_reason.get(kind, 0) + 1
+    detail = ", ".join(f"{count} {kind}" for kind, count in by_reason.items())
+    print(
+        f"   📐 {label}: table extraction on {len(checked)}/{len(gate_log)} pages"
+        + (f" ({detail})" if detail else "")
+        + (f"; skipped pages {_page_ranges(skipped)}" if skipped else "")
+    )
+
+
+def _extract_page_blocks(
+    page,
+    starting_block_id: int,
+    page_number: int,
+    force_tables: bool = False,
+    gate_log: Optional[GateLog] = None,
+) -> List[Block]:
+    """
+    Paragraph and table blocks for one page, without overlap.
+
+    Table detection runs once, and only on pages `_may_contain_tables`
+    accepts (every page with `force_tables`). Table regions are filtered out
+    of the page's characters before extracting paragraph text, so table
+    numbers appear only in the table blocks. pdfplumber caches the page's
+    parsed objects, so the gate, detection and text extraction share one
+    layout analysis.
+    """
+    candidate, reason = (True, "forced") if force_tables else _may_contain_tables(page)
+    if gate_log is not None:
+        gate_log.append((page_number, candidate, reason))
+    tables = page.find_tables() if candidate else []
+    text_source = page.filter(_outside_tables([t.bbox for t in tables])) if tables else page
+
+    blocks: List[Block] = []
+    paragraph = _paragraph_block(text_source.extract_text(), starting_block_id, page_number)
+    if paragraph is not None:
+        blocks.append(paragraph)
+    for table in tables:
+        blocks.append(_table_block(table.extract(), starting_block_id + len(blocks), page_number))
     return blocks
 
 
-def _extract_table_blocks(page, starting_block_id: int, page_number: int) -> List[Block]:
+def count_pdf_pages(file_path: Path) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def parse_pdf_page_range(
+    file_path: Path, first_page: int, last_page: int, force_tables: bool = False
+) -> List[Block]:
+    """
+    Extract blocks for pages `first_page..last_page` (1-based, inclusive).
+
+    Block IDs are numbered from 0 within the range; call `renumber_blocks` on
+    the merged list to get the IDs a whole-file parse would produce.
+    """
     blocks: List[Block] = []
-    tables = page.extract_tables()
-    current_id = starting_block_id
-    for table in tables or []:
-        cells: List[TableCell] = []
-        text_lines: List[Line] = []
-        line_num = 1
-        for r_idx, row in enumerate(table):
-            row_text_items: List[str] = []
-            for c_idx, cell in enumerate(row):
-                cell_text = (cell or "").strip()
-                cells.append(TableCell(row=r_idx, col=c_idx, text=cell_text))
-                row_text_items.append(cell_text)
-            row_text = " | ".join(row_text_items)
-            text_lines.append(Line(line_number=line_num, text=row_text))
-            line_num += 1
-        text = "\n".join(l.text for l in text_lines)
-        block = Block(
-            block_id=f"t_{page_number}_{current_id}",
-            type="table",
-            page_number=page_number,
-            text=text,
-            lines=text_lines,
-            cells=cells,
-        )
-        blocks.append(block)
-        current_id += 1
+    gate_log: GateLog = []
+    with pdfplumber.open(file_path) as pdf:
+        for page_number in range(first_page, last_page + 1):
+            page = pdf.pages[page_number - 1]
+            try:
+                blocks.extend(
+                    _extract_page_blocks(
+                        page,
+                        starting_block_id=len(blocks),
+                        page_number=page_number,
+                        force_tables=force_tables,
+                        gate_log=gate_log,
+                    )
+                )
+            finally:
+                page.close()
+    _print_gate_summary(f"{file_path.name} p{first_page}-{last_page}", gate_log)
     return blocks
 
 
+def renumber_blocks(blocks: List[Block]) -> None:
+    """Reassign block IDs by position in the document, matching a serial parse."""
+    for idx, block in enumerate(blocks):
+        prefix = "t" if block.type == "table" else "p"
+        block.block_id = f"{prefix}_{block.page_number}_{idx}"
+
+
+def build_pdf_document(
+    file_path: Path,
+    blocks: List[Block],
+    page_count: int,
+    *,
+    doc_id: str,
+    ticker: str,
+    filing_type: str,
+    period: str,
+    source_url: Optional[str] = None,
+    title: Optional[str] = None,
+) -> Document:
+    metadata = DocumentMetadata(
+        doc_id=doc_id,
+        ticker=ticker,
+        filing_type=filing_type,
+        period=period,
+        source_url=source_url,
+        title=title,
+        local_path=file_path,
+        page_count=page_count,
+    )
+    return Document(metadata=metadata, blocks=blocks)
+
+
 def parse_pdf_to_document(
     file_path: Path,
     *,
@@ -74,25 +293,40 @@ def parse_pdf_to_document(
     period: str,
     source_url: Optional[str] = None,
     title: Optional[str] = None,
+    force_tables: bool = False,
 ) -> Document:
     blocks: List[Block] = []
+    gate_log: GateLog = []
     with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
         for page_index, page in enumerate(pdf.pages, start=1):
-            paragraph_blocks = _extract_paragraph_blocks(page, starting_block_id=len(blocks), page_number=page_index)
-            blocks.extend(paragraph_blocks)
-            table_blocks = _extract_table_blocks(page, starting_block_id=len(blocks), page_number=page_index)
-            blocks.extend(table_blocks)
-
-    metadata = DocumentMetadata(
+            try:
+                blocks.extend(
+                    _extract_page_blocks(
+                        page,
+                        starting_block_id=len(blocks),
+                        page_number=page_index,
+                        force_tables=force_tables,
+                        gate_log=gate_log,
+                    )
+                )
+            finally:
+                # pdfplumber keeps each page's parsed objects until the PDF is
+                # closed; dropping them per page keeps RSS flat in page count.
+                page.close()
+    _print_gate_summary(file_path.name, gate_log)
+
+    return build_pdf_document(
+        file_path,
+        blocks,
+        page_count,
         doc_id=doc_id,
         ticker=ticker,
         filing_type=filing_type,
         period=period,
         source_url=source_url,
         title=title,
-        local_path=file_path,
     )
-    return Document(metadata=metadata, blocks=blocks)
 
 
 # from __future__ import annotations
@@ -0,0 +1,259 @@
+"""
+Streaming ingestion pipeline: documents -> chunks -> embed -> upsert batches.
+
+Each stage runs in its own thread and hands work to the next through a
+bounded queue, so parsing (in the worker pool behind the document iterator),
+chunking and embedding overlap. Memory is bounded by the queue sizes: a full
+queue blocks the upstream stage instead of letting documents pile up.
+Chunks are packed into embedding batches by a `BatchPacker` (token- and
+item-limited). Embedding requests run on a small thread pool
+(`embed_concurrency` batches in flight); upserts happen on the caller's thread
+as embeddings complete.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .embedding import BatchingStats, BatchPacker
+from .memory import RssSampler, peak_child_rss_bytes, peak_rss_bytes
+from .metadata_schema import Chunk, Document
+
+_DONE = object()
+_EMPTY = object()
+
+
+class PipelineAborted(Exception):
+    """Another stage failed; raised inside stages to unwind them."""
+
+
+@dataclass
+class StageStats:
+    items: int = 0
+    # Summed over concurrent calls for the embed stage, so it can exceed wall time.
+    busy_s: float = 0.0
+    # Time blocked on a full output queue (downstream is the bottleneck).
+    blocked_s: float = 0.0
+    # Time waiting on an empty input queue (upstream is the bottleneck).
+    starved_s: float = 0.0
+
+
+@dataclass
+class PipelineReport:
+    wall_s: float = 0.0
+    documents: int = 0
+    chunks: int = 0
+    batches: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    max_queue_depth: Dict[str, int] = field(default_factory=dict)
+    start_rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    peak_worker_rss_bytes: Optional[int] = None
+    batching: Optional[BatchingStats] = None
+
+
+class _BoundedQueue:
+    def __init__(self, name: str, maxsize: int, abort: threading.Event, report: PipelineReport) -> None:
+        self.name = name
+        self._q: "queue.Queue[object]" = queue.Queue(maxsize=max(1, maxsize))
+        self._abort = abort
+        self._report = report
+        report.max_queue_depth[name] = 0
+
+    def put(self, item: object, stats: StageStats) -> None:
+        start = time.perf_counter()
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            try:
+                self._q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_s += time.perf_counter() - start
+        depth = self._q.qsize()
+        if depth > self._report.max_queue_depth[self.name]:
+            self._report.max_queue_depth[self.name] = depth
+
+    def get(self, stats: StageStats, timeout: Optional[float] = None) -> object:
+        """Next item; with a `timeout`, returns `_EMPTY` if nothing arrived in time."""
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        item: object = _EMPTY
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            wait_s = 0.1 if deadline is None else min(0.1, deadline - time.perf_counter())
+            if wait_s <= 0:
+                break
+            try:
+                item = self._q.get(timeout=wait_s)
+                break
+            except queue.Empty:
+                continue
+        stats.starved_s += time.perf_counter() - start
+        return item
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        *,
+        chunk: Callable[[Document], List[Chunk]],
+        embed: Callable[[List[Chunk]], Any],
+        store: Callable[[List[Chunk], Any], None],
+        make_packer: Callable[[], BatchPacker[Chunk]],
+        queue_size: int = 4,
+        embed_concurrency: int = 1,
+    ) -> None:
+        """
+        Args:
+            chunk: Turns one document into its chunks (runs on the chunk thread)
+            embed: Embeds one batch of chunks (runs on the embedding pool)
+            store: Stores a batch with its embeddings (runs on the caller's thread)
+            make_packer: Builds the packer that groups chunks into embedding
+                batches (one per run); batches may span documents
+            queue_size: Capacity of each inter-stage queue
+            embed_concurrency: Embedding batches in flight at once
+        """
+        self._chunk = chunk
+        self._embed = embed
+        self._store = store
+        self._make_packer = make_packer
+        self._queue_size = queue_size
+        self._embed_concurrency = max(1, embed_concurrency)
+
+    def run(self, documents: Iterable[Document]) -> PipelineReport:
+        report = PipelineReport()
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        doc_q = _BoundedQueue("documents", self._queue_size, abort, report)
+        batch_q = _BoundedQueue("batches", self._queue_size, abort, report)
+        read_stats = report.stages.setdefault("parse", StageStats())
+        chunk_stats = report.stages.setdefault("chunk", StageStats())
+        embed_stats = report.stages.setdefault("embed", StageStats())
+        store_stats = report.stages.setdefault("upsert", StageStats())
+
+        def guarded(fn: Callable[[], None]) -> Callable[[], None]:
+            def run() -> None:
+                try:
+                    fn()
+                except PipelineAborted:
+                    pass
+                except BaseException as e:
+                    errors.append(e)
+                    abort.set()
+
+            return run
+
+        def read_documents() -> None:
+            iterator = iter(documents)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        doc = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        # Time inside the iterator is parse time (or waiting on workers).
+                        read_stats.busy_s += time.perf_counter() - start
+                    read_stats.items += 1
+                    doc_q.put(doc, read_stats)
+                doc_q.put(_DONE, read_stats)
+            finally:
+                # On abort, shut down whatever pool the iterator owns.
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        packer = self._make_packer()
+        report.batching = packer.stats
+
+        def chunk_documents() -> None:
+            while True:
+                doc = doc_q.get(chunk_stats)
+                if doc is _DONE:
+                    break
+                start = time.perf_counter()
+                closed: List[List[Chunk]] = []
+                for c in self._chunk(doc):  # type: ignore[arg-type]
+                    closed.extend(packer.add(c))
+                chunk_stats.busy_s += time.perf_counter() - start
+                chunk_stats.items += 1
+                for batch in closed:
+                    batch_q.put(batch, chunk_stats)
+            last = packer.flush()
+            if last:
+                batch_q.put(last, chunk_stats)
+            batch_q.put(_DONE, chunk_stats)
+
+        threads = [
+            threading.Thread(target=guarded(read_documents), name="ingest-parse", daemon=True),
+            threading.Thread(target=guarded(chunk_documents), name="ingest-chunk", daemon=True),
+        ]
+        started = time.perf_counter()
+        with RssSampler() as rss:
+            for t in threads:
+                t.start()
+            pool = ThreadPoolExecutor(max_workers=self._embed_concurrency, thread_name_prefix="ingest-embed")
+            in_flight: Dict[Future, List[Chunk]] = {}
+
+            def timed_embed(batch: List[Chunk]) -> Any:
+                start = time.perf_counter()
+                result = self._embed(batch)
+                return result, time.perf_counter() - start
+
+            try:
+                inputs_done = False
+                while not inputs_done or in_flight:
+                    if not inputs_done and len(in_flight) < self._embed_concurrency:
+                        # Poll briefly while requests are in flight so finished
+                        # batches get stored promptly; only idle waits count
+                        # as starvation.
+                        batch = batch_q.get(
+                            StageStats() if in_flight else embed_stats,
+                            timeout=0.05 if in_flight else None,
+                        )
+                        if batch is _DONE:
+                            inputs_done = True
+                        elif batch is not _EMPTY:
+                            in_flight[pool.submit(timed_embed, batch)] = batch  # type: ignore[index]
+                            continue
+                    if not in_flight:
+                        continue
+                    done, _ = wait(in_flight, timeout=0.05, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch = in_flight.pop(future)
+                        embeddings, embed_s = future.result()
+                        embed_stats.busy_s += embed_s
+                        embed_stats.items += 1
+                        start = time.perf_counter()
+                        self._store(batch, embeddings)
+                        store_stats.busy_s += time.perf_counter() - start
+                        store_stats.items += 1
+                        report.chunks += len(batch)
+            except PipelineAborted:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                abort.set()
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+                for t in threads:
+                    t.join()
+
+        report.wall_s = time.perf_counter() - started
+        report.documents = chunk_stats.items
+        report.batches = store_stats.items
+        report.start_rss_bytes = rss.start_bytes
+        report.peak_rss_bytes = rss.peak_bytes if rss.peak_bytes is not None else peak_rss_bytes()
+        report.peak_worker_rss_bytes = peak_child_rss_bytes()
+        if errors:
+            raise errors[0]
+        return report
@@ -0,0 +1,350 @@
+"""
+Index snapshots: the whole index directory as one versioned archive.
+
+`export_snapshot` packs everything next to the Chroma directory that serving
+needs (the Chroma directory itself, the ingestion manifest with its chunk-ID
+redirects, facts.sqlite) into `index-snapshot-<id>.tar.gz`, plus a
+`.sha256` file in `sha256sum` format. SQLite databases are copied with the
+backup API, so a snapshot taken while a client has the index open is still
+consistent. A `snapshot.json` member records the format version, embedding
+model, chunk count and the SHA-256 of every file.
+
+`ensure_snapshot` is the deploy side. It takes a local path or URL and
+downloads the archive at most once: a cached copy is re-validated with a
+conditional GET, and when the installed snapshot already has the expected
+checksum nothing is downloaded or unpacked. The archive checksum and then
+every file's checksum are verified before the new directory replaces the old
+one with a rename, so a bad download never leaves a half-written index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from .checkpoint import CHECKPOINT_FILENAME
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_INFO_FILENAME = "snapshot.json"
+SNAPSHOT_PREFIX = "index-snapshot-"
+SNAPSHOT_SUFFIX = ".tar.gz"
+CHECKSUM_SUFFIX = ".sha256"
+
+# Build-time leftovers and SQLite side files (the backup copy already holds their contents).
+_EXCLUDED_NAMES = frozenset({CHECKPOINT_FILENAME, SNAPSHOT_INFO_FILENAME})
+_EXCLUDED_SUFFIXES = ("-wal", "-shm", "-journal", ".tmp", ".part", ".lock")
+_SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+_HASH_BLOCK = 1 << 20
+
+
+@dataclass
+class SnapshotInfo:
+    snapshot_id: str
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+    created_at: float = 0.0
+    embedding_model: str = ""
+    chunks: int = 0
+    # Path relative to the index directory -> SHA-256.
+    files: Dict[str, str] = field(default_factory=dict)
+    # Set on install: checksum of the archive it came from.
+    archive_sha256: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SnapshotInfo":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+@dataclass
+class SnapshotExport:
+    info: SnapshotInfo
+    archive_path: Path
+    sha256: str
+    bytes_written: int
+    seconds: float
+
+
+@dataclass
+class SnapshotInstall:
+    info: SnapshotInfo
+    # "installed" or "already_installed".
+    status: str
+    archive_path: Optional[Path] = None
+    download_seconds: float = 0.0
+    install_seconds: float = 0.0
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checksum_path_for(archive_path: Path) -> Path:
+    return Path(archive_path).with_name(Path(archive_path).name + CHECKSUM_SUFFIX)
+
+
+def read_checksum(path: Path) -> str:
+    """The hex digest from a `sha256sum`-style file ("<hex>  <name>")."""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    return text.split()[0].lower() if text else ""
+
+
+def _snapshot_files(index_dir: Path, exclude: Optional[Path] = None) -> Iterator[Tuple[str, Path]]:
+    for path in sorted(index_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        if exclude is not None and (path == exclude or exclude in path.parents):
+            continue
+        rel = path.relative_to(index_dir)
+        if any(part.startswith(".") for part in rel.parts):
+            continue
+        if path.name in _EXCLUDED_NAMES or path.name.endswith(_EXCLUDED_SUFFIXES):
+            continue
+        if path.name.startswith(SNAPSHOT_PREFIX):
+            continue
+        yield rel.as_posix(), path
+
+
+def _copy_sqlite(source: Path, dest: Path) -> None:
+    src = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        dst = sqlite3.connect(str(dest))
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def export_snapshot(
+    index_dir: Path,
+    dest_dir: Path,
+    embedding_model: str = "",
+    chunks: int = 0,
+) -> SnapshotExport:
+    """
+    Pack `index_dir` (the directory holding the Chroma directory and manifest) into one archive.
+
+    Args:
+        index_dir: Index directory, i.e. the Chroma persist directory's parent
+        dest_dir: Where the archive and its .sha256 file are written
+        embedding_model: Recorded so a deploy can refuse a snapshot built with another model
+        chunks: Chunk count, recorded for reporting
+
+    Returns:
+        SnapshotExport with the archive path, its checksum, size and export time
+    """
+    start = time.perf_counter()
+    index_dir = Path(index_dir).resolve()
+    dest_dir = Path(dest_dir).resolve()
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=dest_dir, prefix=".snapshot-") as staging:
+        staged: Dict[str, Path] = {}
+        for rel, path in _snapshot_files(index_dir, exclude=dest_dir):
+            if path.suffix in _SQLITE_SUFFIXES:
+                copy = Path(staging) / rel
+                copy.parent.mkdir(parents=True, exist_ok=True)
+                _copy_sqlite(path, copy)
+                staged[rel] = copy
+            else:
+                staged[rel] = path
+        files = {rel: file_sha256(path) for rel, path in staged.items()}
+        content = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()
+        created_at = time.time()
+        snapshot_id = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(created_at))}-{content[:12]}"
+        info = SnapshotInfo(
+            snapshot_id=snapshot_id,
+            created_at=created_at,
+            embedding_model=embedding_model,
+            chunks=chunks,
+            files=files,
+        )
+        info_path = Path(staging) / SNAPSHOT_INFO_FILENAME
+        info_path.write_text(json.dumps(asdict(info), indent=2, sort_keys=True), encoding="utf-8")
+
+        archive_path = dest_dir / f"{SNAPSHOT_PREFIX}{snapshot_id}{SNAPSHOT_SUFFIX}"
+        tmp_path = archive_path.with_name(archive_path.name + ".part")
+        with tarfile.open(tmp_path, "w:gz") as tar:
+            # The info file goes first so readers can check it before the bulk of the archive.
+            tar.add(info_path, arcname=SNAPSHOT_INFO_FILENAME)
+            for rel, path in staged.items():
+                tar.add(path, arcname=rel)
+        os.replace(tmp_path, archive_path)
+
+    sha256 = file_sha256(archive_path)
+    checksum_path_for(archive_path).write_text(f"{sha256}  {archive_path.name}\n", encoding="utf-8")
+    return SnapshotExport(
+        info=info,
+        archive_path=archive_path,
+        sha256=sha256,
+        bytes_written=archive_path.stat().st_size,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def installed_snapshot(index_dir: Path) -> Optional[SnapshotInfo]:
+    """The snapshot `index_dir` was installed from, if any."""
+    path = Path(index_dir) / SNAPSHOT_INFO_FILENAME
+    if not path.exists():
+        return None
+    try:
+        return SnapshotInfo.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError) as e:
+        print(f"⚠️ Ignoring unreadable snapshot info {path}: {e}")
+        return None
+
+
+def _safe_members(tar: tarfile.TarFile, dest: Path) -> Iterator[tarfile.TarInfo]:
+    for member in tar.getmembers():
+        target = (dest / member.name).resolve()
+        if dest not in target.parents or not (member.isfile() or member.isdir()):
+            raise ValueError(f"Refusing to extract unsafe snapshot member: {member.name}")
+        yield member
+
+
+def _check_embedding_model(info: SnapshotInfo, expected_embedding_model: str) -> None:
+    if expected_embedding_model and info.embedding_model and info.embedding_model != expected_embedding_model:
+        raise ValueError(
+            f"Snapshot {info.snapshot_id} was built with {info.embedding_model}, "
+            f"but the collection embeds with {expected_embedding_model}"
+        )
+
+
+def install_snapshot(
+    archive_path: Path,
+    index_dir: Path,
+    expected_sha256: str = "",
+    sha256: Optional[str] = None,
+    expected_embedding_model: str = "",
+) -> SnapshotInfo:
+    """
+    Unpack a snapshot into `index_dir`, replacing its contents.
+
+    The archive is checked against `expected_sha256` (when given), its
+    recorded embedding model against `expected_embedding_model` (when both
+    are set), then each file against the checksums in its snapshot.json. The
+    new directory is swapped in with renames, so a failure leaves the old
+    index untouched. `sha256` is the archive's checksum if the caller already
+    computed it.
+    """
+    archive_path = Path(archive_path)
+    index_dir = Path(index_dir).resolve()
+    sha256 = sha256 or file_sha256(archive_path)
+    if expected_sha256 and sha256 != expected_sha256.lower():
+        raise ValueError(f"Snapshot checksum mismatch for {archive_path.name}: {sha256} != {expected_sha256}")
+
+    index_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=index_dir.parent, prefix=f".{index_dir.name}-snapshot-"))
+    try:
+        with tarfile.open(archive_path, "r:*") as tar:
+            tar.extractall(staging, members=_safe_members(tar, staging.resolve()))
+        info = installed_snapshot(staging)
+        if info is None:
+            raise ValueError(f"{archive_path.name} has no {SNAPSHOT_INFO_FILENAME}; not an index snapshot")
+        if info.format_version > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Snapshot format {info.format_version} is newer than supported {SNAPSHOT_FORMAT_VERSION}")
+        _check_embedding_model(info, expected_embedding_model)
+        for rel, expected in info.files.items():
+            path = staging / rel
+            if not path.is_file() or file_sha256(path) != expected:
+                raise ValueError(f"Snapshot file {rel} is missing or corrupt")
+        info.archive_sha256 = sha256
+        (staging / SNAPSHOT_INFO_FILENAME).write_text(
+            json.dumps(asdict(info), indent=2, sort_keys=True), encoding="utf-8"
+        )
+
+        previous = index_dir.with_name(f".{index_dir.name}-previous")
+        shutil.rmtree(previous, ignore_errors=True)
+        if index_dir.exists():
+            os.replace(index_dir, previous)
+        os.replace(staging, index_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+        return info
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def ensure_snapshot(
+    source: str,
+    index_dir: Path,
+    cache_dir: Path,
+    expected_sha256: str = "",
+    expected_embedding_model: str = "",
+) -> SnapshotInstall:
+    """
+    Make `index_dir` hold the snapshot at `source` (a local path or URL).
+
+    The expected checksum is `expected_sha256`, else the `.sha256` file next
+    to the archive. If the installed snapshot came from an archive with that
+    checksum, nothing is downloaded or unpacked. URLs are downloaded into
+    `cache_dir` with a conditional GET, so a restart on the same volume
+    re-validates the cached copy instead of fetching it again. A snapshot
+    built with another embedding model than `expected_embedding_model` is
+    refused before it replaces anything.
+    """
+    index_dir = Path(index_dir)
+    installed = installed_snapshot(index_dir)
+    expected_sha256 = expected_sha256.lower()
+    download_start = time.perf_counter()
+    if _is_url(source):
+        from .sources.downloader import DOWNLOAD_STATE_FILENAME, DownloadRequest, download_files
+
+        name = source.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1] or "index-snapshot.tar.gz"
+        archive_path = Path(cache_dir) / name
+        state_path = Path(cache_dir) / DOWNLOAD_STATE_FILENAME
+        if not expected_sha256:
+            checksum = download_files(
+                [DownloadRequest(url=source + CHECKSUM_SUFFIX, dest_path=checksum_path_for(archive_path))],
+                state_path=state_path,
+            )[0]
+            if checksum.status != "failed":
+                expected_sha256 = read_checksum(checksum.local_path)
+        if installed is not None and expected_sha256 and installed.archive_sha256 == expected_sha256:
+            _check_embedding_model(installed, expected_embedding_model)
+            return SnapshotInstall(info=installed, status="already_installed")
+        result = download_files([DownloadRequest(url=source, dest_path=archive_path)], state_path=state_path)[0]
+        if result.status == "failed":
+            raise ValueError(f"Could not download index snapshot {source}: {result.error}")
+    else:
+        archive_path = Path(source)
+        if not archive_path.is_file():
+            raise ValueError(f"Index snapshot {archive_path} does not exist")
+        if not expected_sha256 and checksum_path_for(archive_path).exists():
+            expected_sha256 = read_checksum(checksum_path_for(archive_path))
+    download_seconds = time.perf_counter() - download_start
+
+    install_start = time.perf_counter()
+    sha256 = file_sha256(archive_path)
+    if installed is not None and installed.archive_sha256 == sha256:
+        _check_embedding_model(installed, expected_embedding_model)
+        return SnapshotInstall(info=installed, status="already_installed", archive_path=archive_path)
+    if not expected_sha256:
+        print(f"⚠️ No checksum for {archive_path.name}; verifying its files against {SNAPSHOT_INFO_FILENAME} only")
+    info = install_snapshot(
+        archive_path, index_dir, expected_sha256, sha256=sha256, expected_embedding_model=expected_embedding_model
+    )
+    return SnapshotInstall(
+        info=info,
+        status="installed",
+        archive_path=archive_path,
+        download_seconds=download_seconds,
+        install_seconds=time.perf_counter() - install_start,
+    )
@@ -0,0 +1,256 @@
+"""
+Async downloader shared by the EDGAR and IR source helpers.
+
+All files go through one pooled `httpx.AsyncClient`, with at most
+`concurrency` transfers in flight and requests to each host spaced to its
+rate limit (SEC allows 10 requests per second per client). Two things make
+re-runs cheap:
+
+- Conditional GET: each completed file's ETag and Last-Modified are kept in
+  a JSON state file next to the downloads. The next run sends
+  If-None-Match / If-Modified-Since, and a 304 leaves the file untouched.
+- Resume: a transfer is written to `<dest>.part`. An interrupted one
+  continues with a Range request; If-Range makes the server send the whole
+  file instead if it changed meanwhile.
+
+Transient failures (connection errors, 429 and 5xx) are retried with
+backoff, honouring Retry-After. Each retry resumes from what is already on
+disk. Pass `transport` (for example `httpx.MockTransport`) or point URLs at
+a local server (scripts/stub_download_server.py) to test without the
+network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+
+USER_AGENT = "financial-rag-bot/0.1 (mailto:example@example.com)"
+DOWNLOAD_STATE_FILENAME = ".download_state.json"
+DEFAULT_CONCURRENCY = 4
+# Requests per second by host suffix. SEC's fair-access policy allows 10; a
+# little under it keeps network jitter from bunching 11 into one second.
+DEFAULT_HOST_RATES: Dict[str, float] = {"sec.gov": 9.5}
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class DownloadRequest:
+    url: str
+    dest_path: Path
+
+
+@dataclass
+class DownloadedFile:
+    url: str
+    local_path: Path
+    # "downloaded", "resumed", "not_modified" or "failed".
+    status: str = "downloaded"
+    bytes_downloaded: int = 0
+    error: Optional[str] = None
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1 / rate seconds apart."""
+
+    def __init__(self, host_rates: Optional[Dict[str, float]] = None) -> None:
+        self.host_rates = DEFAULT_HOST_RATES if host_rates is None else host_rates
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def rate_for(self, host: str) -> Optional[float]:
+        for suffix, rate in self.host_rates.items():
+            if host == suffix or host.endswith("." + suffix):
+                return rate
+        return None
+
+    async def wait(self, url: str) -> None:
+        host = urlsplit(url).hostname or ""
+        rate = self.rate_for(host)
+        if not rate:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + 1.0 / rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class DownloadState:
+    """Validators of completed files (and of partial ones, for If-Range), keyed by path."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable download state {self.path}: {e}")
+
+    def get(self, dest_path: Path) -> Dict[str, Any]:
+        return self.entries.get(str(dest_path), {})
+
+    def set(self, dest_path: Path, **values: Any) -> None:
+        self.entries[str(dest_path)] = values
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    value = response.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return 2.0 ** attempt
+
+
+async def _fetch(
+    client: httpx.AsyncClient,
+    limiter: HostRateLimiter,
+    state: DownloadState,
+    request: DownloadRequest,
+) -> DownloadedFile:
+    """One attempt: conditional GET, Range resume, or a full download."""
+    dest = request.dest_path
+    part = dest.with_name(dest.name + ".part")
+    saved = state.get(dest)
+    headers: Dict[str, str] = {}
+    offset = part.stat().st_size if part.exists() else 0
+    if offset and saved.get("url") == request.url and (saved.get("etag") or saved.get("last_modified")):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = saved.get("etag") or saved["last_modified"]
+    elif dest.exists() and saved.get("complete") and saved.get("url") == request.url:
+        if saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+    else:
+        offset = 0
+
+    await limiter.wait(request.url)
+    async with client.stream("GET", request.url, headers=headers) as resp:
+        if resp.status_code == 304:
+            return DownloadedFile(url=request.url, local_path=dest, status="not_modified")
+        if resp.status_code == 416:
+            # The partial file is not a prefix of the current one; start over.
+            part.unlink(missing_ok=True)
+            raise httpx.HTTPStatusError("Range not satisfiable", request=resp.request, response=resp)
+        resp.raise_for_status()
+        resumed = resp.status_code == 206
+        if resumed and not resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            part.unlink(missing_ok=True)
+            raise httpx.HTTPStatusError("Unexpected Content-Range", request=resp.request, response=resp)
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        state.set(dest, url=request.url, etag=etag, last_modified=last_modified, complete=False)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with part.open("ab" if resumed else "wb") as f:
+            async for chunk in resp.aiter_bytes():
+                f.write(chunk)
+                written += len(chunk)
+    os.replace(part, dest)
+    state.set(dest, url=request.url, etag=etag, last_modified=last_modified, complete=True)
+    return DownloadedFile(
+        url=request.url, local_path=dest, status="resumed" if resumed else "downloaded", bytes_downloaded=written
+    )
+
+
+async def _download_one(
+    client: httpx.AsyncClient,
+    limiter: HostRateLimiter,
+    state: DownloadState,
+    semaphore: asyncio.Semaphore,
+    request: DownloadRequest,
+    max_attempts: int,
+) -> DownloadedFile:
+    error = ""
+    async with semaphore:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return await _fetch(client, limiter, state, request)
+            except httpx.HTTPStatusError as e:
+                error = str(e)
+                status = e.response.status_code
+                if status in RETRY_STATUSES:
+                    delay = _retry_after(e.response, attempt)
+                elif status in (206, 416):
+                    # The partial file was discarded; retry from zero right away.
+                    delay = 0.0
+                else:
+                    break
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+                delay = 2.0 ** attempt
+            if attempt < max_attempts:
+                print(f"  ↻ Retrying {request.url} in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})")
+                await asyncio.sleep(delay)
+    return DownloadedFile(url=request.url, local_path=request.dest_path, status="failed", error=error)
+
+
+async def download_all(
+    requests: Sequence[DownloadRequest],
+    *,
+    state_path: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    host_rates: Optional[Dict[str, float]] = None,
+    timeout: float = 30.0,
+    max_attempts: int = 3,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> List[DownloadedFile]:
+    """
+    Download `requests` concurrently; results are in request order.
+
+    Args:
+        requests: URLs and destination paths
+        state_path: JSON file holding ETag/Last-Modified per destination
+        concurrency: Maximum transfers in flight (and pooled connections)
+        host_rates: Requests per second by host suffix (default: SEC at 10/s)
+        timeout: Per-request timeout in seconds
+        max_attempts: Attempts per file before it is reported as failed
+        transport: Custom httpx transport (tests)
+
+    Returns:
+        One DownloadedFile per request; failures have status "failed" and an error
+    """
+    state = DownloadState(state_path)
+    limiter = HostRateLimiter(host_rates)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=timeout,
+        limits=limits,
+        follow_redirects=True,
+        transport=transport,
+    ) as client:
+        return list(
+            await asyncio.gather(
+                *(_download_one(client, limiter, state, semaphore, r, max_attempts) for r in requests)
+            )
+        )
+
+
+def download_files(requests: Sequence[DownloadRequest], **kwargs) -> List[DownloadedFile]:
+    """Synchronous wrapper around `download_all` for scripts."""
+    return asyncio.run(download_all(requests, **kwargs))
@@ -1,30 +1,43 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-import httpx
+from .downloader import (
+    DEFAULT_CONCURRENCY,
+    DOWNLOAD_STATE_FILENAME,
+    DownloadedFile,
+    DownloadRequest,
+    download_files,
+)
 
 
-@dataclass
-class DownloadedFile:
-    url: str
-    local_path: Path
-
-
-USER_AGENT = "financial-rag-bot/0.1 (mailto:example@example.com)"
+def download_file(url: str, dest_path: Path, timeout: float = 30.0) -> DownloadedFile:
+    """Download one URL (conditional GET and resume included); raises if it fails."""
+    result = download_files(
+        [DownloadRequest(url=url, dest_path=dest_path)],
+        state_path=dest_path.parent / DOWNLOAD_STATE_FILENAME,
+        timeout=timeout,
+    )[0]
+    if result.status == "failed":
+        raise RuntimeError(f"Download of {url} failed: {result.error}")
+    return result
 
 
-def download_file(url: str, dest_path: Path, timeout: float = 30.0) -> DownloadedFile:
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
-    headers = {"User-Agent": USER_AGENT}
-    with httpx.stream("GET", url, headers=headers, timeout=timeout) as resp:
-        resp.raise_for_status()
-        with dest_path.open("wb") as f:
-            for chunk in resp.iter_bytes():
-                f.write(chunk)
-    return DownloadedFile(url=url, local_path=dest_path)
+def edgar_requests_for_urls(
+    urls: List[str], ticker: str, dest_root: Path, prefix: Optional[str] = None
+) -> List[DownloadRequest]:
+    """Download requests placing already-known EDGAR document URLs in data/raw/<ticker>/."""
+    requests: List[DownloadRequest] = []
+    for idx, url in enumerate(urls, start=1):
+        name_prefix = prefix or "filing"
+        ext = ".html"
+        if url.lower().endswith(".pdf"):
+            ext = ".pdf"
+        dest_dir = dest_root / ticker.lower()
+        dest_name = f"{name_prefix}_{idx}{ext}"
+        requests.append(DownloadRequest(url=url, dest_path=dest_dir / dest_name))
+    return requests
 
 
 def download_edgar_filings_for_urls(
@@ -32,25 +45,22 @@ def download_edgar_filings_for_urls(
     ticker: str,
     dest_root: Path,
     prefix: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    host_rates: Optional[Dict[str, float]] = None,
 ) -> List[DownloadedFile]:
     """
     Simple helper that downloads a list of already-known EDGAR document URLs
     into data/raw/<ticker>/.
 
+    Files are fetched concurrently at SEC's 10 requests/second limit, and
+    unchanged files are not downloaded again (see `downloader.py`).
+
     This keeps the implementation straightforward for the prototype; more
     advanced EDGAR search (by CIK, year, quarter) can be added later.
     """
-    results: List[DownloadedFile] = []
-    for idx, url in enumerate(urls, start=1):
-        name_prefix = prefix or "filing"
-        ext = ".html"
-        if url.lower().endswith(".pdf"):
-            ext = ".pdf"
-        dest_dir = dest_root / ticker.lower()
-        dest_name = f"{name_prefix}_{idx}{ext}"
-        dest_path = dest_dir / dest_name
-        results.append(download_file(url, dest_path))
-    return results
-
-
-
+    return download_files(
+        edgar_requests_for_urls(urls, ticker, dest_root, prefix),
+        state_path=dest_root / DOWNLOAD_STATE_FILENAME,
+        concurrency=concurrency,
+        host_rates=host_rates,
+    )
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
-from .edgar_client import DownloadedFile, download_file
+from .downloader import DEFAULT_CONCURRENCY, DOWNLOAD_STATE_FILENAME, DownloadedFile, DownloadRequest, download_files
+
+
+def ir_requests_for_urls(urls: List[str], ticker: str, dest_root: Path, prefix: str = "ir") -> List[DownloadRequest]:
+    """Download requests placing investor-relations document URLs in data/raw/<ticker>/."""
+    requests: List[DownloadRequest] = []
+    for idx, url in enumerate(urls, start=1):
+        ext = ".html"
+        lower = url.lower()
+        if lower.endswith(".pdf"):
+            ext = ".pdf"
+        dest_dir = dest_root / ticker.lower()
+        dest_name = f"{prefix}_{idx}{ext}"
+        requests.append(DownloadRequest(url=url, dest_path=dest_dir / dest_name))
+    return requests
 
 
 def download_ir_documents_for_urls(
@@ -11,22 +25,16 @@ def download_ir_documents_for_urls(
     ticker: str,
     dest_root: Path,
     prefix: str = "ir",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    host_rates: Optional[Dict[str, float]] = None,
 ) -> List[DownloadedFile]:
     """
     Download a list of investor-relations documents (press releases, earnings
     presentations, etc.) into data/raw/<ticker>/.
     """
-    results: List[DownloadedFile] = []
-    for idx, url in enumerate(urls, start=1):
-        ext = ".html"
-        lower = url.lower()
-        if lower.endswith(".pdf"):
-            ext = ".pdf"
-        dest_dir = dest_root / ticker.lower()
-        dest_name = f"{prefix}_{idx}{ext}"
-        dest_path = dest_dir / dest_name
-        results.append(download_file(url, dest_path))
-    return results
-
-
-
+    return download_files(
+        ir_requests_for_urls(urls, ticker, dest_root, prefix),
+        state_path=dest_root / DOWNLOAD_STATE_FILENAME,
+        concurrency=concurrency,
+        host_rates=host_rates,
+    )
@@ -0,0 +1,396 @@
+"""
+SEC XBRL "company facts", loaded into the facts store.
+
+data.sec.gov publishes every number a company has tagged in its filings as
+one JSON file per CIK (`/api/xbrl/companyfacts/CIK##########.json`):
+
+    facts -> taxonomy -> concept -> units -> unit -> [
+        {start, end, val, accn, fy, fp, form, filed, frame}, ...
+    ]
+
+Each entry is one value as reported in one filing (accession), including
+the prior-period comparatives that filing repeats. A filing's own period end
+is the end date most of its values share; only values ending there are
+stored, under the filing's fiscal period ("Q1-2025", "FY-2025", the same
+labels as the document metadata) with their duration in days, so a lookup can
+tell a quarter from the six-month year-to-date figure a Q2 10-Q also reports.
+
+Values go into `xbrl_filings` / `xbrl_facts` tables in the facts SQLite file
+(`facts.py`). Loading is incremental by accession: filings already loaded
+are skipped, so re-loading a refreshed company-facts file only inserts the
+new 10-Qs and 10-Ks. `XbrlFactsStore.lookup` answers (ticker, period,
+concept or metric) without any embedding or LLM call; `services/fact_lookup.py`
+tries it before the table facts.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .downloader import DEFAULT_CONCURRENCY, DownloadedFile, DownloadRequest, download_files
+
+COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik:010d}.json"
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+FILING_INDEX_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{folder}/{accession}-index.htm"
+XBRL_STATE_FILENAME = ".download_state.json"
+
+# Periodic reports; current reports (8-K) and registration statements repeat
+# older figures under their own fiscal period tags.
+PERIODIC_FORMS = frozenset({"10-Q", "10-Q/A", "10-K", "10-K/A", "20-F", "20-F/A", "40-F", "40-F/A"})
+# Accepted durations (days) for a period's flow values; instants always match.
+QUARTER_DAYS = (70, 110)
+YEAR_DAYS = (340, 380)
+
+# Metric names (as in services/fact_lookup.METRIC_ALIASES) -> concepts, most
+# specific first. Companies switch concepts over time, so several can apply.
+CONCEPT_METRICS: Dict[str, Tuple[str, ...]] = {
+    "revenue": (
+        "us-gaap:Revenues",
+        "us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax",
+        "us-gaap:SalesRevenueNet",
+        "ifrs-full:Revenue",
+    ),
+    "net income": ("us-gaap:NetIncomeLoss", "us-gaap:ProfitLoss", "ifrs-full:ProfitLoss"),
+    "diluted eps": ("us-gaap:EarningsPerShareDiluted", "ifrs-full:DilutedEarningsLossPerShare"),
+    "basic eps": ("us-gaap:EarningsPerShareBasic", "ifrs-full:BasicEarningsLossPerShare"),
+    "operating income": ("us-gaap:OperatingIncomeLoss", "ifrs-full:ProfitLossFromOperatingActivities"),
+    "gross profit": ("us-gaap:GrossProfit", "ifrs-full:GrossProfit"),
+    "research and development": ("us-gaap:ResearchAndDevelopmentExpense",),
+    "operating cash flow": (
+        "us-gaap:NetCashProvidedByUsedInOperatingActivities",
+        "ifrs-full:CashFlowsFromUsedInOperatingActivities",
+    ),
+    "capex": ("us-gaap:PaymentsToAcquirePropertyPlantAndEquipment",),
+    "total assets": ("us-gaap:Assets", "ifrs-full:Assets"),
+    "cash and cash equivalents": (
+        "us-gaap:CashAndCashEquivalentsAtCarryingValue",
+        "ifrs-full:CashAndCashEquivalents",
+    ),
+}
+_METRICS_BY_CONCEPT: Dict[str, str] = {c: metric for metric, concepts in CONCEPT_METRICS.items() for c in concepts}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS xbrl_filings (
+    accession TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    cik INTEGER NOT NULL,
+    form TEXT NOT NULL,
+    filed TEXT NOT NULL,
+    period TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    facts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS xbrl_facts (
+    ticker TEXT NOT NULL,
+    cik INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    value REAL NOT NULL,
+    start TEXT,
+    end TEXT NOT NULL,
+    duration_days INTEGER,
+    accession TEXT NOT NULL,
+    form TEXT NOT NULL,
+    filed TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS xbrl_facts_lookup ON xbrl_facts (ticker, period, concept);
+CREATE INDEX IF NOT EXISTS xbrl_filings_ticker ON xbrl_filings (ticker);
+"""
+
+
+@dataclass
+class XbrlFact:
+    ticker: str
+    cik: int
+    period: str
+    concept: str
+    unit: str
+    value: float
+    start: Optional[str]
+    end: str
+    duration_days: Optional[int]
+    accession: str
+    form: str
+    filed: str
+
+    @property
+    def filing_url(self) -> str:
+        return FILING_INDEX_URL.format(cik=self.cik, folder=self.accession.replace("-", ""), accession=self.accession)
+
+
+@dataclass
+class XbrlFiling:
+    accession: str
+    ticker: str
+    cik: int
+    form: str
+    filed: str
+    period: str
+    period_end: str
+    facts: int = 0
+
+
+@dataclass
+class XbrlLoadReport:
+    ticker: str
+    filings_added: int = 0
+    filings_skipped: int = 0
+    facts_added: int = 0
+
+
+_FACT_COLUMNS = (
+    "ticker", "cik", "period", "concept", "unit", "value", "start", "end", "duration_days", "accession", "form",
+    "filed",
+)
+_FILING_COLUMNS = ("accession", "ticker", "cik", "form", "filed", "period", "period_end", "facts")
+
+
+def company_facts_url(cik: int) -> str:
+    return COMPANY_FACTS_URL.format(cik=int(cik))
+
+
+def _period_label(fy: Any, fp: Any) -> Optional[str]:
+    if not fy or not fp:
+        return None
+    fp = str(fp).upper()
+    if fp == "FY":
+        return f"FY-{fy}"
+    if fp in ("Q1", "Q2", "Q3", "Q4"):
+        return f"{fp}-{fy}"
+    return None
+
+
+def _duration_days(start: Optional[str], end: str) -> Optional[int]:
+    if not start:
+        return None
+    try:
+        return (date.fromisoformat(end) - date.fromisoformat(start)).days
+    except ValueError:
+        return None
+
+
+def _entries(company_facts: Dict[str, Any]) -> Iterable[Tuple[str, str, Dict[str, Any]]]:
+    """(concept, unit, entry) for every value of every concept in a company-facts document."""
+    for taxonomy, concepts in (company_facts.get("facts") or {}).items():
+        for name, concept in concepts.items():
+            for unit, entries in (concept.get("units") or {}).items():
+                for entry in entries:
+                    if entry.get("accn") and entry.get("end") and entry.get("val") is not None:
+                        yield f"{taxonomy}:{name}", unit, entry
+
+
+def parse_company_facts(
+    company_facts: Dict[str, Any],
+    ticker: str,
+    skip_accessions: Iterable[str] = (),
+) -> Tuple[List[XbrlFiling], List[XbrlFact]]:
+    """
+    Split a company-facts document into filings and each filing's own-period values.
+
+    Args:
+        company_facts: Parsed JSON from the companyfacts API
+        ticker: Ticker to store the values under
+        skip_accessions: Accessions already loaded (their values are skipped)
+
+    Returns:
+        (filings, facts) for the periodic filings not in `skip_accessions`
+    """
+    ticker = ticker.upper()
+    cik = int(company_facts.get("cik") or 0)
+    skip = set(skip_accessions)
+
+    # Pass 1: each new filing's form, fiscal period and most common end date.
+    ends: Dict[str, Counter] = defaultdict(Counter)
+    headers: Dict[str, Tuple[str, str, str]] = {}
+    for concept, _, entry in _entries(company_facts):
+        accession = entry["accn"]
+        if accession in skip or entry.get("form") not in PERIODIC_FORMS or concept.startswith("dei:"):
+            continue
+        period = _period_label(entry.get("fy"), entry.get("fp"))
+        if period is None:
+            continue
+        ends[accession][entry["end"]] += 1
+        headers.setdefault(accession, (entry["form"], entry.get("filed") or "", period))
+
+    filings: Dict[str, XbrlFiling] = {}
+    for accession, counts in ends.items():
+        # Ties (a statement with as many comparatives as current values) go to the later date.
+        period_end = max(counts.items(), key=lambda item: (item[1], item[0]))[0]
+        form, filed, period = headers[accession]
+        filings[accession] = XbrlFiling(accession, ticker, cik, form, filed, period, period_end)
+
+    # Pass 2: the values ending on their filing's period end.
+    facts: List[XbrlFact] = []
+    for concept, unit, entry in _entries(company_facts):
+        filing = filings.get(entry["accn"])
+        if filing is None or entry["end"] != filing.period_end:
+            continue
+        start = entry.get("start")
+        facts.append(
+            XbrlFact(
+                ticker=ticker,
+                cik=cik,
+                period=filing.period,
+                concept=concept,
+                unit=unit,
+                value=float(entry["val"]),
+                start=start,
+                end=entry["end"],
+                duration_days=_duration_days(start, entry["end"]),
+                accession=filing.accession,
+                form=filing.form,
+                filed=filing.filed,
+            )
+        )
+        filing.facts += 1
+    return sorted(filings.values(), key=lambda f: (f.filed, f.accession)), facts
+
+
+def read_company_facts(path: Path) -> Dict[str, Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _duration_matches(period: str, duration_days: Optional[int]) -> bool:
+    if duration_days is None:
+        return True
+    low, high = YEAR_DAYS if period.startswith("FY") else QUARTER_DAYS
+    return low <= duration_days <= high
+
+
+class XbrlFactsStore:
+    """XBRL values in the facts SQLite file, indexed by (ticker, period, concept). Safe to share between threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def accessions(self, ticker: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT accession FROM xbrl_filings WHERE ticker = ?", (ticker.upper(),))
+            return [row[0] for row in rows]
+
+    def load(self, company_facts: Dict[str, Any], ticker: str) -> XbrlLoadReport:
+        """Store the filings of `company_facts` not loaded yet, in one transaction."""
+        known = set(self.accessions(ticker))
+        filings, facts = parse_company_facts(company_facts, ticker, skip_accessions=known)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO xbrl_filings ({', '.join(_FILING_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_FILING_COLUMNS))})",
+                [tuple(getattr(f, c) for c in _FILING_COLUMNS) for f in filings],
+            )
+            self._conn.executemany(
+                f"INSERT INTO xbrl_facts ({', '.join(_FACT_COLUMNS)}) VALUES ({', '.join('?' * len(_FACT_COLUMNS))})",
+                [tuple(getattr(f, c) for c in _FACT_COLUMNS) for f in facts],
+            )
+        skipped = len({entry["accn"] for _, _, entry in _entries(company_facts)} & known)
+        return XbrlLoadReport(ticker.upper(), len(filings), skipped, len(facts))
+
+    def load_file(self, path: Path, ticker: str) -> XbrlLoadReport:
+        return self.load(read_company_facts(path), ticker)
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT ticker FROM xbrl_filings")]
+
+    def concepts(self, ticker: str, period: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT concept FROM xbrl_facts WHERE ticker = ? AND period = ?", (ticker.upper(), period)
+            )
+            return [row[0] for row in rows]
+
+    def metrics(self, ticker: str, period: str) -> List[str]:
+        """Names from CONCEPT_METRICS with at least one concept stored for the period."""
+        found = {_METRICS_BY_CONCEPT[c] for c in self.concepts(ticker, period) if c in _METRICS_BY_CONCEPT}
+        return [metric for metric in CONCEPT_METRICS if metric in found]
+
+    def values(self, ticker: str, period: str, concept: str) -> List[XbrlFact]:
+        """All stored values of a concept for the period, latest filing first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FACT_COLUMNS)} FROM xbrl_facts WHERE ticker = ? AND period = ? AND concept = ? "
+                "ORDER BY filed DESC, accession DESC",
+                (ticker.upper(), period, concept),
+            ).fetchall()
+        return [XbrlFact(*row) for row in rows]
+
+    def lookup(self, ticker: str, period: str, concept_or_metric: str) -> Optional[XbrlFact]:
+        """
+        The value of a concept ("us-gaap:NetIncomeLoss") or metric ("net income") for a period.
+
+        Flow values must span the period (a quarter for Q periods, a year for
+        FY), so a Q2 filing's six-month figures never answer for the quarter.
+        Amendments win over the original filing.
+        """
+        concepts = CONCEPT_METRICS.get(concept_or_metric, (concept_or_metric,))
+        for concept in concepts:
+            for fact in self.values(ticker, period, concept):
+                if _duration_matches(period, fact.duration_days):
+                    return fact
+        return None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM xbrl_facts").fetchone()[0]
+
+
+def resolve_ciks(tickers: Iterable[str], dest_dir: Path) -> Dict[str, int]:
+    """Ticker -> CIK from SEC's company_tickers.json (downloaded to `dest_dir`, conditionally)."""
+    dest = Path(dest_dir) / "company_tickers.json"
+    download_files(
+        [DownloadRequest(url=COMPANY_TICKERS_URL, dest_path=dest)], state_path=dest.parent / XBRL_STATE_FILENAME
+    )
+    if not dest.exists():
+        return {}
+    wanted = {t.upper() for t in tickers}
+    ciks: Dict[str, int] = {}
+    for entry in json.loads(dest.read_text(encoding="utf-8")).values():
+        ticker = str(entry.get("ticker", "")).upper()
+        if ticker in wanted:
+            ciks[ticker] = int(entry["cik_str"])
+    return ciks
+
+
+def download_company_facts(
+    ciks: Dict[str, int],
+    dest_dir: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    host_rates: Optional[Dict[str, float]] = None,
+) -> Dict[str, DownloadedFile]:
+    """
+    Download company-facts JSON for each ticker to `dest_dir`/CIK##########.json.
+
+    Unchanged files come back as "not_modified" (conditional GET), so a
+    daily refresh transfers only companies that filed since the last one.
+    """
+    dest_dir = Path(dest_dir)
+    tickers = list(ciks)
+    requests = [
+        DownloadRequest(url=company_facts_url(ciks[t]), dest_path=dest_dir / f"CIK{ciks[t]:010d}.json")
+        for t in tickers
+    ]
+    results = download_files(
+        requests,
+        state_path=dest_dir / XBRL_STATE_FILENAME,
+        concurrency=concurrency,
+        host_rates=host_rates,
+    )
+    return dict(zip(tickers, results))
@@ -4,22 +4,32 @@ from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Set
 
 import chromadb
 from chromadb.config import Settings as ChromaSettings
+from chromadb.utils import embedding_functions
 
 from ..ingestion.metadata_schema import Chunk
 
 
 class ChromaVectorStore:
+    # The collection's embedding function (below), recorded in index snapshots
+    # so a deploy refuses vectors from another model. Change both together.
+    embedding_model = f"chroma-default/{embedding_functions.ONNXMiniLM_L6_V2.MODEL_NAME}"
+
     def __init__(self, persist_directory: str, collection_name: str = "financial_docs") -> None:
         self._client = chromadb.PersistentClient(
             path=persist_directory,
             settings=ChromaSettings(anonymized_telemetry=False),
         )
+        # Same model Chroma would pick implicitly; holding a reference lets
+        # callers embed (and time) the query separately from the HNSW search.
+        self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
         self._collection = self._client.get_or_create_collection(
             name=collection_name,
             metadata={"hnsw:space": "cosine"},
+            embedding_function=self._embedding_function,
         )
 
-    def upsert(self, chunks: Sequence[Chunk]) -> None:
+    def upsert(self, chunks: Sequence[Chunk], embeddings: Optional[Sequence[Sequence[float]]] = None) -> None:
+        """Store chunks; `embeddings` (from `embed_texts`, in chunk order) spares Chroma embedding them again."""
         if not chunks:
             return
         ids: List[str] = []
@@ -29,16 +39,57 @@ class ChromaVectorStore:
             ids.append(chunk.chunk_id)
             texts.append(chunk.text)
             metadatas.append(chunk.metadata)
-        self._collection.upsert(ids=ids, documents=texts, metadatas=metadatas)
+        if embeddings is None:
+            self._collection.upsert(ids=ids, documents=texts, metadatas=metadatas)
+        else:
+            self._collection.upsert(
+                ids=ids, documents=texts, metadatas=metadatas, embeddings=[list(e) for e in embeddings]
+            )
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Delete chunks by ID in batches Chroma accepts; returns how many IDs were requested."""
+        ids = list(ids)
+        batch_size = self._client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            self._collection.delete(ids=ids[i : i + batch_size])
+        return len(ids)
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        """Merge keys into stored chunks' metadata without re-embedding (a None value removes the key)."""
+        ids = list(ids)
+        metadatas = list(metadatas)
+        batch_size = self._client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            self._collection.update(ids=ids[i : i + batch_size], metadatas=metadatas[i : i + batch_size])
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed documents with the collection's embedding function (the one queries use)."""
+        if not texts:
+            return []
+        return [list(e) for e in self._embedding_function(list(texts))]
+
+    def embed_query(self, query_text: str) -> List[float]:
+        return list(self._embedding_function([query_text])[0])
 
     def query(
         self,
         query_text: str,
         k: int = 10,
         where: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Chunk, float]]:
+        return self.query_by_embedding(self.embed_query(query_text), k=k, where=where)
+
+    def query_by_embedding(
+        self,
+        embedding: Sequence[float],
+        k: int = 10,
+        where: Optional[Dict[str, Any]] = None,
     ) -> List[Tuple[Chunk, float]]:
         result = self._collection.query(
-            query_texts=[query_text],
+            query_embeddings=[list(embedding)],
             n_results=k,
             where=where or {},
         )
@@ -75,6 +126,35 @@ class ChromaVectorStore:
             metadata=metadata,
         )
 
+    def get_chunks(self, ids: Sequence[str]) -> List[Chunk]:
+        """Stored chunks for `ids` (missing IDs are skipped), fetched in batches."""
+        ids = list(ids)
+        chunks: List[Chunk] = []
+        batch_size = self._client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            result = self._collection.get(ids=ids[i : i + batch_size], include=["documents", "metadatas"])
+            chunks.extend(
+                Chunk(chunk_id=chunk_id, text=text, metadata=meta)
+                for chunk_id, text, meta in zip(result.get("ids") or [], result.get("documents") or [], result.get("metadatas") or [])
+            )
+        return chunks
+
+    def get_period_chunks(self, ticker: str, period: str) -> List[Chunk]:
+        """All stored chunks of one ticker (either case) and period."""
+        result = self._collection.get(
+            where={
+                "$and": [
+                    {"$or": [{"ticker": ticker.upper()}, {"ticker": ticker.lower()}]},
+                    {"period": period},
+                ]
+            },
+            include=["documents", "metadatas"],
+        )
+        return [
+            Chunk(chunk_id=chunk_id, text=text, metadata=meta)
+            for chunk_id, text, meta in zip(result.get("ids") or [], result.get("documents") or [], result.get("metadatas") or [])
+        ]
+
     def get_all_metadata(self, ticker: Optional[str] = None, limit: int = 10000) -> List[Dict[str, Any]]:
         """
         Get metadata for all documents, optionally filtered by ticker.
@@ -268,6 +268,8 @@ def handle_question(question: str, top_k: int):
             "tickers": tickers_list if tickers_list else None,
             "period": period_str if period_str.strip() else None,
             "top_k": top_k,
+            # The reference cards show the citation text; keep the full 500-character previews.
+            "include": ["citation_text"],
         }
 
         # Call Chat API
@@ -0,0 +1,134 @@
+"""
+Benchmark /chat response size and serialization time per `include` mode.
+
+Builds a realistic ChatResponse from synthetic chunks (or from the local
+Chroma index with --from-index) and compares FastAPI's default encoder path
+(jsonable_encoder + json.dumps) with Pydantic's model_dump_json.
+
+Usage:
+    python scripts/bench_chat_response.py
+    python scripts/bench_chat_response.py --from-index --question "AWS revenue Q3 2025" --top-k 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.schemas import ChatResponse
+from backend.app.services.citation import CITATION_PREVIEW_CHARS, COMPACT_PREVIEW_CHARS, build_citations
+from backend.ingestion.metadata_schema import Chunk
+
+MODES = {
+    "default": set(),
+    "debug": {"retrieval_debug"},
+    "full": {"raw_context", "retrieval_debug", "citation_text"},
+}
+
+_WORDS = "revenue net sales operating income quarter growth segment margin billion million cash flow".split()
+
+
+def _synthetic_chunks(top_k: int, words_per_chunk: int) -> List[Tuple[Chunk, float]]:
+    rng = random.Random(7)
+    chunks: List[Tuple[Chunk, float]] = []
+    for i in range(top_k):
+        text = " ".join(rng.choice(_WORDS) for _ in range(words_per_chunk))
+        doc_id = "AMZN_Q3-2025_Amazon - Q3 2025"
+        metadata = {
+            "doc_id": doc_id,
+            "chunk_id": f"{doc_id}_chunk_{i + 1}",
+            "ticker": "amzn",
+            "filing_type": "pdf",
+            "period": "Q3-2025",
+            "source_url": "",
+            "title": "Amazon - Q3 2025",
+            "page_start": i + 1,
+            "page_end": i + 1,
+            "page_number": i + 1,
+            "line_start": None,
+            "line_end": None,
+            "block_ids": f"p_{i + 1}_{i}",
+            "block_type": "paragraph",
+            "local_path": "/app/data/raw/amzn/Amazon - Q3 2025.pdf",
+        }
+        chunks.append((Chunk(chunk_id=metadata["chunk_id"], text=text, metadata=metadata), 0.5 + i * 0.02))
+    return chunks
+
+
+def _index_chunks(question: str, top_k: int) -> List[Tuple[Chunk, float]]:
+    from backend.app.config import get_settings
+    from backend.vectorstore.chroma_store import ChromaVectorStore
+
+    store = ChromaVectorStore(persist_directory=str(get_settings().chroma_persist_dir))
+    return store.query(query_text=question, k=top_k)
+
+
+def _build_response(chunks: List[Tuple[Chunk, float]], include: Set[str]) -> ChatResponse:
+    preview_chars = CITATION_PREVIEW_CHARS if "citation_text" in include else COMPACT_PREVIEW_CHARS
+    raw_context = None
+    if "raw_context" in include:
+        raw_context = [{"text": c.text, "metadata": c.metadata, "score": s} for c, s in chunks]
+    return ChatResponse(
+        answer="Amazon reported net sales of $180.2 billion in Q3 2025 (page 1). " * 6,
+        citations=build_citations(chunks, preview_chars=preview_chars),
+        raw_context=raw_context,
+        model=None,
+        usage=None,
+        retrieval_debug={
+            "retrieved": len(chunks),
+            "filtered": len(chunks),
+            "timings": {"embed": 12.5, "vector_search": 4.1, "llm": 1850.0},
+        },
+    )
+
+
+def _time_it(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ChatResponse size and serialization per include mode.")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--words", type=int, default=500, help="Words per synthetic chunk.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--from-index", action="store_true", help="Use real chunks from the local Chroma index.")
+    parser.add_argument("--question", default="What were Amazon's total net sales in Q3 2025?")
+    args = parser.parse_args()
+
+    chunks = _index_chunks(args.question, args.top_k) if args.from_index else _synthetic_chunks(args.top_k, args.words)
+    if not chunks:
+        print("No chunks available; build the index or drop --from-index.")
+        return
+
+    print(f"{'mode':<10} {'bytes':>10} {'jsonable+json (ms)':>20} {'model_dump_json (ms)':>22} {'speedup':>8}")
+    for mode, include in MODES.items():
+        response = _build_response(chunks, include)
+        exclude: Optional[Set[str]] = None if "retrieval_debug" in include else {"retrieval_debug"}
+
+        def legacy() -> bytes:
+            data = jsonable_encoder(response, exclude=exclude, exclude_none=True)
+            return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        def fast() -> bytes:
+            return response.model_dump_json(exclude=exclude, exclude_none=True).encode("utf-8")
+
+        legacy_ms, _ = _time_it(legacy, args.repeat)
+        fast_ms, size = _time_it(fast, args.repeat)
+        print(f"{mode:<10} {size:>10,} {legacy_ms:>20.3f} {fast_ms:>22.3f} {legacy_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark the native block splitter against the old langchain-based chunking.
+
+The old path pre-split blocks longer than max_block_tokens into word runs
+(joined with spaces, so line breaks were lost) and ran
+RecursiveCharacterTextSplitter over each piece with a word-counting length
+function; chunks carried no line numbers. The native splitter finds windows by
+index arithmetic on character offsets and slices them from the block text.
+
+Parses every PDF/HTML file under --raw-dir (through the parsed-document cache,
+so only the first run pays for pdfplumber), chunks the corpus both ways, and
+prints the time to produce chunk texts, chunk counts and how many chunks carry
+line spans. It also checks that every native chunk's text is exactly its
+character span of the block. --synthetic-words times both splitters on one
+long block, without the old pre-split, to show how each scales.
+
+Usage:
+    python scripts/bench_chunking.py
+    python scripts/bench_chunking.py --raw-dir data/raw --synthetic-words 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingestion.chunking import ChunkingConfig, chunk_document, split_block
+from backend.ingestion.doc_cache import DocumentCache
+from backend.ingestion.index_builder import default_chunking_config
+from backend.ingestion.metadata_schema import Block, Document, Line
+from backend.ingestion.parallel_parse import ParseJob, iter_parsed_documents
+
+
+def _legacy_chunk_texts(doc: Document, config: ChunkingConfig) -> List[str]:
+    """The pre-native chunker: word-run pre-split, then the langchain splitter."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=config.max_tokens,
+        chunk_overlap=config.overlap_tokens,
+        separators=config.separators,
+        length_function=lambda t: len(t.split()),
+    )
+    texts: List[str] = []
+    for block in doc.blocks:
+        words = block.text.split()
+        pieces = [block.text] if len(words) <= config.max_block_tokens else [
+            " ".join(words[i : i + config.max_block_tokens]) for i in range(0, len(words), config.max_block_tokens)
+        ]
+        for piece in pieces:
+            texts.extend(splitter.split_text(piece))
+    return texts
+
+
+def _native_chunk_texts(doc: Document, config: ChunkingConfig) -> List[str]:
+    """The same windows chunk_document produces, without building Chunk metadata."""
+    max_words = min(config.max_tokens, config.max_block_tokens)
+    texts: List[str] = []
+    for block in doc.blocks:
+        overlap = 0 if block.type == "table" and config.keep_tables_intact else config.overlap_tokens
+        texts.extend(s.text for s in split_block(block, max_words, overlap, config.min_chunk_size, config.separators))
+    return texts
+
+
+def _jobs(raw_dir: Path) -> List[ParseJob]:
+    jobs: List[ParseJob] = []
+    for path in sorted(raw_dir.glob("*/*")):
+        kind = "pdf" if path.suffix.lower() == ".pdf" else "html" if path.suffix.lower() in (".htm", ".html") else None
+        if kind is not None:
+            jobs.append(ParseJob(path=path, kind=kind, doc_id=path.stem, ticker=path.parent.name.upper(), period=""))
+    return jobs
+
+
+def _synthetic_block(words: int) -> Block:
+    rng = random.Random(0)
+    vocabulary = ["revenue", "margin", "growth", "quarter", "guidance", "segment", "billion", "percent"]
+    lines: List[Line] = []
+    for line_number in range(1, words // 12 + 1):
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(12))
+        lines.append(Line(line_number=line_number, text=sentence + ("." if line_number % 3 == 0 else ",")))
+    return Block(
+        block_id="synthetic", type="paragraph", page_number=1, text="\n".join(l.text for l in lines), lines=lines
+    )
+
+
+def _bench_synthetic(words: int, config: ChunkingConfig) -> None:
+    block = _synthetic_block(words)
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=config.max_tokens,
+        chunk_overlap=config.overlap_tokens,
+        separators=config.separators,
+        length_function=lambda t: len(t.split()),
+    )
+    start = time.perf_counter()
+    old = splitter.split_text(block.text)
+    old_s = time.perf_counter() - start
+    start = time.perf_counter()
+    new = split_block(block, config.max_tokens, config.overlap_tokens, config.min_chunk_size, config.separators)
+    new_s = time.perf_counter() - start
+    print(
+        f"\nSingle {words}-word block: langchain {old_s:.3f}s ({len(old)} chunks), "
+        f"native {new_s:.4f}s ({len(new)} chunks)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare native and langchain chunking on the corpus.")
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw"))
+    parser.add_argument(
+        "--cache-dir", type=Path, default=Path("data/processed/doc_cache"), help="Parsed-document cache to use."
+    )
+    parser.add_argument("--synthetic-words", type=int, default=20000, help="Size of the single-block test (0 skips).")
+    args = parser.parse_args()
+
+    config = default_chunking_config()
+    jobs = _jobs(args.raw_dir)
+    if not jobs:
+        print(f"No PDF/HTML files found under {args.raw_dir}")
+        return
+    print(f"Loading {len(jobs)} files (parsing those not in {args.cache_dir})...")
+    cache = DocumentCache(args.cache_dir)
+    documents = [r.document for r in iter_parsed_documents(jobs, cache=cache) if r.document is not None]
+    blocks = sum(len(d.blocks) for d in documents)
+    words = sum(len(b.text.split()) for d in documents for b in d.blocks)
+    print(f"{len(documents)} documents, {blocks} blocks, {words} words")
+
+    start = time.perf_counter()
+    legacy_chunks = sum(len(_legacy_chunk_texts(d, config)) for d in documents)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    native_chunks = sum(len(_native_chunk_texts(d, config)) for d in documents)
+    native_s = time.perf_counter() - start
+
+    native = [(d, chunk_document(d, config)) for d in documents]
+    with_lines = 0
+    mismatched = 0
+    for doc, chunks in native:
+        block_text = {b.block_id: b.text for b in doc.blocks}
+        for chunk in chunks:
+            meta = chunk.metadata
+            with_lines += meta["line_start"] is not None
+            if block_text[meta["block_ids"]][meta["char_start"] : meta["char_end"]] != chunk.text:
+                mismatched += 1
+
+    print(f"\n{'splitter':<10} {'seconds':>8} {'chunks':>7} {'with line span':>15}")
+    print(f"{'langchain':<10} {legacy_s:>8.2f} {legacy_chunks:>7} {0:>15}")
+    print(f"{'native':<10} {native_s:>8.2f} {native_chunks:>7} {with_lines:>15}")
+    print(f"\nSpeedup: {legacy_s / native_s if native_s else float('inf'):.1f}x; "
+          f"{mismatched} native chunk(s) differ from their character span")
+
+    if args.synthetic_words:
+        _bench_synthetic(args.synthetic_words, config)
+
+
+if __name__ == "__main__":
+    main()
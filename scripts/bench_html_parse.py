@@ -0,0 +1,171 @@
+"""
+Benchmark the single-pass HTML parser against the old find_all-based one.
+
+The old parser took `get_text()` of every `<p>` and `<div>`, so text inside
+nested divs was emitted once per ancestor, and table text appeared both in
+paragraph blocks and in the table blocks. For each file this prints parse
+time, blocks, characters and the chunk count the default chunking config
+produces for both parsers (the new one with html.parser events and, when
+installed, lxml events), plus how many characters of the old output were
+repeats.
+
+EDGAR 10-K HTML can be downloaded with scripts/download_filings.py. Without
+HTML files under --raw-dir (or --file), a synthetic filing with the usual
+EDGAR structure (nested page divs, styled spans, inline XBRL facts, a hidden
+ix:header and financial tables) is generated instead.
+
+Usage:
+    python scripts/bench_html_parse.py
+    python scripts/bench_html_parse.py --file data/raw/MSFT/edgar_10k.htm
+    python scripts/bench_html_parse.py --synthetic-sections 3000 --nesting 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingestion.chunking import chunk_document
+from backend.ingestion.index_builder import default_chunking_config
+from backend.ingestion.metadata_schema import Block, Document, DocumentMetadata, Line, TableCell
+from backend.ingestion.parsers.html_parser import HTML_BACKEND, extract_html_blocks
+
+
+def _normalize_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _legacy_blocks(html: str) -> List[Block]:
+    """The pre-single-pass parser: every p/div's full text, then every table."""
+    soup = BeautifulSoup(html, "html.parser")
+    blocks: List[Block] = []
+    for p in soup.find_all(["p", "div"]):
+        text = _normalize_whitespace(p.get_text(separator=" ", strip=True))
+        if text:
+            blocks.append(
+                Block(block_id=f"p_{len(blocks)}", type="paragraph", page_number=None, text=text,
+                      lines=[Line(line_number=1, text=text)])
+            )
+    for table in soup.find_all("table"):
+        cells: List[TableCell] = []
+        lines: List[Line] = []
+        for r_idx, row in enumerate(table.find_all("tr")):
+            row_texts = []
+            for c_idx, cell in enumerate(row.find_all(["td", "th"])):
+                cell_text = _normalize_whitespace(cell.get_text(separator=" ", strip=True))
+                cells.append(TableCell(row=r_idx, col=c_idx, text=cell_text))
+                row_texts.append(cell_text)
+            if row_texts:
+                lines.append(Line(line_number=len(lines) + 1, text=" | ".join(row_texts)))
+        if lines:
+            blocks.append(
+                Block(block_id=f"t_{len(blocks)}", type="table", page_number=None,
+                      text="\n".join(l.text for l in lines), lines=lines, cells=cells)
+            )
+    return blocks
+
+
+def _synthetic_filing(sections: int, nesting: int) -> str:
+    rng = random.Random(0)
+    words = ["revenue", "operating", "income", "segment", "fiscal", "customers", "cloud", "risk", "net",
+             "increased", "compared", "primarily", "driven", "by", "growth", "in", "the", "year", "and"]
+
+    def sentence() -> str:
+        return " ".join(rng.choice(words) for _ in range(rng.randint(12, 30))).capitalize() + "."
+
+    def span(text: str) -> str:
+        return f'<span style="color:#000000;font-family:\'Times New Roman\';font-size:10pt">{text}</span>'
+
+    parts = [
+        "<html><head><title>10-K</title></head><body>",
+        '<div style="display:none"><ix:header><ix:hidden>',
+        "".join(f'<ix:nonNumeric name="dei:Fact{i}">hidden fact {i}</ix:nonNumeric>' for i in range(200)),
+        "</ix:hidden></ix:header></div>",
+    ]
+    for s in range(sections):
+        parts.append("<div>" * nesting)
+        parts.append(f'<div style="margin-top:12pt"><span style="font-weight:700">Item {s}. Section {s}</span></div>')
+        for _ in range(rng.randint(2, 5)):
+            parts.append(f'<div style="text-indent:24pt">{span(sentence() + " ")}{span(sentence())}</div>')
+        if s % 3 == 0:
+            parts.append('<div><table style="width:100%"><tbody>')
+            parts.append("<tr><td><span>(In millions)</span></td><td><span>2025</span></td><td><span>2024</span></td></tr>")
+            for r in range(rng.randint(5, 15)):
+                a, b = rng.randint(100, 99999), rng.randint(100, 99999)
+                parts.append(
+                    f"<tr><td><div><span>{rng.choice(words).capitalize()} line {r}</span></div></td>"
+                    f'<td><ix:nonFraction name="us-gaap:X" unitRef="usd">{a:,}</ix:nonFraction></td>'
+                    f'<td><ix:nonFraction name="us-gaap:X" unitRef="usd">{b:,}</ix:nonFraction></td></tr>'
+                )
+            parts.append("</tbody></table></div>")
+        parts.append("</div>" * nesting)
+        parts.append('<hr style="page-break-after:always"/>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _measure(parse, html: str, path: Path) -> Tuple[float, List[Block], int]:
+    start = time.perf_counter()
+    blocks = parse(html)
+    elapsed = time.perf_counter() - start
+    doc = Document(
+        metadata=DocumentMetadata(doc_id=path.stem, ticker="X", filing_type="10-K", period="", source_url=None),
+        blocks=blocks,
+    )
+    return elapsed, blocks, len(chunk_document(doc, default_chunking_config()))
+
+
+def _bench_file(path: Path, html: Optional[str] = None) -> None:
+    html = html if html is not None else path.read_text(encoding="utf-8", errors="ignore")
+    parsers = [("old find_all", _legacy_blocks), ("single pass (html.parser)", lambda h: extract_html_blocks(h, "html.parser"))]
+    if HTML_BACKEND != "html.parser":
+        parsers.append((f"single pass ({HTML_BACKEND})", lambda h: extract_html_blocks(h, HTML_BACKEND)))
+    print(f"\n{path.name}: {len(html) / 1e6:.1f} MB of HTML")
+    print(f"{'parser':<28} {'seconds':>8} {'blocks':>7} {'chars':>10} {'chunks':>7}")
+    results = []
+    for label, parse in parsers:
+        elapsed, blocks, chunks = _measure(parse, html, path)
+        chars = sum(len(b.text) for b in blocks)
+        results.append((elapsed, chars, chunks))
+        print(f"{label:<28} {elapsed:>8.2f} {len(blocks):>7} {chars:>10} {chunks:>7}")
+    (old_s, old_chars, old_chunks), (new_s, new_chars, new_chunks) = results[0], results[-1]
+    print(
+        f"Speedup {old_s / new_s if new_s else float('inf'):.1f}x; {old_chunks} -> {new_chunks} chunks; "
+        f"{1 - new_chars / old_chars if old_chars else 0:.0%} of the old output's characters were repeats"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare single-pass and find_all HTML parsing.")
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw"))
+    parser.add_argument("--file", type=Path, action="append", default=[], help="HTML file to benchmark (repeatable).")
+    parser.add_argument("--top", type=int, default=3, help="Number of largest HTML files under --raw-dir to use.")
+    parser.add_argument("--synthetic-sections", type=int, default=2000, help="Sections in the generated filing.")
+    parser.add_argument("--nesting", type=int, default=4, help="Wrapper div depth around each generated section.")
+    args = parser.parse_args()
+
+    files = list(args.file)
+    if not files:
+        found = [p for p in args.raw_dir.glob("*/*") if p.suffix.lower() in (".htm", ".html")]
+        files = sorted(found, key=lambda p: -p.stat().st_size)[: args.top]
+    print(f"HTML parser backend: {HTML_BACKEND}")
+    if files:
+        for path in files:
+            _bench_file(path)
+        return
+
+    print(f"No HTML files under {args.raw_dir}; generating a synthetic EDGAR filing")
+    html = _synthetic_filing(args.synthetic_sections, args.nesting)
+    _bench_file(Path("synthetic_10k.htm"), html)
+
+
+if __name__ == "__main__":
+    main()
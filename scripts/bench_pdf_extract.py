@@ -0,0 +1,112 @@
+"""
+Benchmark the single-pass PDF page extractor against the old two-call one.
+
+The old extractor called `page.extract_text()` and `page.extract_tables()`
+separately, so table text also appeared in the page's paragraph block. For
+each PDF this prints parse time and the chunk count the default chunking
+config produces for both extractors. It also times single-pass extraction
+with and without the table-presence gate, and checks that the gate does not
+change the output.
+
+Usage:
+    python scripts/bench_pdf_extract.py
+    python scripts/bench_pdf_extract.py --top 5 --raw-dir data/raw
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pdfplumber
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingestion.chunking import chunk_document
+from backend.ingestion.index_builder import default_chunking_config
+from backend.ingestion.metadata_schema import Block
+from backend.ingestion.parsers.pdf_parser import (
+    GateLog,
+    _extract_page_blocks,
+    _paragraph_block,
+    _table_block,
+    build_pdf_document,
+    count_pdf_pages,
+)
+from backend.ingestion.parsers.text_normalizer import tag_sections
+
+
+def _two_call_page_blocks(page, starting_block_id: int, page_number: int) -> List[Block]:
+    """The pre-single-pass extractor: text and tables analysed independently."""
+    blocks: List[Block] = []
+    paragraph = _paragraph_block(page.extract_text(), starting_block_id, page_number)
+    if paragraph is not None:
+        blocks.append(paragraph)
+    for rows in page.extract_tables() or []:
+        blocks.append(_table_block(rows, starting_block_id + len(blocks), page_number))
+    return blocks
+
+
+def _run(path: Path, extract: Callable) -> Tuple[float, List[Block]]:
+    start = time.perf_counter()
+    blocks: List[Block] = []
+    with pdfplumber.open(path) as pdf:
+        for page_number, page in enumerate(pdf.pages, start=1):
+            blocks.extend(extract(page, starting_block_id=len(blocks), page_number=page_number))
+    return time.perf_counter() - start, blocks
+
+
+def _chunk_count(path: Path, blocks: List[Block], pages: int) -> int:
+    tag_sections(blocks)
+    doc = build_pdf_document(
+        path, blocks, pages, doc_id=path.stem, ticker=path.parent.name.upper(), filing_type="pdf", period=""
+    )
+    return len(chunk_document(doc, default_chunking_config()))
+
+
+def _signature(blocks: List[Block]) -> List[Tuple[str, str, str]]:
+    return [(b.block_id, b.type, b.text) for b in blocks]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two-call and single-pass PDF page extraction.")
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw"))
+    parser.add_argument("--top", type=int, default=5, help="Number of largest PDFs to benchmark.")
+    args = parser.parse_args()
+
+    pdfs = sorted(((p, count_pdf_pages(p)) for p in sorted(args.raw_dir.glob("*/*.pdf"))), key=lambda x: -x[1])
+    pdfs = pdfs[: args.top]
+    if not pdfs:
+        print(f"No PDFs found under {args.raw_dir}")
+        return
+
+    # before: two-call extraction; forced: single pass, tables on every page;
+    # gated: single pass, tables only on pages passing the pre-check.
+    print(f"{'file':<40} {'pages':>5} {'tbl pages':>9}  {'seconds (before/forced/gated)':>29}  {'chunks':>11}  same")
+    totals = [0.0, 0.0, 0.0, 0, 0]
+    for path, pages in pdfs:
+        gate_log: GateLog = []
+        old_s, old_blocks = _run(path, _two_call_page_blocks)
+        forced_s, forced_blocks = _run(path, partial(_extract_page_blocks, force_tables=True))
+        gated_s, gated_blocks = _run(path, partial(_extract_page_blocks, gate_log=gate_log))
+        candidates = sum(1 for _, ran, _ in gate_log if ran)
+        old_chunks = _chunk_count(path, old_blocks, pages)
+        new_chunks = _chunk_count(path, gated_blocks, pages)
+        same = _signature(forced_blocks) == _signature(gated_blocks)
+        totals = [t + v for t, v in zip(totals, [old_s, forced_s, gated_s, old_chunks, new_chunks])]
+        print(
+            f"{path.name[:40]:<40} {pages:>5} {candidates:>9}  {old_s:>9.2f} {forced_s:>9.2f} {gated_s:>9.2f}  "
+            f"{old_chunks:>6} {new_chunks:>4}  {'yes' if same else 'NO'}"
+        )
+    print(
+        f"\nTotal parse time: {totals[0]:.2f}s before, {totals[1]:.2f}s single-pass, {totals[2]:.2f}s gated; "
+        f"{totals[3]} -> {totals[4]} chunks to embed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark whole-file vs page-range parallel parsing on the largest PDFs.
+
+Picks the N PDFs under data/raw with the most pages, parses each one serially
+and then split into page ranges across a process pool, checks that both paths
+produce identical blocks, and prints the timings.
+
+Usage:
+    python scripts/bench_pdf_parse.py
+    python scripts/bench_pdf_parse.py --top 5 --workers 8 --min-pages 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingestion.metadata_schema import Document
+from backend.ingestion.parallel_parse import (
+    DEFAULT_MIN_PAGES_PER_RANGE,
+    ParseJob,
+    iter_parsed_documents,
+    parse_job,
+    plan_page_ranges,
+)
+from backend.ingestion.parsers.pdf_parser import count_pdf_pages
+
+
+def _largest_pdfs(raw_dir: Path, top: int) -> List[Tuple[Path, int]]:
+    sized: List[Tuple[Path, int]] = []
+    for path in sorted(raw_dir.glob("*/*.pdf")):
+        try:
+            sized.append((path, count_pdf_pages(path)))
+        except Exception as e:
+            print(f"⚠️ Skipping {path.name}: {e}")
+    sized.sort(key=lambda item: item[1], reverse=True)
+    return sized[:top]
+
+
+def _job(path: Path) -> ParseJob:
+    return ParseJob(path=path, kind="pdf", doc_id=path.stem, ticker=path.parent.name.upper(), period="", title=path.stem)
+
+
+def _signature(doc: Document) -> List[Tuple[str, str, str]]:
+    return [(b.block_id, b.text, b.section or "") for b in doc.blocks]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark page-range parallel PDF parsing.")
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw"))
+    parser.add_argument("--top", type=int, default=3, help="Number of largest PDFs to benchmark.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--min-pages", type=int, default=DEFAULT_MIN_PAGES_PER_RANGE, help="Minimum pages per range.")
+    args = parser.parse_args()
+
+    pdfs = _largest_pdfs(args.raw_dir, args.top)
+    if not pdfs:
+        print(f"No PDFs found under {args.raw_dir}")
+        return
+
+    print(f"workers={args.workers} min_pages_per_range={args.min_pages}\n")
+    print(f"{'file':<50} {'pages':>5} {'ranges':>6} {'serial (s)':>10} {'split (s)':>10} {'speedup':>8}  match")
+    for path, pages in pdfs:
+        ranges = plan_page_ranges(pages, args.workers, args.min_pages)
+
+        start = time.perf_counter()
+        serial = parse_job(_job(path))
+        serial_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        split = next(iter_parsed_documents([_job(path)], workers=args.workers, min_pages_per_range=args.min_pages))
+        split_s = time.perf_counter() - start
+
+        if serial.document is None or split.document is None:
+            print(f"{path.name[:50]:<50} {pages:>5} {len(ranges):>6}  parse failed:\n{serial.error or split.error}")
+            continue
+        match = _signature(serial.document) == _signature(split.document)
+        print(
+            f"{path.name[:50]:<50} {pages:>5} {len(ranges):>6} {serial_s:>10.2f} {split_s:>10.2f} "
+            f"{serial_s / split_s if split_s > 0 else 0.0:>7.1f}x  {'yes' if match else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
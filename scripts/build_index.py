@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import argparse
 import re
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence
 
 # Ensure we're using absolute paths
 import os
@@ -13,12 +15,37 @@ project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
 from backend.app.config import get_settings
-from backend.app.dependencies import get_openai_client
-from backend.ingestion.metadata_schema import Document
-from backend.ingestion.parsers.html_parser import parse_html_to_document
-from backend.ingestion.parsers.pdf_parser import parse_pdf_to_document
-from backend.ingestion.parsers.text_normalizer import tag_sections
-from backend.ingestion.index_builder import index_documents
+from backend.ingestion.boilerplate import BoilerplateConfig
+from backend.ingestion.checkpoint import BuildCheckpoint, checkpoint_path_for
+from backend.ingestion.dedup import DedupConfig
+from backend.ingestion.doc_cache import CACHE_SUBDIR, DocumentCache
+from backend.ingestion.facts import EXTRACTOR_VERSION, FactsStore, facts_path_for
+from backend.ingestion.metadata_schema import Block, Document, DocumentMetadata
+from backend.ingestion.parallel_parse import (
+    DEFAULT_MIN_PAGES_PER_RANGE,
+    ParseJob,
+    ParseResult,
+    format_timing_table,
+    iter_parsed_documents,
+)
+from backend.ingestion.index_builder import (
+    backfill_facts,
+    default_chunking_config,
+    index_documents,
+    resume_checkpoint,
+)
+from backend.ingestion.memory import format_mb
+from backend.ingestion.pipeline import PipelineReport
+from backend.ingestion.snapshot import export_snapshot
+from backend.ingestion.manifest import (
+    IngestionManifest,
+    SourceFile,
+    chunking_config_hash,
+    describe_source,
+    manifest_path_for,
+    plan_incremental_build,
+)
+from backend.vectorstore.chroma_store import ChromaVectorStore
 
 
 def extract_period_from_filename(filename: str) -> Optional[str]:
@@ -44,16 +71,16 @@ def extract_period_from_filename(filename: str) -> Optional[str]:
     return None
 
 
-def load_documents_for_ticker(ticker: str, period: Optional[str] = None) -> List[Document]:
+def collect_parse_jobs(ticker: str, period: Optional[str] = None) -> List[ParseJob]:
     """
-    Load all documents for a ticker.
+    Find all parseable files for a ticker.
     
     Args:
         ticker: Ticker symbol (e.g., "AMZN")
         period: Optional period filter. If None, extracts from filenames
     
     Returns:
-        List of parsed documents
+        Parse jobs in a stable order (PDFs, then HTML, each sorted by name)
     """
     settings = get_settings()
     # Resolve to absolute path to avoid working directory issues
@@ -85,69 +112,169 @@ def load_documents_for_ticker(ticker: str, period: Optional[str] = None) -> List
     for f in all_files:
         print(f"  - {f.name} (is_file: {f.is_file()}, suffix: {f.suffix})")
     
-    docs: List[Document] = []
-
-    # Process PDF files
-    pdf_files = list(raw_dir.glob("*.pdf"))
-    print(f"Found {len(pdf_files)} PDF files via glob")
-    for path in pdf_files:
-        # Extract period from filename if not provided
-        file_period = period if period else extract_period_from_filename(path.name)
-        
-        if not file_period:
-            print(f"  WARNING: Could not extract period from {path.name}, skipping")
-            continue
-        
-        print(f"  Parsing: {path.name} (Period: {file_period})")
-        try:
-            doc = parse_pdf_to_document(
-                path,
-                doc_id=f"{ticker}_{file_period}_{path.stem}",
-                ticker=ticker,
-                filing_type="pdf",
-                period=file_period,
-                source_url=None,
-                title=path.stem,
+    jobs: List[ParseJob] = []
+    # Sorted so chunk IDs do not depend on filesystem listing order
+    for kind in ("pdf", "html"):
+        paths = sorted(raw_dir.glob(f"*.{kind}"))
+        print(f"Found {len(paths)} {kind.upper()} files")
+        for path in paths:
+            # Extract period from filename if not provided
+            file_period = period if period else extract_period_from_filename(path.name)
+            
+            if not file_period:
+                print(f"  WARNING: Could not extract period from {path.name}, skipping")
+                continue
+            
+            jobs.append(
+                ParseJob(
+                    path=path,
+                    kind=kind,
+                    doc_id=f"{ticker}_{file_period}_{path.stem}",
+                    ticker=ticker,
+                    period=file_period,
+                    title=path.stem,
+                )
             )
-            tag_sections(doc.blocks)
-            print(f"    ✅ Created document with {len(doc.blocks)} blocks")
-            docs.append(doc)
-        except Exception as e:
-            print(f"    ❌ ERROR parsing {path.name}: {e}")
-            import traceback
-            traceback.print_exc()
-
-    # Process HTML files
-    html_files = list(raw_dir.glob("*.html"))
-    print(f"Found {len(html_files)} HTML files")
-    for path in html_files:
-        # Extract period from filename if not provided
-        file_period = period if period else extract_period_from_filename(path.name)
-        
-        if not file_period:
-            print(f"  WARNING: Could not extract period from {path.name}, skipping")
+    return jobs
+
+
+def iter_documents(
+    jobs: List[ParseJob],
+    workers: int = 1,
+    split_pages: int = DEFAULT_MIN_PAGES_PER_RANGE,
+    cache: Optional[DocumentCache] = None,
+    results: Optional[List[ParseResult]] = None,
+    memory_budget_mb: Optional[float] = None,
+) -> Iterator[Document]:
+    """
+    Parse jobs (in a process pool when workers > 1), yielding documents in job
+    order as they become ready, and print a timing table at the end.
+    
+    A file that fails to parse is reported and skipped; the rest still load.
+    With workers > 1, PDFs with at least 2 * split_pages pages are split into
+    page ranges parsed on separate workers (0 disables splitting).
+    Files already in `cache` are loaded from it instead of being parsed.
+    Per-file results (without the document) are appended to `results`.
+    With `memory_budget_mb`, parsers sample their RSS and the timing table
+    reports peak RSS and pages per MB, flagging files over the budget.
+    """
+    results = results if results is not None else []
+    if memory_budget_mb:
+        for job in jobs:
+            job.track_memory = True
+    start = time.perf_counter()
+    for result in iter_parsed_documents(jobs, workers=workers, min_pages_per_range=split_pages, cache=cache):
+        # Keep only the timing row; the document itself is released once indexed.
+        results.append(replace(result, document=None))
+        name = result.job.path.name
+        if result.document is None:
+            print(f"  ❌ ERROR parsing {name} ({result.job.period}):\n{result.error}")
             continue
-        
-        print(f"  Parsing: {path.name} (Period: {file_period})")
-        try:
-            doc = parse_html_to_document(
-                path,
-                doc_id=f"{ticker}_{file_period}_{path.stem}",
-                ticker=ticker,
-                filing_type="html",
-                period=file_period,
-                source_url=None,
-                title=path.stem,
-            )
-            tag_sections(doc.blocks)
-            print(f"    ✅ Created document with {len(doc.blocks)} blocks")
-            docs.append(doc)
-        except Exception as e:
-            print(f"    ❌ ERROR parsing {path.name}: {e}")
-            import traceback
-            traceback.print_exc()
+        source = "from cache" if result.cached else "parsed"
+        print(f"  ✅ {name} ({result.job.period}): {result.block_count} blocks {source} in {result.elapsed_s:.2f}s")
+        yield result.document
+    wall_s = time.perf_counter() - start
+
+    if results:
+        print(f"\n⏱️  Parse timings ({workers} worker{'s' if workers != 1 else ''}):")
+        print(format_timing_table(results, wall_s, memory_budget_mb=memory_budget_mb))
+
+
+def parse_jobs(
+    jobs: List[ParseJob],
+    workers: int = 1,
+    split_pages: int = DEFAULT_MIN_PAGES_PER_RANGE,
+    cache: Optional[DocumentCache] = None,
+) -> List[Document]:
+    """Parse every job up front; see `iter_documents`."""
+    return list(iter_documents(jobs, workers=workers, split_pages=split_pages, cache=cache))
+
 
-    return docs
+def load_documents_for_ticker(ticker: str, period: Optional[str] = None, workers: int = 1) -> List[Document]:
+    """
+    Load all documents for a ticker.
+    
+    Args:
+        ticker: Ticker symbol (e.g., "AMZN")
+        period: Optional period filter. If None, extracts from filenames
+        workers: Number of parser processes (1 = parse in this process)
+    
+    Returns:
+        List of parsed documents
+    """
+    return parse_jobs(collect_parse_jobs(ticker, period), workers=workers)
+
+
+def print_pipeline_report(pipeline: PipelineReport) -> None:
+    """Print where the streaming pipeline spent its time and how much memory it used."""
+    print(f"   Pipeline:        {pipeline.wall_s:.1f}s wall, {pipeline.documents} docs, {pipeline.batches} batches")
+    for name, stage in pipeline.stages.items():
+        print(
+            f"     {name:<13} busy {stage.busy_s:7.1f}s  "
+            f"waiting on input {stage.starved_s:7.1f}s  blocked on output {stage.blocked_s:7.1f}s"
+        )
+    depths = ", ".join(f"{name} {depth}" for name, depth in pipeline.max_queue_depth.items())
+    print(f"   Max queue depth: {depths}")
+    print(
+        f"   Peak RSS:        {format_mb(pipeline.peak_rss_bytes)} build process "
+        f"(started at {format_mb(pipeline.start_rss_bytes)}), "
+        f"{format_mb(pipeline.peak_worker_rss_bytes)} largest parse worker"
+    )
+
+
+def backfill_unchanged_facts(
+    facts: FactsStore,
+    unchanged: Sequence[SourceFile],
+    cache: Optional[DocumentCache],
+    manifest: IngestionManifest,
+    persist_dir: Path,
+) -> None:
+    """Extract facts of unchanged files that have none yet (or older ones), from their cached parse."""
+    versions = facts.document_versions()
+    missing = [s for s in unchanged if versions.get(s.job.doc_id) != EXTRACTOR_VERSION]
+    if not missing:
+        return
+    documents: List[Document] = []
+    for source in missing:
+        hit = cache.get(source.content_hash, source.job.kind, source.parser_version) if cache is not None else None
+        if hit is not None:
+            job = source.job
+            metadata = DocumentMetadata(
+                doc_id=job.doc_id,
+                ticker=job.ticker,
+                filing_type=job.kind,
+                period=job.period,
+                source_url=job.source_url,
+                title=job.title,
+                local_path=job.path,
+                page_count=hit[1],
+            )
+            documents.append(Document(metadata=metadata, blocks=hit[0]))
+    chunk_ids = {manifest.entries[s.source_key].doc_id: manifest.entries[s.source_key].chunk_ids for s in missing}
+    stored = backfill_facts(facts, documents, chunk_ids, ChromaVectorStore(persist_directory=str(persist_dir)))
+    print(f"📐 Facts: extracted {stored} facts from {len(documents)} already indexed files")
+    if len(documents) < len(missing):
+        print(
+            f"   ⚠️ {len(missing) - len(documents)} unchanged file(s) have no cached parse; "
+            "re-index them with --full-rebuild to extract their facts"
+        )
+
+
+def write_snapshot(dest_dir: Path, persist_dir: Path, build_seconds: float) -> None:
+    """Pack the index directory (Chroma, manifest, facts) into one archive for fast cold starts."""
+    store = ChromaVectorStore(persist_directory=str(persist_dir))
+    chunks = store.count()
+    export = export_snapshot(Path(persist_dir).parent, dest_dir, embedding_model=store.embedding_model, chunks=chunks)
+    print(
+        f"\n📦 Snapshot {export.info.snapshot_id}: {len(export.info.files)} files, {chunks} chunks, "
+        f"{export.bytes_written / 1e6:.1f} MB compressed in {export.seconds:.1f}s"
+    )
+    print(f"   {export.archive_path}")
+    print(f"   sha256 {export.sha256}")
+    print(
+        f"   Build took {build_seconds:.1f}s; set INDEX_SNAPSHOT_URL to this archive (path or URL) "
+        "to start the API from it instead"
+    )
 
 
 def discover_all_tickers() -> List[str]:
@@ -193,6 +320,15 @@ Examples:
   
   # Index ALL companies for specific period
   python scripts/build_index.py --all --period Q3-2025
+  
+  # Parse PDFs on 8 cores
+  python scripts/build_index.py --all --workers 8
+  
+  # Ignore the manifest and re-index every file
+  python scripts/build_index.py --all --full-rebuild
+
+  # Also write a snapshot archive for deploys (see INDEX_SNAPSHOT_URL)
+  python scripts/build_index.py --all --snapshot-dir data/snapshots
         """
     )
     parser.add_argument(
@@ -209,7 +345,113 @@ Examples:
         action="store_true",
         help="Process all tickers found in data/raw/ directory"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse files in N worker processes (default: 1, serial)"
+    )
+    parser.add_argument(
+        "--split-pages",
+        type=int,
+        default=DEFAULT_MIN_PAGES_PER_RANGE,
+        help=(
+            "With --workers > 1, split PDFs into page ranges of at least N pages "
+            f"across workers (default: {DEFAULT_MIN_PAGES_PER_RANGE}; 0 disables)"
+        )
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Re-index every file even if the manifest says it is unchanged"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse files instead of loading them from the parsed-document cache"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="Documents/batches buffered between pipeline stages; bounds memory (default: 4)"
+    )
+    parser.add_argument(
+        "--embed-concurrency",
+        type=int,
+        help="Embedding requests in flight (default: EMBEDDING_CONCURRENCY or 4)"
+    )
+    parser.add_argument(
+        "--embed-rpm",
+        type=float,
+        help="Embedding requests per minute budget (default: EMBEDDING_RPM or 3000; 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--embed-tpm",
+        type=float,
+        help="Embedding tokens per minute budget (default: EMBEDDING_TPM or 1000000; 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--embed-batch-tokens",
+        type=int,
+        help="Max estimated tokens per embedding request (default: EMBEDDING_BATCH_MAX_TOKENS or 50000)"
+    )
+    parser.add_argument(
+        "--embed-batch-items",
+        type=int,
+        help="Max chunks per embedding request (default: EMBEDDING_BATCH_MAX_ITEMS or 256)"
+    )
+    parser.add_argument(
+        "--force-tables",
+        action="store_true",
+        help="Run PDF table extraction on every page, skipping the table-presence pre-check "
+        "(bypasses the parsed-document cache; add --full-rebuild to re-parse indexed files)"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        metavar="MB",
+        help="Report per-file peak parser RSS and pages per MB, flagging files whose peak exceeds MB"
+    )
+    parser.add_argument(
+        "--no-boilerplate",
+        action="store_true",
+        help="Keep headers, footers and disclaimers repeated across a ticker's pages instead of removing them"
+    )
+    parser.add_argument(
+        "--boilerplate-min-pages",
+        type=int,
+        default=BoilerplateConfig().min_pages,
+        help=f"Treat lines repeated on at least N pages of a ticker as boilerplate (default: {BoilerplateConfig().min_pages})"
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Embed every chunk, even when the same text appears in another document of the ticker and period"
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=DedupConfig().threshold,
+        help=f"Estimated Jaccard similarity at which chunks count as near duplicates (default: {DedupConfig().threshold})"
+    )
+    parser.add_argument(
+        "--no-facts",
+        action="store_true",
+        help="Do not extract table rows into the numeric facts store used for exact metric lookups"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted build from its checkpoint instead of starting over"
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        help="After the build, pack the index (Chroma, manifest, facts) into a checksummed archive in this directory"
+    )
     args = parser.parse_args()
+    build_start = time.perf_counter()
 
     # Determine which tickers to process
     if args.all:
@@ -233,14 +475,15 @@ Examples:
         print(f"Period: Auto-detect from filenames")
     print(f"{'='*60}\n")
     
-    all_docs: List[Document] = []
+    # Collect every ticker's files first so the pool stays busy across tickers
+    jobs: List[ParseJob] = []
     for ticker in tickers:
         print(f"\n📊 Processing {ticker}...")
-        docs = load_documents_for_ticker(ticker, args.period)
-        print(f"   Loaded {len(docs)} documents for {ticker}")
-        all_docs.extend(docs)
+        ticker_jobs = collect_parse_jobs(ticker, args.period)
+        print(f"   Found {len(ticker_jobs)} documents for {ticker}")
+        jobs.extend(ticker_jobs)
 
-    if not all_docs:
+    if not jobs:
         print("\n❌ ERROR: No documents found! Check that PDF/HTML files exist in data/raw/<TICKER>/")
         print("\nExpected structure:")
         print("  data/raw/")
@@ -252,27 +495,191 @@ Examples:
         print("      └── Apple - Q3 2025.pdf")
         return
 
-    print(f"\n{'='*60}")
-    print(f"✅ Total documents to index: {len(all_docs)}")
-    print(f"{'='*60}\n")
-    
     settings = get_settings()
-    openai_client = get_openai_client()
-
     Path(settings.chroma_persist_dir).mkdir(parents=True, exist_ok=True)
     print(f"Indexing to: {settings.chroma_persist_dir}")
+
+    manifest = IngestionManifest.load(manifest_path_for(settings.chroma_persist_dir))
+    sources = [describe_source(job, settings.raw_dir) for job in jobs]
+    boilerplate = None if args.no_boilerplate else BoilerplateConfig(min_pages=args.boilerplate_min_pages)
+    dedup = None if args.no_dedup else DedupConfig(threshold=args.dedup_threshold)
+    chunking_hash = chunking_config_hash(default_chunking_config(), boilerplate, dedup)
+
+    checkpoint_path = checkpoint_path_for(settings.chroma_persist_dir)
+    if args.resume:
+        checkpoint = BuildCheckpoint.load(checkpoint_path, chunking_hash)
+    else:
+        checkpoint = BuildCheckpoint(checkpoint_path, chunking_hash)
+    resumed_keys: set = set()
+    if args.resume:
+        if checkpoint.is_empty:
+            print("⚠️ No checkpoint to resume from; starting a normal build")
+        else:
+            # Documents the interrupted run finished go straight into the manifest,
+            # so the plan below treats them as unchanged.
+            resumed_keys = resume_checkpoint(
+                checkpoint, manifest, sources, ChromaVectorStore(persist_directory=str(settings.chroma_persist_dir))
+            )
+            manifest.save()
+            print(
+                f"♻️ Resuming: {len(resumed_keys)} documents and {checkpoint.completed_chunk_count} chunks "
+                f"({checkpoint.batches_recorded} batches) already indexed by the interrupted build"
+            )
+    elif checkpoint_path.exists():
+        print("⚠️ A previous build was interrupted; starting over (pass --resume to continue it instead)")
+
+    plan = plan_incremental_build(manifest, sources, chunking_hash, tickers)
+    full_rebuild = args.full_rebuild
+    if not full_rebuild and plan.unchanged:
+        if ChromaVectorStore(persist_directory=str(settings.chroma_persist_dir)).count() == 0:
+            print("⚠️ Manifest lists indexed files but the vector store is empty; re-indexing everything")
+            full_rebuild = True
+    if full_rebuild:
+        # A resumed full rebuild keeps what the interrupted run already rebuilt.
+        plan.changed.extend(s for s in plan.unchanged if s.source_key not in resumed_keys)
+        plan.unchanged = [s for s in plan.unchanged if s.source_key in resumed_keys]
+
+    print(f"\n{'='*60}")
+    print(
+        f"📋 Plan: {len(plan.added)} new, {len(plan.changed)} changed, "
+        f"{len(plan.unchanged)} unchanged, {len(plan.removed)} removed"
+    )
+    print(f"{'='*60}")
+
+    use_cache = not (args.no_cache or args.force_tables)
+    cache = DocumentCache(settings.processed_dir / CACHE_SUBDIR) if use_cache else None
+    facts = None if args.no_facts else FactsStore(facts_path_for(settings.chroma_persist_dir))
+    if facts is not None:
+        backfill_unchanged_facts(facts, plan.unchanged, cache, manifest, settings.chroma_persist_dir)
+
+    if not plan.to_index and not plan.removed:
+        checkpoint.discard()
+        print("\n✅ Index is up to date; nothing to do.")
+        if args.snapshot_dir:
+            write_snapshot(args.snapshot_dir, settings.chroma_persist_dir, time.perf_counter() - build_start)
+        return
+
+    to_parse = [source.job for source in plan.to_index]
+    if args.force_tables:
+        for job in to_parse:
+            job.force_tables = True
+    parse_results: List[ParseResult] = []
+    if to_parse:
+        print(f"\n🔧 Parsing and indexing {len(to_parse)} files with {args.workers} parse worker(s)...")
+    documents = iter_documents(
+        to_parse,
+        workers=args.workers,
+        split_pages=args.split_pages,
+        cache=cache,
+        results=parse_results,
+        memory_budget_mb=args.memory_budget,
+    )
+    
+    def boilerplate_reference(ticker: str) -> Iterator[Sequence[Block]]:
+        """Cached blocks of the ticker's files that are not re-indexed, so boilerplate counts cover them."""
+        if cache is None:
+            return
+        for source in plan.unchanged:
+            if source.job.ticker.upper() == ticker.upper():
+                hit = cache.get(source.content_hash, source.job.kind, source.parser_version)
+                if hit is not None:
+                    yield hit[0]
+
+    # On --resume keep appending to the old checkpoint so partially indexed
+    # documents skip their completed batches; otherwise start a new one.
+    checkpoint.start(fresh=not args.resume)
     
     try:
-        index_documents(all_docs, openai_client=openai_client, persist_dir=settings.chroma_persist_dir)
+        report = index_documents(
+            documents,
+            persist_dir=settings.chroma_persist_dir,
+            manifest=manifest,
+            plan=plan,
+            queue_size=args.queue_size,
+            embedding_concurrency=args.embed_concurrency or settings.embedding_concurrency,
+            requests_per_minute=(args.embed_rpm if args.embed_rpm is not None else settings.embedding_rpm) or None,
+            tokens_per_minute=(args.embed_tpm if args.embed_tpm is not None else settings.embedding_tpm) or None,
+            batch_max_tokens=args.embed_batch_tokens or settings.embedding_batch_max_tokens,
+            batch_max_items=args.embed_batch_items or settings.embedding_batch_max_items,
+            checkpoint=checkpoint,
+            boilerplate=boilerplate,
+            boilerplate_reference=boilerplate_reference,
+            dedup=dedup,
+            facts=facts,
+        )
+        checkpoint.discard()
         print("\n" + "="*60)
         print("🎉 Indexing completed successfully!")
+        print(f"   Files indexed:   {report.files_added} new, {report.files_updated} updated")
+        print(f"   Files skipped:   {report.files_skipped} unchanged")
+        print(f"   Files deleted:   {report.files_deleted}")
+        print(f"   Chunks:          {report.chunks_upserted} upserted, {report.chunks_deleted} deleted")
+        if report.chunks_kept or report.chunks_redirected:
+            print(
+                f"   Re-indexed:      {report.chunks_kept} unchanged chunks kept their IDs, "
+                f"{report.chunks_redirected} replaced IDs redirected"
+            )
+        print(
+            f"   Embedding calls: {report.embedding_calls} made, ~{report.embedding_calls_saved} saved "
+            f"({report.chunks_reused} chunks reused)"
+        )
+        batching = report.pipeline.batching if report.pipeline is not None else None
+        if batching is not None and batching.batches:
+            print(
+                f"   Batching:        {batching.batches} requests, {batching.avg_items_per_batch:.1f} chunks and "
+                f"~{batching.estimated_tokens // batching.batches} tokens each, "
+                f"{batching.avg_fill_ratio:.0%} average fill "
+                f"(limits {batching.max_tokens} tokens / {batching.max_items} chunks)"
+            )
+            if report.chunks_truncated:
+                print(f"   ⚠️ {report.chunks_truncated} oversized chunk(s) truncated for embedding")
+        if report.boilerplate is not None and report.boilerplate.lines_removed:
+            removed = report.boilerplate
+            print(
+                f"   Boilerplate:     {removed.lines_removed} lines removed from {removed.documents} documents, "
+                f"~{removed.tokens_removed} tokens not embedded"
+            )
+        if report.dedup is not None and report.dedup.duplicates:
+            duplicates = report.dedup
+            print(
+                f"   Duplicates:      {duplicates.duplicates} chunks ({duplicates.exact_duplicates} exact, "
+                f"{duplicates.near_duplicates} near) in {len(duplicates.groups)} groups not embedded, "
+                f"~{duplicates.tokens_saved} tokens saved"
+            )
+        if facts is not None:
+            print(f"   Facts:           {report.facts_stored} stored, {facts.count()} in {facts.path.name}")
+        if report.chunks_resumed:
+            print(f"   Resumed:         {report.chunks_resumed} chunks already upserted were not re-embedded")
+        if report.embedding is not None and report.embedding.requests:
+            stats = report.embedding
+            print(
+                f"   Embedding:       peak {stats.peak_concurrency} in flight (limit now {stats.final_concurrency_limit}), "
+                f"{stats.rate_limited} rate-limited, {stats.throttle_wait_s:.1f}s throttled, "
+                f"{stats.backoff_wait_s:.1f}s backing off"
+            )
+        failed = sum(1 for r in parse_results if r.error is not None)
+        if failed:
+            print(f"   ⚠️ {failed} file(s) failed to parse and will be retried on the next build")
+        if report.pipeline is not None:
+            print_pipeline_report(report.pipeline)
         print("="*60)
-    except Exception as e:
+    except BaseException as e:
+        checkpoint.close()
+        if checkpoint.batches_recorded:
+            print(
+                f"\n💾 Checkpoint saved ({checkpoint.batches_recorded} batches, "
+                f"{len(checkpoint.completed_documents)} documents); re-run with --resume to continue"
+            )
+        if isinstance(e, KeyboardInterrupt):
+            raise
         print(f"\n❌ ERROR during indexing: {e}")
         import traceback
         traceback.print_exc()
         raise
 
+    if args.snapshot_dir:
+        write_snapshot(args.snapshot_dir, settings.chroma_persist_dir, time.perf_counter() - build_start)
+
 
 if __name__ == "__main__":
     import sys
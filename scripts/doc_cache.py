@@ -0,0 +1,135 @@
+"""
+Inspect and prune the parsed-document cache (data/processed/doc_cache).
+
+Usage:
+    python scripts/doc_cache.py list
+    python scripts/doc_cache.py stats
+    python scripts/doc_cache.py prune --stale --orphaned --dry-run
+    python scripts/doc_cache.py prune --older-than 30
+    python scripts/doc_cache.py prune --all
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingestion.doc_cache import CACHE_SUBDIR, CacheEntry, DocumentCache, hash_file
+from backend.ingestion.parallel_parse import PARSER_VERSIONS
+
+
+def _default_processed_dir() -> Path:
+    from backend.app.config import get_settings
+
+    return get_settings().processed_dir
+
+
+def _default_raw_dir() -> Path:
+    from backend.app.config import get_settings
+
+    return get_settings().raw_dir
+
+
+def _is_stale(entry: CacheEntry) -> bool:
+    return PARSER_VERSIONS.get(entry.kind) != entry.parser_version
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{int(n)} B"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def cmd_list(cache: DocumentCache, args: argparse.Namespace) -> None:
+    entries = list(cache.entries())
+    if not entries:
+        print(f"Cache is empty: {cache.cache_dir}")
+        return
+    name_width = max([len(e.source_name) for e in entries] + [6])
+    print(f"{'hash':<12}  {'kind':<4}  {'ver':>3}  {'source':<{name_width}}  {'pages':>5}  {'blocks':>6}  {'size':>9}  {'age (d)':>7}  state")
+    now = time.time()
+    for e in entries:
+        print(
+            f"{e.content_hash[:12]:<12}  {e.kind:<4}  {e.parser_version:>3}  {e.source_name:<{name_width}}  "
+            f"{e.page_count if e.page_count is not None else '-':>5}  {e.block_count:>6}  {_fmt_bytes(e.size_bytes):>9}  "
+            f"{(now - e.created_at) / 86400:>7.1f}  {'stale' if _is_stale(e) else 'ok'}"
+        )
+
+
+def cmd_stats(cache: DocumentCache, args: argparse.Namespace) -> None:
+    entries = list(cache.entries())
+    total = sum(e.size_bytes for e in entries)
+    raw = sum(e.raw_bytes for e in entries)
+    versions = Counter(f"{e.kind} v{e.parser_version}" for e in entries)
+    stale = [e for e in entries if _is_stale(e)]
+    print(f"Cache directory: {cache.cache_dir}")
+    print(f"Entries:         {len(entries)} ({sum(e.block_count for e in entries)} blocks, "
+          f"{sum(e.page_count or 0 for e in entries)} pages)")
+    print(f"Size on disk:    {_fmt_bytes(total)} ({_fmt_bytes(raw)} uncompressed"
+          f"{f', {raw / total:.1f}x' if total else ''})")
+    print(f"Parser versions: {', '.join(f'{k}: {v}' for k, v in sorted(versions.items())) or '-'}")
+    print(f"Stale entries:   {len(stale)} ({_fmt_bytes(sum(e.size_bytes for e in stale))})")
+
+
+def cmd_prune(cache: DocumentCache, args: argparse.Namespace) -> None:
+    if not (args.all or args.stale or args.orphaned or args.older_than is not None):
+        print("Nothing selected; pass --stale, --orphaned, --older-than DAYS or --all")
+        return
+
+    live_hashes: Optional[set] = None
+    if args.orphaned:
+        raw_dir = args.raw_dir or _default_raw_dir()
+        live_hashes = {hash_file(p) for p in raw_dir.rglob("*") if p.suffix.lower() in (".pdf", ".html") and p.is_file()}
+
+    now = time.time()
+    victims: List[CacheEntry] = []
+    for e in cache.entries():
+        if (
+            args.all
+            or (args.stale and _is_stale(e))
+            or (live_hashes is not None and e.content_hash not in live_hashes)
+            or (args.older_than is not None and now - e.created_at > args.older_than * 86400)
+        ):
+            victims.append(e)
+
+    freed = 0
+    for e in victims:
+        freed += e.size_bytes
+        print(f"  {'would remove' if args.dry_run else 'removing'} {e.path.name} ({e.source_name})")
+        if not args.dry_run:
+            e.path.unlink(missing_ok=True)
+    verb = "Would free" if args.dry_run else "Freed"
+    print(f"{verb} {_fmt_bytes(freed)} from {len(victims)} entries")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and prune the parsed-document cache.")
+    parser.add_argument("--cache-dir", type=Path, help=f"Defaults to <processed_dir>/{CACHE_SUBDIR}")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List cache entries")
+    sub.add_parser("stats", help="Summarize cache size and parser versions")
+
+    prune = sub.add_parser("prune", help="Delete cache entries")
+    prune.add_argument("--stale", action="store_true", help="Entries written by an older parser version")
+    prune.add_argument("--orphaned", action="store_true", help="Entries whose source file no longer exists under raw_dir")
+    prune.add_argument("--older-than", type=float, metavar="DAYS", help="Entries older than DAYS days")
+    prune.add_argument("--all", action="store_true", help="Every entry")
+    prune.add_argument("--raw-dir", type=Path, help="Raw data directory for --orphaned (defaults to settings)")
+    prune.add_argument("--dry-run", action="store_true", help="Show what would be removed")
+
+    args = parser.parse_args()
+    cache = DocumentCache(args.cache_dir or _default_processed_dir() / CACHE_SUBDIR)
+    {"list": cmd_list, "stats": cmd_stats, "prune": cmd_prune}[args.command](cache, args)
+
+
+if __name__ == "__main__":
+    main()
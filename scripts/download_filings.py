@@ -2,10 +2,34 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Dict, List
 
 from backend.app.config import get_settings
-from backend.ingestion.sources.edgar_client import download_edgar_filings_for_urls
-from backend.ingestion.sources.ir_client import download_ir_documents_for_urls
+from backend.ingestion.sources.downloader import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_HOST_RATES,
+    DOWNLOAD_STATE_FILENAME,
+    DownloadedFile,
+    download_files,
+)
+from backend.ingestion.sources.edgar_client import edgar_requests_for_urls
+from backend.ingestion.sources.ir_client import ir_requests_for_urls
+
+
+def _parse_rates(values: List[str]) -> Dict[str, float]:
+    rates = dict(DEFAULT_HOST_RATES)
+    for value in values:
+        host, _, rps = value.partition("=")
+        rates[host] = float(rps)
+    return rates
+
+
+def _report(results: List[DownloadedFile]) -> None:
+    for result in results:
+        if result.status == "failed":
+            print(f"  ❌ {result.url}: {result.error}")
+        else:
+            print(f"  ✅ {result.local_path.name}: {result.status} ({result.bytes_downloaded} bytes)")
 
 
 def main() -> None:
@@ -23,19 +47,39 @@ def main() -> None:
         default=[],
         help="Investor relations document URL (can be specified multiple times).",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum downloads in flight (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rate",
+        action="append",
+        default=[],
+        metavar="HOST=RPS",
+        help="Requests per second for a host and its subdomains (default: sec.gov=9.5; repeatable).",
+    )
     args = parser.parse_args()
 
     settings = get_settings()
     raw_root = settings.raw_dir
+    host_rates = _parse_rates(args.rate)
 
-    if args.edgar_url:
-        download_edgar_filings_for_urls(args.edgar_url, args.ticker, raw_root, prefix="edgar")
-    if args.ir_url:
-        download_ir_documents_for_urls(args.ir_url, args.ticker, raw_root, prefix="ir")
+    # One batch, so EDGAR and IR downloads share the connection pool and per-host rate limits.
+    requests = edgar_requests_for_urls(args.edgar_url, args.ticker, raw_root, prefix="edgar")
+    requests += ir_requests_for_urls(args.ir_url, args.ticker, raw_root, prefix="ir")
+    results: List[DownloadedFile] = download_files(
+        requests,
+        state_path=raw_root / DOWNLOAD_STATE_FILENAME,
+        concurrency=args.concurrency,
+        host_rates=host_rates,
+    )
+    _report(results)
+    unchanged = sum(1 for r in results if r.status == "not_modified")
+    failed = sum(1 for r in results if r.status == "failed")
+    print(f"{len(results) - unchanged - failed} downloaded, {unchanged} unchanged, {failed} failed")
 
 
 if __name__ == "__main__":
     main()
-
-
-
@@ -0,0 +1,95 @@
+"""
+Load SEC XBRL company facts into the facts store (facts.sqlite).
+
+Downloads data.sec.gov's company-facts JSON for each ticker (conditional GET,
+so unchanged companies cost one 304) and stores the values of periodic
+filings not loaded yet. The CIK is looked up in SEC's company_tickers.json
+unless given with --cik. --file loads a local JSON instead, without network.
+
+Usage:
+    python scripts/load_xbrl_facts.py --ticker AAPL --ticker MSFT
+    python scripts/load_xbrl_facts.py --ticker AAPL --cik AAPL=320193
+    python scripts/load_xbrl_facts.py --file AAPL=data/xbrl/CIK0000320193.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.config import get_settings
+from backend.ingestion.facts import facts_path_for
+from backend.ingestion.sources.downloader import DEFAULT_CONCURRENCY, DEFAULT_HOST_RATES
+from backend.ingestion.sources.xbrl_client import XbrlFactsStore, download_company_facts, resolve_ciks
+
+
+def _pairs(values: List[str], option: str) -> Dict[str, str]:
+    pairs: Dict[str, str] = {}
+    for value in values:
+        key, sep, rest = value.partition("=")
+        if not sep or not rest:
+            raise SystemExit(f"ERROR: {option} expects TICKER=VALUE, got {value!r}")
+        pairs[key.upper()] = rest
+    return pairs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load SEC XBRL company facts into the facts store.")
+    parser.add_argument("--ticker", action="append", default=[], help="Ticker to download facts for (repeatable).")
+    parser.add_argument("--cik", action="append", default=[], help="TICKER=CIK, skips the ticker lookup (repeatable).")
+    parser.add_argument("--file", action="append", default=[], help="TICKER=PATH of a local company-facts JSON.")
+    parser.add_argument("--dest-dir", type=Path, default=None, help="Download directory (default: data/xbrl).")
+    parser.add_argument("--persist-dir", type=Path, default=None, help="Chroma directory (facts.sqlite is next to it).")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", action="append", default=[], help="HOST=RPS request rate limit (repeatable).")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    persist_dir = (args.persist_dir or settings.chroma_persist_dir).resolve()
+    dest_dir = (args.dest_dir or settings.raw_dir.parent / "xbrl").resolve()
+    files = {ticker: Path(path) for ticker, path in _pairs(args.file, "--file").items()}
+    tickers = [t.upper() for t in args.ticker if t.upper() not in files]
+    if not tickers and not files:
+        parser.error("give at least one --ticker or --file")
+
+    if tickers:
+        ciks = {ticker: int(cik) for ticker, cik in _pairs(args.cik, "--cik").items()}
+        missing = [t for t in tickers if t not in ciks]
+        if missing:
+            print(f"🔎 Looking up CIKs for {', '.join(missing)}")
+            ciks.update(resolve_ciks(missing, dest_dir))
+        for ticker in tickers:
+            if ticker not in ciks:
+                print(f"  ❌ {ticker}: no CIK found; pass --cik {ticker}=<CIK>")
+        rates = dict(DEFAULT_HOST_RATES)
+        for value in args.rate:
+            host, _, rps = value.partition("=")
+            rates[host] = float(rps)
+        wanted = {t: ciks[t] for t in tickers if t in ciks}
+        print(f"⬇️  Downloading company facts for {len(wanted)} companies to {dest_dir}")
+        for ticker, result in download_company_facts(wanted, dest_dir, args.concurrency, rates).items():
+            if result.status == "failed":
+                print(f"  ❌ {ticker}: {result.error}")
+                continue
+            print(f"  ✅ {ticker}: {result.status} ({result.bytes_downloaded} bytes)")
+            files[ticker] = result.local_path
+
+    store = XbrlFactsStore(facts_path_for(persist_dir))
+    for ticker, path in files.items():
+        start = time.perf_counter()
+        report = store.load_file(path, ticker)
+        print(
+            f"📐 {ticker}: {report.filings_added} new filings, {report.filings_skipped} already loaded, "
+            f"{report.facts_added} facts in {time.perf_counter() - start:.2f}s"
+        )
+    print(f"   {store.count()} XBRL facts in {store.path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local file server that stands in for EDGAR/IR hosts when testing downloads.
+
+Serves files under --root with ETag and Last-Modified headers. It answers
+conditional requests with 304, Range requests (with If-Range) with 206, and
+requests over --rps in any one-second window with 429 and Retry-After, as SEC
+does. --drop-first N cuts the first N transfers of each file halfway, to
+exercise resume. GET /stats returns counters, including the peak number of
+requests seen in one second. For example:
+
+    python scripts/stub_download_server.py --root data/raw --rps 10 --drop-first 1
+    python scripts/download_filings.py --ticker TEST --edgar-url http://127.0.0.1:8090/AAPL/10k.htm \\
+        --rate 127.0.0.1=10
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+class StubState:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.root = Path(args.root).resolve()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.recent: Deque[float] = deque()
+        self.drops: Dict[str, int] = {}
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "full": 0,
+            "partial": 0,
+            "not_modified": 0,
+            "dropped": 0,
+            "rate_limited": 0,
+            "bytes_sent": 0,
+            "peak_requests_per_second": 0,
+            "peak_in_flight": 0,
+        }
+
+    def bump(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+    def admit(self) -> bool:
+        """Sliding one-second window; False if this request would exceed --rps."""
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] >= 1.0:
+                self.recent.popleft()
+            if self.args.rps and len(self.recent) >= self.args.rps:
+                return False
+            self.recent.append(now)
+            self.stats["requests"] += 1
+            self.stats["peak_requests_per_second"] = max(self.stats["peak_requests_per_second"], len(self.recent))
+            return True
+
+    def should_drop(self, path: str) -> bool:
+        with self.lock:
+            count = self.drops.get(path, 0)
+            self.drops[path] = count + 1
+            return count < self.args.drop_first
+
+
+def _validators(path: Path) -> Tuple[str, str, float]:
+    data = path.read_bytes()
+    mtime = path.stat().st_mtime
+    return f'"{hashlib.sha1(data).hexdigest()[:16]}"', formatdate(mtime, usegmt=True), mtime
+
+
+def _not_modified(headers, etag: str, mtime: float) -> bool:
+    if headers.get("If-None-Match"):
+        return headers["If-None-Match"] == etag
+    since = headers.get("If-Modified-Since")
+    if since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _range_start(headers, etag: str, last_modified: str) -> Optional[int]:
+    value = headers.get("Range", "")
+    if not value.startswith("bytes=") or not value.endswith("-"):
+        return None
+    if_range = headers.get("If-Range")
+    if if_range and if_range not in (etag, last_modified):
+        return None
+    try:
+        return int(value[len("bytes="):-1])
+    except ValueError:
+        return None
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            if state.args.verbose:
+                super().log_message(fmt, *args)
+
+        def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url_path = unquote(urlsplit(self.path).path)
+            if url_path.rstrip("/") == "/stats":
+                with state.lock:
+                    self._send_json(200, dict(state.stats))
+                return
+            if not state.admit():
+                state.bump("rate_limited")
+                self._send_json(429, {"error": "rate limit exceeded"}, {"Retry-After": "1"})
+                return
+            path = (state.root / url_path.lstrip("/")).resolve()
+            if state.root not in path.parents or not path.is_file():
+                self._send_json(404, {"error": "not found"})
+                return
+
+            with state.lock:
+                state.in_flight += 1
+                state.stats["peak_in_flight"] = max(state.stats["peak_in_flight"], state.in_flight)
+            try:
+                time.sleep(state.args.latency_ms / 1000.0)
+                etag, last_modified, mtime = _validators(path)
+                if _not_modified(self.headers, etag, mtime):
+                    state.bump("not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = path.read_bytes()
+                start = _range_start(self.headers, etag, last_modified)
+                if start is not None and start >= len(data):
+                    self._send_json(416, {"error": "range not satisfiable"}, {"Content-Range": f"bytes */{len(data)}"})
+                    return
+                body = data[start:] if start is not None else data
+                self.send_response(206 if start is not None else 200)
+                if start is not None:
+                    self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+                    state.bump("partial")
+                else:
+                    state.bump("full")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if state.should_drop(url_path):
+                    # Send half the body, then hang up mid-transfer.
+                    self.wfile.write(body[: len(body) // 2])
+                    self.wfile.flush()
+                    state.bump("dropped")
+                    state.bump("bytes_sent", len(body) // 2)
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+                state.bump("bytes_sent", len(body))
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub file server with conditional GET, Range and rate limits.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--root", type=Path, default=Path("data/raw"), help="Directory to serve.")
+    parser.add_argument("--rps", type=float, default=10, help="Requests per second before 429 (0 = unlimited).")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--drop-first", type=int, default=0, help="Cut the first N transfers of each file halfway.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubState(args)))
+    print(f"Stub download server on http://{args.host}:{args.port}/ serving {args.root} (rps={args.rps})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Local OpenAI-compatible embedding server that simulates provider rate limits.
+
+Serves POST /v1/embeddings with deterministic pseudo-random vectors, a fixed
+per-request latency, and fixed-window requests/tokens-per-minute limits that
+answer 429 with a Retry-After header. GET /stats returns counters. Use it to
+exercise `AdaptiveEmbedder` over `OpenAIClient.embed_texts` without spending
+tokens (index builds embed locally with the collection's embedding function):
+
+    python scripts/stub_embedding_server.py --rpm 120 --tpm 40000 --latency-ms 300
+    client = OpenAIClient(api_key="stub", base_url="http://127.0.0.1:8089/v1")
+    AdaptiveEmbedder(lambda texts: client.embed_texts(texts, max_retries=0), max_concurrency=8)
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class WindowLimiter:
+    """Fixed one-minute windows, like most provider limits, scaled by `window_s`."""
+
+    def __init__(self, rpm: float, tpm: float, window_s: float = 60.0) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_s = window_s
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def admit(self, tokens: int) -> Optional[float]:
+        """None if admitted, otherwise seconds until the window resets."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window_s:
+                self._window_start, self._requests, self._tokens = now, 0, 0
+            over_rpm = self.rpm and self._requests + 1 > self.rpm
+            over_tpm = self.tpm and self._tokens + tokens > self.tpm
+            if over_rpm or over_tpm:
+                return max(0.05, self.window_s - (now - self._window_start))
+            self._requests += 1
+            self._tokens += tokens
+            return None
+
+
+class StubState:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.limiter = WindowLimiter(args.rpm, args.tpm, args.window_s)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "texts": 0,
+            "tokens": 0,
+            "peak_in_flight": 0,
+        }
+
+    def bump(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+
+def _vector(text: str, dims: int) -> List[float]:
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    values = [rng.uniform(-1.0, 1.0) for _ in range(dims)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            if state.args.verbose:
+                super().log_message(fmt, *args)
+
+        def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") == "/stats":
+                with state.lock:
+                    self._send(200, dict(state.stats))
+            else:
+                self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/embeddings"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length", "0"))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            texts = request.get("input", [])
+            if isinstance(texts, str):
+                texts = [texts]
+            tokens = sum(max(1, len(str(t)) // 4) for t in texts)
+
+            if state.args.max_tokens_per_request and tokens > state.args.max_tokens_per_request:
+                self._send(400, {"error": {"message": f"request too large: {tokens} tokens", "type": "invalid_request_error"}})
+                return
+
+            retry_after = state.limiter.admit(tokens)
+            if retry_after is not None:
+                state.bump("rate_limited")
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    {"retry-after": f"{retry_after:.2f}", "retry-after-ms": str(int(retry_after * 1000))},
+                )
+                return
+
+            with state.lock:
+                state.in_flight += 1
+                state.stats["peak_in_flight"] = max(state.stats["peak_in_flight"], state.in_flight)
+            try:
+                time.sleep(state.args.latency_ms / 1000.0)
+                if state.args.error_rate and random.random() < state.args.error_rate:
+                    state.bump("failed")
+                    self._send(503, {"error": {"message": "simulated outage", "type": "server_error"}})
+                    return
+                data = []
+                for i, text in enumerate(texts):
+                    vector = _vector(str(text), state.args.dims)
+                    if request.get("encoding_format") == "base64":
+                        embedding: Any = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                    else:
+                        embedding = vector
+                    data.append({"object": "embedding", "index": i, "embedding": embedding})
+                state.bump("requests")
+                state.bump("texts", len(texts))
+                state.bump("tokens", tokens)
+                self._send(
+                    200,
+                    {
+                        "object": "list",
+                        "data": data,
+                        "model": request.get("model", "stub"),
+                        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                    },
+                )
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub OpenAI embeddings server with simulated rate limits.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rpm", type=float, default=120, help="Requests per window (0 = unlimited).")
+    parser.add_argument("--tpm", type=float, default=0, help="Estimated tokens per window (0 = unlimited).")
+    parser.add_argument("--window-s", type=float, default=60.0, help="Rate-limit window length in seconds.")
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--dims", type=int, default=64)
+    parser.add_argument("--max-tokens-per-request", type=int, default=0, help="Reject larger requests with 400.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubState(args)))
+    print(f"Stub embedding server on http://{args.host}:{args.port}/v1 (rpm={args.rpm}, tpm={args.tpm}, latency={args.latency_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the backend package from the project root, like the scripts do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
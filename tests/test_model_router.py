@@ -0,0 +1,62 @@
+"""Model router: error-based exclusion and recovery, and routing mode validation."""
+
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from backend.app.config import get_settings
+from backend.app.models_registry import get_tier_model_ids
+from backend.app.schemas import ChatRequest
+from backend.app.services.model_router import ModelRouter
+
+SIMPLE = ChatRequest(question="What was AAPL revenue in Q1-2025?", tickers=["AAPL"])
+
+
+def test_excluded_model_is_probed_after_cooldown_and_recovers() -> None:
+    now: List[float] = [1000.0]
+    router = ModelRouter(mode="on", min_error_samples=5, error_cooldown_s=60.0, clock=lambda: now[0])
+    fast_model = get_tier_model_ids("fast")[0]
+    assert router.choose(SIMPLE, []).model_id == fast_model
+
+    for _ in range(5):
+        router.record(fast_model, 900.0, error=True)
+    assert router.choose(SIMPLE, []).reason == "fast_tier_unhealthy"
+
+    now[0] += 61.0
+    probe = router.choose(SIMPLE, [])
+    assert probe.model_id == fast_model
+    # Only one request probes per cooldown.
+    assert router.choose(SIMPLE, []).reason == "fast_tier_unhealthy"
+
+    router.record(fast_model, 400.0, error=False)
+    recovered = router.choose(SIMPLE, [])
+    assert (recovered.tier, recovered.model_id) == ("fast", fast_model)
+    assert router.stats()[fast_model]["error_rate"] == 0.0
+
+
+def test_failed_probe_waits_another_cooldown() -> None:
+    now: List[float] = [1000.0]
+    router = ModelRouter(mode="on", min_error_samples=5, error_cooldown_s=60.0, clock=lambda: now[0])
+    fast_model = get_tier_model_ids("fast")[0]
+    for _ in range(5):
+        router.record(fast_model, 900.0, error=True)
+
+    now[0] += 61.0
+    assert router.choose(SIMPLE, []).model_id == fast_model
+    router.record(fast_model, 900.0, error=True)
+
+    now[0] += 30.0
+    assert router.choose(SIMPLE, []).reason == "fast_tier_unhealthy"
+    now[0] += 31.0
+    assert router.choose(SIMPLE, []).model_id == fast_model
+
+
+def test_unknown_routing_mode_fails_settings(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("MODEL_ROUTING_MODE", "shaddow")
+
+    with pytest.raises(ValueError, match="MODEL_ROUTING_MODE"):
+        get_settings()
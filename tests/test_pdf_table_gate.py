@@ -0,0 +1,31 @@
+"""PDF table gate: the per-document summary names the pages that skipped table extraction."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.ingestion.parsers.pdf_parser import _page_ranges, _print_gate_summary
+
+
+@pytest.mark.parametrize(
+    "pages, expected",
+    [([1, 3, 4, 5, 9], "1, 3-5, 9"), ([7], "7"), ([2, 1], "1-2"), ([], "")],
+)
+def test_page_ranges(pages, expected) -> None:
+    assert _page_ranges(pages) == expected
+
+
+def test_summary_lists_skipped_pages(capsys: pytest.CaptureFixture) -> None:
+    gate_log = [
+        (1, False, "0h/0v rulings, 0 numeric rows"),
+        (2, True, "6h/4v rulings"),
+        (3, False, "1h/0v rulings, 2 numeric rows"),
+        (4, False, "0h/0v rulings, 0 numeric rows"),
+        (5, True, "5 numeric rows"),
+    ]
+
+    _print_gate_summary("deck.pdf", gate_log)
+
+    assert capsys.readouterr().out.strip() == (
+        "📐 deck.pdf: table extraction on 2/5 pages (1 by rulings, 1 by numeric rows); skipped pages 1, 3-4"
+    )
@@ -0,0 +1,103 @@
+"""Resuming an interrupted build must not delete chunks other documents still share."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.ingestion.checkpoint import BuildCheckpoint
+from backend.ingestion.dedup import chunk_sources
+from backend.ingestion.index_builder import resume_checkpoint
+from backend.ingestion.manifest import IngestionManifest, SourceFile
+from backend.ingestion.metadata_schema import Chunk
+from backend.ingestion.parallel_parse import ParseJob
+
+CHUNKING_HASH = "chunking-v1"
+
+
+class FakeVectorStore:
+    """The slice of ChromaVectorStore that resuming uses, over a dict."""
+
+    def __init__(self, chunks: Sequence[Chunk]) -> None:
+        self.chunks: Dict[str, Chunk] = {c.chunk_id: c for c in chunks}
+        self.deleted: List[str] = []
+
+    def get_chunk(self, chunk_id: str) -> Optional[Chunk]:
+        return self.chunks.get(chunk_id)
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        for chunk_id, update in zip(ids, metadatas):
+            metadata = self.chunks[chunk_id].metadata
+            for key, value in update.items():
+                if value is None:
+                    metadata.pop(key, None)
+                else:
+                    metadata[key] = value
+
+    def delete(self, ids: Sequence[str]) -> int:
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+            self.deleted.append(chunk_id)
+        return len(ids)
+
+
+def _source(doc_id: str, content_hash: str) -> SourceFile:
+    job = ParseJob(path=Path(f"{doc_id}.pdf"), kind="pdf", doc_id=doc_id, ticker="T", period="Q1-2025")
+    return SourceFile(source_key=f"T/{doc_id}.pdf", job=job, content_hash=content_hash, parser_version="p1")
+
+
+def _location(doc_id: str, page: int) -> Dict[str, Any]:
+    return {"doc_id": doc_id, "title": doc_id, "period": "Q1-2025", "page_start": page, "page_end": page}
+
+
+def test_resume_keeps_chunks_shared_with_other_documents(tmp_path: Path) -> None:
+    deck_old, release = _source("deck", "old-hash"), _source("release", "r-hash")
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+    manifest.record(deck_old, CHUNKING_HASH, ["deck_only", "shared"])
+    manifest.record(release, CHUNKING_HASH, ["release_only", "shared"])
+
+    # "shared" was stored once for the deck and deduplicated for the release.
+    shared_sources = [_location("deck", 2), _location("release", 5)]
+    store = FakeVectorStore(
+        [
+            Chunk("deck_only", "deck text", {**_location("deck", 1)}),
+            Chunk("release_only", "release text", {**_location("release", 1)}),
+            Chunk("shared", "table text", {**_location("deck", 2), "sources": json.dumps(shared_sources)}),
+        ]
+    )
+
+    # The deck changed; the interrupted rebuild finished it with one new chunk.
+    deck_new = _source("deck", "new-hash")
+    checkpoint = BuildCheckpoint(tmp_path / "checkpoint.jsonl", CHUNKING_HASH)
+    checkpoint.start(fresh=True)
+    checkpoint.record_document(deck_new, ["deck_new"])
+    checkpoint.close()
+
+    resumed = resume_checkpoint(checkpoint, manifest, [deck_new, release], store)
+
+    assert resumed == {deck_new.source_key}
+    assert manifest.entries[deck_new.source_key].chunk_ids == ["deck_new"]
+    assert store.deleted == ["deck_only"]
+    # The shared chunk survives and now cites only the release, its remaining source.
+    shared = store.get_chunk("shared")
+    assert shared is not None
+    assert shared.metadata["doc_id"] == "release"
+    assert shared.metadata["page_start"] == 5
+    assert [s["doc_id"] for s in chunk_sources(shared.metadata)] == ["release"]
+
+
+def test_resume_deletes_unshared_stale_chunks(tmp_path: Path) -> None:
+    old, new = _source("deck", "old-hash"), _source("deck", "new-hash")
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+    manifest.record(old, CHUNKING_HASH, ["a", "b"])
+    store = FakeVectorStore([Chunk(cid, cid, _location("deck", 1)) for cid in ("a", "b")])
+    checkpoint = BuildCheckpoint(tmp_path / "checkpoint.jsonl", CHUNKING_HASH)
+    checkpoint.start(fresh=True)
+    checkpoint.record_document(new, ["b", "c"])
+    checkpoint.close()
+
+    resume_checkpoint(checkpoint, manifest, [new], store)
+
+    assert store.deleted == ["a"]
+    assert "b" in store.chunks
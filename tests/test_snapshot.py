@@ -0,0 +1,49 @@
+"""Index snapshots: installing refuses a snapshot built with another embedding model."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from backend.ingestion.snapshot import ensure_snapshot, export_snapshot, installed_snapshot
+
+MODEL = "chroma-default/all-MiniLM-L6-v2"
+
+
+def _export(tmp_path: Path, embedding_model: str) -> Path:
+    source = tmp_path / "build" / "indexes"
+    (source / "chroma").mkdir(parents=True)
+    (source / "chroma" / "data_level0.bin").write_bytes(b"snapshot index")
+    (source / "ingestion_manifest.json").write_text("{}", encoding="utf-8")
+    return export_snapshot(source, tmp_path / "snapshots", embedding_model=embedding_model, chunks=1).archive_path
+
+
+@pytest.fixture
+def index_dir(tmp_path: Path) -> Path:
+    index = tmp_path / "data" / "indexes"
+    (index / "chroma").mkdir(parents=True)
+    (index / "chroma" / "data_level0.bin").write_bytes(b"working index")
+    return index
+
+
+def test_mismatched_embedding_model_leaves_existing_index(tmp_path: Path, index_dir: Path) -> None:
+    archive = _export(tmp_path, embedding_model="text-embedding-3-large")
+
+    with pytest.raises(ValueError, match="text-embedding-3-large"):
+        ensure_snapshot(str(archive), index_dir, tmp_path / "cache", expected_embedding_model=MODEL)
+
+    assert (index_dir / "chroma" / "data_level0.bin").read_bytes() == b"working index"
+    assert installed_snapshot(index_dir) is None
+    assert sorted(p.name for p in index_dir.parent.iterdir()) == ["indexes"]
+
+
+def test_matching_embedding_model_is_installed(tmp_path: Path, index_dir: Path) -> None:
+    archive = _export(tmp_path, embedding_model=MODEL)
+
+    result = ensure_snapshot(str(archive), index_dir, tmp_path / "cache", expected_embedding_model=MODEL)
+
+    assert result.status == "installed"
+    assert (index_dir / "chroma" / "data_level0.bin").read_bytes() == b"snapshot index"
+    again = ensure_snapshot(str(archive), index_dir, tmp_path / "cache", expected_embedding_model=MODEL)
+    assert again.status == "already_installed"
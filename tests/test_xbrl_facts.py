@@ -0,0 +1,120 @@
+"""XBRL company facts: incremental loading, period selection and the lookup fast path."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from backend.app.schemas import ChatRequest
+from backend.app.services.fact_lookup import FactLookup
+from backend.ingestion.facts import Fact, FactDocument, FactsStore
+from backend.ingestion.sources.xbrl_client import XbrlFactsStore, parse_company_facts, read_company_facts
+
+FIXTURES = Path(__file__).parent / "fixtures" / "xbrl"
+# The initial file has the FY-2024 10-K and the Q1-2025 10-Q; the update adds
+# the Q2-2025 10-Q and an 8-K.
+INITIAL = FIXTURES / "companyfacts_initial.json"
+UPDATED = FIXTURES / "companyfacts_updated.json"
+Q2_ACCESSION = "0000320193-25-000057"
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> XbrlFactsStore:
+    xbrl = XbrlFactsStore(tmp_path / "facts.sqlite")
+    yield xbrl
+    xbrl.close()
+
+
+def test_reload_skips_accessions_already_loaded(store: XbrlFactsStore) -> None:
+    first = store.load_file(INITIAL, "aapl")
+    assert (first.filings_added, first.filings_skipped) == (2, 0)
+    facts_after_first = store.count()
+
+    second = store.load_file(UPDATED, "AAPL")
+    assert (second.filings_added, second.filings_skipped) == (1, 2)
+    assert store.count() == facts_after_first + second.facts_added
+    assert sorted(store.accessions("AAPL"))[-1] == Q2_ACCESSION
+
+    third = store.load_file(UPDATED, "AAPL")
+    assert (third.filings_added, third.facts_added) == (0, 0)
+
+
+def test_only_own_period_values_of_periodic_filings_are_kept() -> None:
+    filings, facts = parse_company_facts(read_company_facts(UPDATED), "AAPL")
+    # The 8-K is not a periodic report.
+    assert {f.form for f in filings} == {"10-K", "10-Q"}
+    q1 = [f for f in facts if f.period == "Q1-2025"]
+    # Prior-year comparatives (ending 2023-12-30) and the dei cover-page count are dropped.
+    assert {f.end for f in q1} == {"2024-12-28"}
+    assert not any(f.concept.startswith("dei:") for f in facts)
+
+
+def test_quarter_value_wins_over_year_to_date(store: XbrlFactsStore) -> None:
+    store.load_file(UPDATED, "AAPL")
+
+    revenue = store.lookup("AAPL", "Q2-2025", "revenue")
+    assert revenue is not None
+    assert revenue.value == 95_359_000_000
+    assert revenue.duration_days == 90
+
+    # Q2 10-Qs report cash flows only for the six months to date, so there is no quarterly capex.
+    assert store.values("AAPL", "Q2-2025", "us-gaap:PaymentsToAcquirePropertyPlantAndEquipment")
+    assert store.lookup("AAPL", "Q2-2025", "capex") is None
+    assert store.lookup("AAPL", "FY-2024", "capex").value == 9_447_000_000
+    # Instants match any period.
+    assert store.lookup("AAPL", "Q1-2025", "cash and cash equivalents").value == 30_299_000_000
+
+
+@pytest.fixture
+def lookup(tmp_path: Path) -> FactLookup:
+    path = tmp_path / "facts.sqlite"
+    xbrl = XbrlFactsStore(path)
+    xbrl.load_file(UPDATED, "AAPL")
+    return FactLookup(FactsStore(path), xbrl=xbrl)
+
+
+def test_lookup_answers_from_xbrl(lookup: FactLookup) -> None:
+    match = lookup.lookup(ChatRequest(question="What was AAPL revenue in Q2-2025?"))
+
+    assert match.answered
+    assert match.source == "xbrl"
+    assert match.metrics == ["revenue"]
+    assert lookup.answer_text(match).startswith("AAPL reported revenue of $95,359 million for Q2-2025")
+    citation = lookup.citations(match, preview_chars=200)[0]
+    assert citation.source_url.endswith("/000032019325000057/0000320193-25-000057-index.htm")
+
+
+@pytest.mark.parametrize(
+    "question, reason",
+    [
+        # Only a year-to-date value exists for the quarter (and no table row matches either).
+        ("What was AAPL capex in Q2-2025?", "no_metric"),
+        # "Why" questions leave most content words uncovered by the metric.
+        ("Why did AAPL revenue grow so much in Q1-2025?", "no_metric"),
+        # Nothing is stored for the period.
+        ("What was AAPL revenue in Q3-2025?", "no_facts"),
+    ],
+)
+def test_lookup_falls_through(lookup: FactLookup, question: str, reason: str) -> None:
+    match = lookup.lookup(ChatRequest(question=question))
+
+    assert not match.answered
+    assert match.source == "tables"
+    assert match.reason == reason
+
+
+def test_table_rows_answer_when_xbrl_falls_through(lookup: FactLookup) -> None:
+    document = FactDocument(doc_id="AAPL_Q2-2025_deck", ticker="AAPL", period="Q2-2025", title="Apple - Q2 2025")
+    row = Fact(
+        doc_id=document.doc_id, ticker="AAPL", period="Q2-2025", metric="capex", label="Capex", value=3_071,
+        unit="USD", scale=1e6, column_index=0, column_header="Q2 2025", is_current=True, page=4,
+        table_id="table_1", line=12, row_text="Capex | $3,071",
+    )
+    lookup.store.replace_document(document, [row])
+
+    match = lookup.lookup(ChatRequest(question="What was AAPL capex in Q2-2025?"))
+
+    assert match.answered
+    assert match.source == "tables"
+    assert match.facts[0].scaled_value == 3_071_000_000